@@ -10,7 +10,14 @@ from rich.panel import Panel
 
 from modules.focus_den.core import render_focus_stats, run_pomodoro
 from modules.project_roost.core import render_tasks_table
-from modules.repo_forge.core import render_profile_readme, render_project_readme
+from modules.repo_forge.core import (
+    discover_packages,
+    render_batch,
+    render_profile_readme,
+    render_project_readme,
+    render_project_readme_from_repo,
+)
+from modules.repo_forge.engine import Template, TemplateError, load_template
 from packages.core.config import APP_NAME, OUT_DIR, ensure_dirs, resolve_within_project
 from packages.core.storage import DDCStorage
 from packages.core.time_utils import parse_due_date
@@ -83,35 +90,126 @@ def _write_output(content: str, output: Path) -> Path:
     return resolved
 
 
+def _load_template(path: Path | None) -> Template | None:
+    if path is None:
+        return None
+    try:
+        return load_template(path)
+    except OSError as exc:
+        raise typer.BadParameter(f"Cannot read template: {exc}", param_hint="--template") from exc
+    except TemplateError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--template") from exc
+
+
+TEMPLATE_HELP = "Custom template file ({{field}}, {{#list}}..{{/list}} sections)."
+
+
 @readme_app.command("profile")
 def readme_profile(
     name: str = typer.Option(..., "--name"),
     style: str = typer.Option("clean", "--style", help="cute or clean"),
+    template: Path = typer.Option(None, "--template", help=TEMPLATE_HELP),
     output: Path = typer.Option(OUT_DIR / "profile_README.md", "--out"),
 ) -> None:
     """Generate a GitHub profile README."""
-    content = render_profile_readme(name=name, style=_normalize_style(style))
+    content = render_profile_readme(
+        name=name,
+        style=_normalize_style(style),
+        template=_load_template(template),
+    )
     path = _write_output(content, output)
     console.print(Panel(f"Wrote profile README to {path}", title="Repo Forge"))
 
 
 @readme_app.command("project")
 def readme_project(
-    title: str = typer.Option(..., "--title"),
+    title: str = typer.Option(None, "--title"),
     description: str = typer.Option("", "--description"),
     style: str = typer.Option("clean", "--style", help="cute or clean"),
+    from_repo: Path = typer.Option(
+        None,
+        "--from-repo",
+        help="Pre-fill stack, usage and licence by scanning this repository.",
+    ),
+    template: Path = typer.Option(None, "--template", help=TEMPLATE_HELP),
     output: Path = typer.Option(OUT_DIR / "PROJECT_README.md", "--out"),
 ) -> None:
     """Generate a project README skeleton."""
-    content = render_project_readme(
-        title=title,
-        description=description,
-        style=_normalize_style(style),
-    )
+    compiled = _load_template(template)
+    if from_repo is not None:
+        if not from_repo.is_dir():
+            raise typer.BadParameter("Repository path not found.", param_hint="--from-repo")
+        content = render_project_readme_from_repo(
+            from_repo,
+            style=_normalize_style(style),
+            title=title,
+            description=description,
+            template=compiled,
+        )
+    elif not title:
+        raise typer.BadParameter("Provide --title or --from-repo.", param_hint="--title")
+    else:
+        content = render_project_readme(
+            title=title,
+            description=description,
+            style=_normalize_style(style),
+            template=compiled,
+        )
     path = _write_output(content, output)
     console.print(Panel(f"Wrote project README to {path}", title="Repo Forge"))
 
 
+@readme_app.command("batch")
+def readme_batch(
+    root: Path = typer.Argument(..., help="Monorepo root to search for packages."),
+    style: str = typer.Option("clean", "--style", help="cute or clean"),
+    template: Path = typer.Option(None, "--template", help=TEMPLATE_HELP),
+    max_depth: int = typer.Option(4, "--max-depth"),
+    workers: int = typer.Option(0, "--workers", help="Parallel renders (0 = auto)."),
+    in_place: bool = typer.Option(False, "--in-place", help="Write README.md inside each package."),
+    force: bool = typer.Option(False, "--force", help="Overwrite existing README.md with --in-place."),
+    output: Path = typer.Option(OUT_DIR / "readme_batch", "--out"),
+) -> None:
+    """Generate project READMEs for every package in a monorepo."""
+    if not root.is_dir():
+        raise typer.BadParameter("Root directory not found.", param_hint="root")
+    compiled = _load_template(template)
+    root = root.resolve()
+    if in_place:
+        try:
+            resolve_within_project(root)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="root") from exc
+    packages = discover_packages(root, max_depth=max_depth)
+    if not packages:
+        console.print(Panel("No packages found.", title="Repo Forge"))
+        return
+    kwargs = {"workers": workers} if workers > 0 else {}
+    written = skipped = failed = 0
+    for package, content, error in render_batch(packages, _normalize_style(style), compiled, **kwargs):
+        rel = package.relative_to(root)
+        if error is not None:
+            failed += 1
+            console.print(f"[red]failed[/red] {rel}: {error}")
+            continue
+        if in_place:
+            target = package / "README.md"
+            if target.exists() and not force:
+                skipped += 1
+                continue
+            _write_output(content, target)
+        else:
+            _write_output(content, output / rel / "README.md")
+        written += 1
+    console.print(
+        Panel(
+            f"{written} written, {skipped} skipped, {failed} failed "
+            f"({len(packages)} packages).",
+            title="Repo Forge",
+        )
+    )
+
+
 @tasks_app.command("add")
 def tasks_add(
     title: str = typer.Argument(...),
@@ -3,14 +3,73 @@
 from __future__ import annotations
 
 import sqlite3
+import sys
+import time
 from contextlib import contextmanager
 
+from app.utils import db_profiler, metrics, tracing
 from app.utils.path_utils import db_path, ensure_dirs
 
 
+# Stored in PRAGMA user_version once init_db has run. Bump it whenever the
+# DDL in init_db changes, otherwise existing databases never pick it up.
+SCHEMA_VERSION = 1
+
+_QUERY_SECONDS = metrics.histogram(
+    "ddc_db_query_seconds",
+    "SQLite execute/executemany time by calling service function.",
+    ("function",),
+)
+_CONNECTIONS_OPEN = metrics.gauge("ddc_db_connections_open", "Open SQLite connections.")
+_CONNECTIONS_TOTAL = metrics.counter("ddc_db_connections_total", "SQLite connections opened.")
+
+
+def _preview(sql: str) -> str:
+    return " ".join(sql.split())[:200]
+
+
+class _Connection(sqlite3.Connection):
+    """Connection that times statements for the caller of ``get_connection``."""
+
+    function = "unknown"
+    profile: db_profiler.Profile | None = None
+
+    def execute(self, sql, parameters=(), /):
+        start = time.perf_counter()
+        with tracing.span("db.execute", function=self.function) as span:
+            if span.recording:
+                span.set(sql=_preview(sql))
+            try:
+                if self.profile is not None:
+                    return self.profile.execute(self, sql, parameters)
+                return super().execute(sql, parameters)
+            finally:
+                _QUERY_SECONDS.observe(time.perf_counter() - start, self.function)
+
+    def executemany(self, sql, parameters, /):
+        start = time.perf_counter()
+        with tracing.span("db.executemany", function=self.function) as span:
+            if span.recording:
+                span.set(sql=_preview(sql))
+            try:
+                if self.profile is not None:
+                    return self.profile.execute(self, sql, parameters, many=True)
+                return super().executemany(sql, parameters)
+            finally:
+                _QUERY_SECONDS.observe(time.perf_counter() - start, self.function)
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
 def init_db() -> None:
     ensure_dirs()
     with sqlite3.connect(db_path()) as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+            return
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS pomodoro_sessions (
@@ -51,6 +110,23 @@ def init_db() -> None:
             );
             """
         )
+        _ensure_column(conn, "readme_history", "content_hash", "TEXT")
+        _ensure_column(conn, "readme_history", "size", "INTEGER")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_readme_history_created
+            ON readme_history(created_at, id);
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_readme_history_type_created
+            ON readme_history(type, created_at, id);
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_readme_history_hash ON readme_history(content_hash);"
+        )
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS vscode_activity (
@@ -61,32 +137,221 @@ def init_db() -> None:
             );
             """
         )
+        # Superseded by the composite indexes below.
+        conn.execute("DROP INDEX IF EXISTS idx_vscode_activity_type;")
+        conn.execute("DROP INDEX IF EXISTS idx_vscode_activity_time;")
         conn.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_vscode_activity_type
-            ON vscode_activity(event_type);
+            CREATE INDEX IF NOT EXISTS idx_vscode_activity_time_type
+            ON vscode_activity(created_at, event_type);
             """
         )
         conn.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_vscode_activity_time
-            ON vscode_activity(created_at);
+            CREATE INDEX IF NOT EXISTS idx_vscode_activity_type_time
+            ON vscode_activity(event_type, created_at);
             """
         )
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_pomodoro_status ON pomodoro_sessions(status);"
         )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_pomodoro_focus_end
+            ON pomodoro_sessions(mode, status, end_time, elapsed_minutes);
+            """
+        )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks(due_date);")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_profiles (
+                username TEXT PRIMARY KEY,
+                name TEXT,
+                bio TEXT,
+                location TEXT,
+                followers INTEGER,
+                following INTEGER,
+                avatar_file TEXT,
+                message TEXT,
+                last_sync TEXT,
+                last_sync_year INTEGER,
+                updated_at TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_repos (
+                username TEXT NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT,
+                language TEXT,
+                stars INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT,
+                private INTEGER NOT NULL DEFAULT 0,
+                html_url TEXT,
+                PRIMARY KEY (username, name)
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_github_repos_stars
+            ON github_repos(username, stars, name);
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_github_repos_updated
+            ON github_repos(username, updated_at, name);
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_github_repos_language
+            ON github_repos(username, language);
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_contribution_years (
+                username TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                synced_at TEXT NOT NULL,
+                PRIMARY KEY (username, year)
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_contributions (
+                username TEXT NOT NULL,
+                day TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (username, day)
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_contribution_stats (
+                username TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                stats TEXT NOT NULL,
+                PRIMARY KEY (username, year)
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_cache_entries (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                size INTEGER NOT NULL DEFAULT 0,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_github_cache_lru
+            ON github_cache_entries(kind, last_used);
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS git_repos (
+                path TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                meta_key TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                scanned_at TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_git_repos_root ON git_repos(root);")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS git_commits (
+                repo TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                author_name TEXT,
+                author_email TEXT,
+                authored_at TEXT NOT NULL,
+                day TEXT NOT NULL,
+                additions INTEGER NOT NULL DEFAULT 0,
+                deletions INTEGER NOT NULL DEFAULT 0,
+                files INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (repo, sha)
+            );
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_git_commits_day ON git_commits(day);")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS git_commit_index_state (
+                repo TEXT PRIMARY KEY,
+                head_sha TEXT NOT NULL,
+                indexed_at TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS git_watched_repos (
+                path TEXT PRIMARY KEY,
+                added_at TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS spotify_tokens (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                client_id TEXT NOT NULL,
+                access_token TEXT NOT NULL,
+                refresh_token TEXT,
+                token_type TEXT,
+                scope TEXT,
+                expires_at REAL NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_github_contributions_year
+            ON github_contributions(username, year, day);
+            """
+        )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
 
 
 @contextmanager
 def get_connection() -> sqlite3.Connection:
     ensure_dirs()
-    conn = sqlite3.connect(db_path())
+    conn = sqlite3.connect(db_path(), factory=_Connection)
     conn.row_factory = sqlite3.Row
+    # Frame 0 is this generator, 1 is contextmanager.__enter__, 2 the caller.
+    caller = sys._getframe(2)
+    conn.function = f"{caller.f_globals.get('__name__', '?').rpartition('.')[2]}.{caller.f_code.co_name}"
+    if db_profiler.enabled():
+        conn.profile = db_profiler.Profile(conn, conn.function)
+    _CONNECTIONS_TOTAL.inc()
+    _CONNECTIONS_OPEN.inc()
     try:
         yield conn
     finally:
+        if conn.profile is not None:
+            conn.profile.close()
         conn.close()
+        _CONNECTIONS_OPEN.dec()
+
+
+def has_rows(table: str) -> bool:
+    with get_connection() as conn:
+        return conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
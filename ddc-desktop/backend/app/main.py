@@ -2,15 +2,26 @@
 
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 
-from app.db import init_db
+from app.db import has_rows, init_db
 from app.models import (
+    GitIndexRequest,
+    GitScanRequest,
     GitSummaryRequest,
+    GitWatchRequest,
     GitHubSyncRequest,
     PomodoroStart,
+    ReadmeFromRepoRequest,
     ReadmeProfileRequest,
     ReadmeProjectRequest,
     SpotifyRefreshRequest,
@@ -19,29 +30,102 @@ from app.models import (
     TaskUpdate,
     VscodeEventRequest,
 )
-from app.services import (
-    github_service,
-    git_service,
-    pomodoro_service,
-    readme_service,
-    spotify_service,
-    task_service,
-    vscode_service,
-)
+from app.utils import db_profiler, memory, metrics, sampler, tracing
+from app.utils.lazy import LazyModule
+
+# Services load on the first request that needs them, so startup does not
+# pay for git, inotify, html.parser or the HTTP client up front.
+commit_service = LazyModule("app.services.commit_service")
+github_service = LazyModule("app.services.github_service")
+git_service = LazyModule("app.services.git_service")
+job_service = LazyModule("app.services.job_service")
+pomodoro_service = LazyModule("app.services.pomodoro_service")
+readme_service = LazyModule("app.services.readme_service")
+spotify_service = LazyModule("app.services.spotify_service")
+task_service = LazyModule("app.services.task_service")
+vscode_service = LazyModule("app.services.vscode_service")
+watch_service = LazyModule("app.services.watch_service")
+http_client = LazyModule("app.utils.http_client")
+
+# The desktop frontend (vite dev server / preview). Comma-separated override
+# in DDC_ALLOWED_ORIGINS.
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get("DDC_ALLOWED_ORIGINS", "http://127.0.0.1:5173,http://localhost:5173").split(",")
+    if origin.strip()
+]
 
 app = FastAPI(title="DDC Desktop Backend", version="0.1.0")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 
+def trusted_origin(request: Request) -> None:
+    """Reject requests sent by other web pages.
+
+    CORS only hides responses; a page can still fire simple requests at
+    localhost. Clients that send no Origin (the VS Code extension, curl) pass.
+    """
+    origin = request.headers.get("origin")
+    if origin is not None and origin not in ALLOWED_ORIGINS:
+        raise HTTPException(status_code=403, detail="Origin tidak diizinkan.")
+
+
+TRUSTED = [Depends(trusted_origin)]
+
+
+_REQUEST_SECONDS = metrics.histogram(
+    "ddc_http_request_seconds",
+    "Request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+
+
+# Scrapes and debug views would crowd real requests out of the trace buffer.
+UNTRACED_PREFIXES = ("/debug/", "/metrics")
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    traced = not request.url.path.startswith(UNTRACED_PREFIXES)
+    allocated = memory.begin() if traced else None
+    with tracing.trace(f"{request.method} {request.url.path}") if traced else contextlib.nullcontext() as current:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # The matched route's template keeps label cardinality bounded.
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            _REQUEST_SECONDS.observe(time.perf_counter() - start, route, request.method, str(status))
+            memory.end(allocated, route)
+            if current is not None:
+                current.name = f"{request.method} {route}"
+                current.attrs.update(path=request.url.path, status=status)
+
+
 @app.on_event("startup")
 def startup() -> None:
     init_db()
+    if has_rows("git_watched_repos"):
+        # Re-adding watches walks each repo (or runs git status); importing the
+        # service and doing that in the background keeps startup immediate.
+        threading.Thread(target=lambda: watch_service.restore(), name="ddc-watch-restore", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    # Modules that were never used have nothing to shut down.
+    for module in (job_service, watch_service, git_service, http_client):
+        if module.loaded:
+            module.shutdown()
 
 
 @app.get("/health")
@@ -49,6 +133,85 @@ def health() -> dict:
     return {"ok": True, "message": "DDC backend is running."}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Prometheus text exposition of the in-process registry."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/debug/traces")
+def debug_traces(
+    limit: int = Query(50, ge=1, le=tracing.RECENT_SIZE),
+    slowest: bool = False,
+    format: str = Query("json", pattern="^(json|chrome)$"),
+) -> dict:
+    """Recent (or slowest) request traces; ``format=chrome`` for chrome://tracing or Perfetto."""
+    items = tracing.traces(limit, slowest)
+    if format == "chrome":
+        return tracing.chrome(items)
+    return {"ok": True, "data": items}
+
+
+@app.get("/debug/profile", response_model=None)
+async def debug_profile(
+    seconds: float = Query(5.0, gt=0, le=sampler.MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    idle: bool = False,
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+) -> dict | PlainTextResponse:
+    """Sample every thread's stack for ``seconds`` while the server keeps serving."""
+    if not sampler.enabled():
+        raise HTTPException(status_code=404, detail="Profiler is off.")
+    try:
+        result = await asyncio.to_thread(sampler.profile, seconds, interval_ms / 1000, idle)
+    except sampler.ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"])
+    return {"ok": True, "data": result}
+
+
+@app.put("/debug/profile", dependencies=TRUSTED)
+def debug_profile_toggle(enabled: bool = Query(...)) -> dict:
+    return {"ok": True, "data": {"enabled": sampler.enable(enabled)}}
+
+
+@app.get("/debug/memory")
+def debug_memory(limit: int = Query(20, ge=1, le=200), diff: bool = False) -> dict:
+    """Peak allocation per route, top allocation sites and (``diff=true``) growth since the baseline."""
+    return {"ok": True, "data": memory.report(limit, with_diff=diff)}
+
+
+@app.put("/debug/memory", dependencies=TRUSTED)
+def debug_memory_toggle(enabled: bool = Query(...)) -> dict:
+    return {"ok": True, "data": {"enabled": memory.enable(enabled)}}
+
+
+@app.post("/debug/memory/baseline", dependencies=TRUSTED)
+def debug_memory_baseline() -> dict:
+    if not memory.mark_baseline():
+        raise HTTPException(status_code=409, detail="Memory tracking is off.")
+    return {"ok": True, "data": {"baseline": True}}
+
+
+@app.get("/debug/http")
+def debug_http() -> dict:
+    """Per-host counters of the outbound HTTP client."""
+    return {"ok": True, "data": http_client.client().stats()}
+
+
+@app.get("/debug/db")
+def debug_db(limit: int = Query(20, ge=1, le=200)) -> dict:
+    """Profiled SQLite statements (slowest total first) and the latest queries."""
+    return {"ok": True, "data": db_profiler.report(limit)}
+
+
+@app.put("/debug/db", dependencies=TRUSTED)
+def debug_db_toggle(enabled: bool = Query(...)) -> dict:
+    db_profiler.enable(enabled)
+    return {"ok": True, "data": {"enabled": db_profiler.enabled()}}
+
+
 @app.post("/pomodoro/start")
 def pomodoro_start(payload: PomodoroStart) -> dict:
     result = pomodoro_service.start_session(payload.mode, payload.duration_minutes)
@@ -127,20 +290,50 @@ def tasks_delete(task_id: int) -> dict:
 
 @app.post("/readme/profile")
 def readme_profile(payload: ReadmeProfileRequest) -> dict:
-    return {"ok": True, "data": readme_service.generate_profile(payload.model_dump())}
+    result = readme_service.generate_profile(payload.model_dump())
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"ok": True, "data": result}
 
 
 @app.post("/readme/project")
 def readme_project(payload: ReadmeProjectRequest) -> dict:
-    return {"ok": True, "data": readme_service.generate_project(payload.model_dump())}
+    result = readme_service.generate_project(payload.model_dump())
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"ok": True, "data": result}
+
+
+@app.post("/readme/project/from-repo")
+def readme_project_from_repo(payload: ReadmeFromRepoRequest) -> dict:
+    result = readme_service.generate_project_from_repo(payload.model_dump())
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"ok": True, "data": result}
 
 
 @app.get("/readme/history")
-def readme_history() -> dict:
-    return {"ok": True, "data": readme_service.history()}
+def readme_history(
+    doc_type: str | None = Query(None, alias="type", pattern="^(profile|project)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+) -> dict:
+    try:
+        data = readme_service.history(doc_type, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"ok": True, "data": data}
+
+
+@app.get("/readme/versions/{content_hash}")
+def readme_version(content_hash: str) -> dict:
+    result = readme_service.version(content_hash)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return {"ok": True, "data": result}
 
 
-@app.post("/spotify/token")
+@app.post("/spotify/token", dependencies=TRUSTED)
 def spotify_token(payload: SpotifyTokenRequest) -> dict:
     result = spotify_service.exchange_code(
         payload.client_id,
@@ -153,7 +346,7 @@ def spotify_token(payload: SpotifyTokenRequest) -> dict:
     return {"ok": True, "data": result}
 
 
-@app.post("/spotify/refresh")
+@app.post("/spotify/refresh", dependencies=TRUSTED)
 def spotify_refresh(payload: SpotifyRefreshRequest) -> dict:
     result = spotify_service.refresh_token(payload.client_id, payload.refresh_token)
     if "error" in result:
@@ -161,21 +354,225 @@ def spotify_refresh(payload: SpotifyRefreshRequest) -> dict:
     return {"ok": True, "data": result}
 
 
+@app.get("/spotify/session", dependencies=TRUSTED)
+def spotify_session() -> dict:
+    return {"ok": True, "data": spotify_service.status()}
+
+
+@app.delete("/spotify/session", dependencies=TRUSTED)
+def spotify_logout() -> dict:
+    return {"ok": True, "data": spotify_service.logout()}
+
+
+@app.api_route("/spotify/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE"], dependencies=TRUSTED)
+async def spotify_api(path: str, request: Request) -> dict:
+    """Proxy to the Spotify Web API using the server-side token."""
+    body = await request.body()
+    result = await asyncio.to_thread(
+        spotify_service.proxy,
+        request.method,
+        path,
+        request.query_params.multi_items(),
+        body or None,
+    )
+    if "error" in result:
+        raise HTTPException(status_code=result.get("status", 502), detail=result["error"])
+    return {"ok": True, "data": result["data"]}
+
+
+DISCONNECT_POLL_SECONDS = 0.25
+
+
 @app.post("/git/summary")
-def git_summary(payload: GitSummaryRequest) -> dict:
-    return {"ok": True, "data": git_service.summary(payload.repo_path)}
+async def git_summary(payload: GitSummaryRequest, request: Request) -> dict:
+    cached = watch_service.cached(payload.repo_path)
+    if cached is not None:
+        return {"ok": True, "data": cached}
+    # Runs on the git executor; a client disconnect kills the git process.
+    cancel = threading.Event()
+    future = asyncio.wrap_future(
+        git_service.submit(git_service.summary, payload.repo_path, payload.timeout, cancel)
+    )
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            break
+        if await request.is_disconnected():
+            cancel.set()
+    try:
+        data = future.result()
+    except git_service.GitCancelled as exc:
+        raise HTTPException(status_code=499, detail=str(exc)) from exc
+    return {"ok": True, "data": data}
+
+
+@app.get("/git/watch")
+def git_watch_list() -> dict:
+    return {"ok": True, "data": watch_service.watched()}
+
+
+@app.post("/git/watch")
+def git_watch(payload: GitWatchRequest) -> dict:
+    result = watch_service.watch(payload.repo_path)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"ok": True, "data": result}
+
+
+@app.delete("/git/watch")
+def git_unwatch(repo_path: str = Query(...)) -> dict:
+    result = watch_service.unwatch(repo_path)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return {"ok": True, "data": result}
+
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/git/events")
+async def git_events(request: Request) -> StreamingResponse:
+    """Server-sent events: the current summaries, then one ``summary`` event per change."""
+    queue = watch_service.subscribe()
+
+    async def stream():
+        try:
+            for item in watch_service.watched():
+                yield _sse("summary", item)
+            while not await request.is_disconnected():
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse("summary", item)
+        finally:
+            watch_service.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def _git_scan_job(job: job_service.Job, root: str, max_depth: int, force: bool) -> dict:
+    return git_service.scan(root, max_depth, force, job=job)
+
+
+@app.post("/git/scan")
+def git_scan(payload: GitScanRequest) -> dict:
+    if payload.background:
+        job = job_service.submit(
+            "git_scan",
+            _git_scan_job,
+            payload.root,
+            payload.max_depth,
+            payload.force,
+            key=f"{payload.root}:{payload.max_depth}:{payload.force}",
+        )
+        return {"ok": True, "data": job.to_dict()}
+    result = git_service.scan(payload.root, payload.max_depth, payload.force)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"ok": True, "data": result}
+
+
+@app.get("/git/repos")
+def git_repos(root: str | None = Query(None)) -> dict:
+    return {"ok": True, "data": git_service.indexed_repos(root)}
+
+
+def _git_index_job(job: job_service.Job, repo_paths: list[str] | None) -> dict:
+    return commit_service.index_repos(repo_paths, job=job)
+
+
+@app.post("/git/index")
+def git_index(payload: GitIndexRequest) -> dict:
+    if payload.background:
+        key = "\n".join(sorted(payload.repo_paths)) if payload.repo_paths else "*"
+        job = job_service.submit("git_index", _git_index_job, payload.repo_paths, key=key)
+        return {"ok": True, "data": job.to_dict()}
+    return {"ok": True, "data": commit_service.index_repos(payload.repo_paths)}
+
+
+@app.get("/git/heatmap")
+def git_heatmap(
+    days: int | None = Query(None, ge=7, le=365),
+    year: int | None = Query(None, ge=2000, le=2100),
+    repo: str | None = Query(None),
+    author: str | None = Query(None),
+) -> dict:
+    return {"ok": True, "data": commit_service.heatmap(days, year, repo, author)}
 
 
 @app.get("/github/summary")
-def github_summary(year: int | None = Query(None, ge=2000, le=2100)) -> dict:
-    return {"ok": True, "data": github_service.summary(year)}
+def github_summary(
+    year: int | None = Query(None, ge=2000, le=2100),
+    user: str | None = Query(None, max_length=39),
+) -> dict:
+    return {"ok": True, "data": github_service.summary(year, user)}
+
+
+@app.get("/github/profiles")
+def github_profiles() -> dict:
+    return {"ok": True, "data": github_service.profiles()}
+
+
+@app.get("/github/repos")
+def github_repos(
+    sort: str = Query("updated", pattern="^(stars|updated|name)$"),
+    language: str | None = Query(None),
+    private: bool | None = Query(None),
+    q: str | None = Query(None, max_length=100),
+    limit: int = Query(30, ge=1, le=100),
+    cursor: str | None = Query(None),
+    user: str | None = Query(None, max_length=39),
+) -> dict:
+    try:
+        data = github_service.repos(sort, language, private, q, limit, cursor, user)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"ok": True, "data": data}
+
 
+def _github_sync_job(job: job_service.Job, profile: str, year: int | None) -> dict:
+    return github_service.sync(profile, year, job=job)
 
-@app.post("/github/sync")
+
+@app.post("/github/sync", status_code=202)
 def github_sync(payload: GitHubSyncRequest) -> dict:
-    result = github_service.sync(payload.profile, payload.year)
+    key = github_service.sync_key(payload.profile, payload.year)
+    if key is None:
+        raise HTTPException(status_code=400, detail="GitHub username or URL is required.")
+    job = job_service.submit("github_sync", _github_sync_job, payload.profile, payload.year, key=key)
+    return {"ok": True, "data": job.to_dict()}
+
+
+@app.get("/jobs")
+def jobs_list(kind: str | None = Query(None)) -> dict:
+    return {"ok": True, "data": job_service.list_jobs(kind)}
+
+
+@app.get("/jobs/{job_id}")
+def jobs_get(job_id: str, wait: float = Query(0, ge=0, le=30)) -> dict:
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if wait:
+        job.wait(wait)
+    return {"ok": True, "data": job.to_dict()}
+
+
+@app.delete("/jobs/{job_id}")
+def jobs_cancel(job_id: str) -> dict:
+    result = job_service.cancel(job_id)
     if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
+        raise HTTPException(status_code=404, detail=result["error"])
     return {"ok": True, "data": result}
 
 
@@ -184,7 +581,11 @@ def github_avatar(file: str = Query(...)) -> FileResponse:
     path = github_service.avatar_path(file)
     if not path:
         raise HTTPException(status_code=404, detail="Avatar not found.")
-    return FileResponse(path)
+    if github_service.is_content_addressed(path):
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "no-cache"
+    return FileResponse(path, headers={"Cache-Control": cache_control})
 
 
 @app.post("/vscode/event")
@@ -63,6 +63,7 @@ class ReadmeProfileRequest(BaseModel):
     bio: str
     tech: str | None = None
     links: str | None = None
+    template_path: str | None = None
 
 
 class ReadmeProjectRequest(BaseModel):
@@ -72,6 +73,18 @@ class ReadmeProjectRequest(BaseModel):
     usage: str | None = None
     stack: str | None = None
     links: str | None = None
+    template_path: str | None = None
+
+
+class ReadmeFromRepoRequest(BaseModel):
+    repo_path: str
+    title: str | None = None
+    description: str | None = None
+    features: str | None = None
+    usage: str | None = None
+    stack: str | None = None
+    links: str | None = None
+    template_path: str | None = None
 
 
 class ReadmeHistoryItem(BaseModel):
@@ -79,10 +92,29 @@ class ReadmeHistoryItem(BaseModel):
     type: str
     created_at: str
     output_path: str
+    content_hash: str | None = None
+    size: int | None = None
 
 
 class GitSummaryRequest(BaseModel):
     repo_path: str
+    timeout: float = Field(default=5.0, gt=0, le=60)
+
+
+class GitWatchRequest(BaseModel):
+    repo_path: str
+
+
+class GitScanRequest(BaseModel):
+    root: str
+    max_depth: int = Field(default=4, ge=0, le=10)
+    force: bool = False
+    background: bool = False
+
+
+class GitIndexRequest(BaseModel):
+    repo_paths: list[str] | None = None
+    background: bool = False
 
 
 class GitSummaryResponse(BaseModel):
@@ -92,6 +124,12 @@ class GitSummaryResponse(BaseModel):
     last_commit: str | None = None
     staged: int | None = None
     unstaged: int | None = None
+    untracked: int | None = None
+    upstream: str | None = None
+    ahead: int | None = None
+    behind: int | None = None
+    partial: bool = False
+    untracked_mode: Literal["full", "sampled"] | None = None
 
 
 class VscodeEventRequest(BaseModel):
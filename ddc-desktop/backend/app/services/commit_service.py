@@ -0,0 +1,258 @@
+"""Incremental local commit-activity index backed by SQLite."""
+
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from app.db import get_connection
+from app.utils.time_utils import now_iso
+from app.utils.tracing import traced
+from packages.core import git_utils
+
+
+BATCH_SIZE = 500
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+_LOG_FORMAT = f"--format={_RECORD}%H{_FIELD}%an{_FIELD}%ae{_FIELD}%aI"
+
+
+def _git(repo: Path, args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        check=False,
+    )
+
+
+def _head_sha(repo: Path) -> str | None:
+    git_dir = git_utils.find_git_dir(repo)
+    sha = git_utils.read_head_sha(git_dir) if git_dir else None
+    if sha:
+        return sha
+    # Refs the pure-Python reader cannot follow; reuse the pooled cat-file
+    # process instead of spawning rev-parse on every index run.
+    try:
+        obj = git_utils.object_pool().info(repo, "HEAD")
+    except (OSError, RuntimeError):
+        obj = None
+    return obj.sha if obj is not None and obj.type == "commit" else None
+
+
+def _is_ancestor(repo: Path, ancestor: str, head: str) -> bool:
+    return _git(repo, ["merge-base", "--is-ancestor", ancestor, head]).returncode == 0
+
+
+class GitLogError(RuntimeError):
+    """``git log`` exited with an error or was killed."""
+
+
+def _stream_log(repo: Path, revision: str) -> Iterator[tuple]:
+    """Yield one row per commit from ``git log --numstat`` without buffering the output.
+
+    Raises GitLogError after the last row if git did not exit cleanly.
+    """
+    # A file rather than a pipe, so a chatty stderr cannot block git.
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        ["git", "log", "--numstat", "--no-renames", _LOG_FORMAT, revision],
+        cwd=repo,
+        stdout=subprocess.PIPE,
+        stderr=errors,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    current: list | None = None
+    try:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(_RECORD):
+                if current is not None:
+                    yield tuple(current)
+                sha, author, email, authored = line[1:].split(_FIELD)
+                current = [sha, author, email, authored, authored[:10], 0, 0, 0]
+                continue
+            if not line or current is None:
+                continue
+            added, _, rest = line.partition("\t")
+            deleted, _, _ = rest.partition("\t")
+            current[5] += int(added) if added.isdigit() else 0
+            current[6] += int(deleted) if deleted.isdigit() else 0
+            current[7] += 1
+        if proc.wait() != 0:
+            errors.seek(0)
+            message = errors.read().decode("utf-8", "replace").strip()
+            raise GitLogError(message or f"git log exited with {proc.returncode}.")
+        if current is not None:
+            yield tuple(current)
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            # The consumer stopped early.
+            proc.kill()
+        proc.wait()
+        errors.close()
+
+
+def index_repo(repo_path: str) -> dict:
+    """Index commits reachable from HEAD that are newer than the last indexed SHA.
+
+    Rows are committed batch by batch so the write lock is never held for a
+    whole ``git log``. The index state only moves to ``head`` after git
+    exits cleanly; a failed run leaves the previous state (and, for a full
+    reindex, the previous rows) in place, and re-inserting is harmless.
+    """
+    repo = Path(repo_path)
+    if not repo.exists() or not repo.is_dir():
+        return {"repo": repo_path, "error": "Repo path tidak ditemukan."}
+    repo = repo.resolve()
+    key = str(repo)
+    head = _head_sha(repo)
+    if head is None:
+        return {"repo": key, "added": 0, "head": None, "full": False}
+
+    with get_connection() as conn:
+        state = conn.execute(
+            "SELECT head_sha FROM git_commit_index_state WHERE repo = ?", (key,)
+        ).fetchone()
+    last = state["head_sha"] if state else None
+    if last == head:
+        return {"repo": key, "added": 0, "head": head, "full": False}
+
+    full = last is None or not _is_ancestor(repo, last, head)
+    revision = head if full else f"{last}..{head}"
+
+    added = 0
+    with get_connection() as conn:
+        if full:
+            # SHAs seen in this run; rows not in it are dropped at the end.
+            conn.execute("CREATE TEMP TABLE seen_commits (sha TEXT PRIMARY KEY)")
+        batch: list[tuple] = []
+        try:
+            for row in _stream_log(repo, revision):
+                batch.append((key, *row))
+                if len(batch) >= BATCH_SIZE:
+                    with conn:
+                        added += _insert(conn, batch, full)
+                    batch = []
+        except GitLogError as exc:
+            return {"repo": key, "error": f"git log gagal: {exc}", "added": added, "head": last}
+        with conn:
+            if batch:
+                added += _insert(conn, batch, full)
+            if full:
+                conn.execute(
+                    """
+                    DELETE FROM git_commits
+                    WHERE repo = ? AND sha NOT IN (SELECT sha FROM temp.seen_commits)
+                    """,
+                    (key,),
+                )
+            conn.execute(
+                """
+                INSERT INTO git_commit_index_state (repo, head_sha, indexed_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(repo) DO UPDATE SET
+                    head_sha = excluded.head_sha,
+                    indexed_at = excluded.indexed_at
+                """,
+                (key, head, now_iso()),
+            )
+    return {"repo": key, "added": added, "head": head, "full": full}
+
+
+def _insert(conn, rows: list[tuple], track: bool = False) -> int:
+    if track:
+        conn.executemany("INSERT OR IGNORE INTO temp.seen_commits (sha) VALUES (?)", [(row[1],) for row in rows])
+    cur = conn.executemany(
+        """
+        INSERT OR IGNORE INTO git_commits
+        (repo, sha, author_name, author_email, authored_at, day, additions, deletions, files)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return cur.rowcount
+
+
+def index_repos(repo_paths: list[str] | None = None, job=None) -> dict:
+    """Index the given repos, or every repo known from ``/git/scan`` when omitted."""
+    if not repo_paths:
+        with get_connection() as conn:
+            rows = conn.execute("SELECT path FROM git_repos ORDER BY path").fetchall()
+        repo_paths = [row["path"] for row in rows]
+    results = []
+    for done, repo_path in enumerate(repo_paths, start=1):
+        results.append(index_repo(repo_path))
+        if job is not None:
+            job.report(done / len(repo_paths), f"Indexed {Path(repo_path).name}")
+    return {"repos": results, "added": sum(item.get("added", 0) for item in results)}
+
+
+@traced
+def heatmap(
+    days: int | None = None,
+    year: int | None = None,
+    repo: str | None = None,
+    author: str | None = None,
+) -> dict:
+    if year is not None:
+        start_date = date(year, 1, 1)
+        end_date = date(year, 12, 31)
+    else:
+        days = min(max(days or 90, 7), 365)
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days - 1)
+
+    where = ["day BETWEEN ? AND ?"]
+    params: list[str] = [start_date.isoformat(), end_date.isoformat()]
+    if repo:
+        where.append("repo = ?")
+        params.append(str(Path(repo).resolve()))
+    if author:
+        where.append("(author_email = ? OR author_name = ?)")
+        params.extend([author, author])
+
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT day, COUNT(*) AS commits,
+                   SUM(additions) AS additions, SUM(deletions) AS deletions
+            FROM git_commits
+            WHERE {' AND '.join(where)}
+            GROUP BY day
+            """,
+            params,
+        ).fetchall()
+        year_rows = conn.execute(
+            "SELECT DISTINCT substr(day, 1, 4) AS year FROM git_commits ORDER BY year ASC"
+        ).fetchall()
+
+    counts = {row["day"]: row for row in rows}
+    items: list[dict] = []
+    cursor = start_date
+    while cursor <= end_date:
+        key = cursor.isoformat()
+        row = counts.get(key)
+        items.append(
+            {
+                "date": key,
+                "commits": int(row["commits"]) if row else 0,
+                "additions": int(row["additions"] or 0) if row else 0,
+                "deletions": int(row["deletions"] or 0) if row else 0,
+            }
+        )
+        cursor += timedelta(days=1)
+
+    available_years = [int(row["year"]) for row in year_rows if row["year"]]
+    if year is not None:
+        return {"year": year, "items": items, "available_years": available_years}
+    return {"days": days, "items": items, "available_years": available_years}
@@ -2,55 +2,506 @@
 
 from __future__ import annotations
 
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 import subprocess
 
+from app.db import get_connection
+from app.utils.time_utils import now_iso
+from app.utils.tracing import traced
+from packages.core import git_utils
 
-def _run_git(repo_path: Path, args: list[str]) -> str:
-    result = subprocess.run(
+
+CACHE_SIZE = 256
+# Work-tree edits do not touch .git metadata, so cached entries also expire.
+CACHE_TTL_SECONDS = 10.0
+SUMMARY_TIMEOUT_SECONDS = 5.0
+POLL_SECONDS = 0.1
+GIT_WORKERS = 4
+SCAN_MAX_DEPTH = 4
+PRUNE_DIRS = {
+    ".cache",
+    ".idea",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".tox",
+    ".venv",
+    ".vscode",
+    "__pycache__",
+    "build",
+    "dist",
+    "node_modules",
+    "target",
+    "venv",
+}
+
+_cache_lock = threading.Lock()
+_cache: OrderedDict[str, tuple[tuple, float, dict]] = OrderedDict()
+_executor_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_STATUS_ARGS = ["status", "--porcelain=v2", "--branch", "-z"]
+
+
+class GitTimeout(RuntimeError):
+    """A git command exceeded its deadline and was killed."""
+
+
+class GitCancelled(RuntimeError):
+    """A git command was cancelled (e.g. the HTTP client went away)."""
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    proc.kill()
+    try:
+        proc.communicate(timeout=2)
+    except (subprocess.TimeoutExpired, ValueError, OSError):
+        pass
+
+
+def _run_git(
+    repo_path: Path,
+    args: list[str],
+    strip: bool = True,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
+) -> str:
+    proc = subprocess.Popen(
         ["git", *args],
         cwd=repo_path,
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
-        check=False,
+        encoding="utf-8",
+        errors="replace",
+    )
+    while True:
+        wait = POLL_SECONDS
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _kill(proc)
+                raise GitTimeout(f"git {args[0]} melewati batas waktu.")
+            wait = min(wait, remaining)
+        try:
+            stdout, stderr = proc.communicate(timeout=wait)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel is not None and cancel.is_set():
+                _kill(proc)
+                raise GitCancelled(f"git {args[0]} dibatalkan.") from None
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.strip() or "git command failed")
+    return stdout.strip() if strip else stdout
+
+
+def _sample_untracked(repo_path: Path, deadline: float, cancel: threading.Event | None) -> int:
+    """Count untracked files until the deadline; the result is a lower bound."""
+    proc = subprocess.Popen(
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
-    if result.returncode != 0:
-        raise RuntimeError(result.stderr.strip() or "git command failed")
-    return result.stdout.strip()
+    count = 0
+
+    def _reader() -> None:
+        nonlocal count
+        for chunk in iter(lambda: proc.stdout.read(65536), b""):
+            count += chunk.count(b"\0")
+
+    reader = threading.Thread(target=_reader, daemon=True)
+    reader.start()
+    while reader.is_alive():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (cancel is not None and cancel.is_set()):
+            break
+        reader.join(min(POLL_SECONDS, remaining))
+    if proc.poll() is None:
+        proc.kill()
+    reader.join(1)
+    proc.wait()
+    proc.stdout.close()
+    if cancel is not None and cancel.is_set():
+        raise GitCancelled("git ls-files dibatalkan.")
+    return count
+
+
+def _slice(deadline: float, fraction: float) -> float:
+    now = time.monotonic()
+    return now + max(0.0, deadline - now) * fraction
 
 
-def summary(repo_path: str) -> dict:
+def submit(fn, *args, **kwargs) -> Future:
+    """Run ``fn`` on the dedicated git executor, away from the API worker threads.
+
+    The caller's context (e.g. the active trace) is carried over.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=GIT_WORKERS, thread_name_prefix="ddc-git")
+        executor = _executor
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def metadata_key(git_dir: Path) -> tuple:
+    base = git_utils.common_dir(git_dir)
+    head_ref = git_utils.read_head_ref(git_dir)
+    return (
+        _mtime(git_dir / "HEAD"),
+        _mtime(git_dir / "index"),
+        _mtime(base / "packed-refs"),
+        _mtime(base / "refs" / "heads"),
+        _mtime(base / head_ref) if head_ref else None,
+    )
+
+
+def _packed_subject(repo_path: Path, oid: str) -> str | None:
+    """Subject of a packed commit, read through the shared cat-file pool.
+
+    Watched repos are summarised over and over; the pooled coprocess spares
+    a ``git log`` spawn per refresh once the commit is no longer loose.
+    """
+    try:
+        obj = git_utils.object_pool().read(repo_path, oid)
+    except (OSError, RuntimeError):
+        return None
+    if obj is None or obj.type != "commit" or obj.data is None:
+        return None
+    return git_utils.commit_subject(obj.data)
+
+
+def status_digest(repo_path: Path, timeout: float = SUMMARY_TIMEOUT_SECONDS) -> str:
+    """Hash of the porcelain status; it changes whenever ``summary`` would.
+
+    ``--no-optional-locks`` keeps git from refreshing .git/index, so asking
+    does not itself look like a change.
+    """
+    raw = _run_git(
+        repo_path,
+        ["--no-optional-locks", *_STATUS_ARGS, "--untracked-files=normal"],
+        strip=False,
+        deadline=time.monotonic() + timeout,
+    )
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _parse_status_v2(output: str) -> dict:
+    """Parse ``git status --porcelain=v2 --branch -z`` output."""
+    info: dict = {
+        "oid": None,
+        "branch": None,
+        "upstream": None,
+        "ahead": None,
+        "behind": None,
+        "staged": 0,
+        "unstaged": 0,
+        "untracked": 0,
+    }
+    records = output.split("\0")
+    idx = 0
+    while idx < len(records):
+        record = records[idx]
+        idx += 1
+        if not record:
+            continue
+        if record.startswith("# "):
+            key, _, value = record[2:].partition(" ")
+            if key == "branch.oid":
+                info["oid"] = None if value == "(initial)" else value
+            elif key == "branch.head":
+                info["branch"] = "HEAD" if value == "(detached)" else value
+            elif key == "branch.upstream":
+                info["upstream"] = value
+            elif key == "branch.ab":
+                ahead, _, behind = value.partition(" ")
+                info["ahead"] = abs(int(ahead))
+                info["behind"] = abs(int(behind))
+            continue
+        kind = record[0]
+        if kind == "?":
+            info["untracked"] += 1
+            info["unstaged"] += 1
+            continue
+        if kind in ("1", "2", "u"):
+            x, y = record[2], record[3]
+            if x != ".":
+                info["staged"] += 1
+            if y != ".":
+                info["unstaged"] += 1
+            if kind == "2":
+                # Renames/copies carry the original path as an extra record.
+                idx += 1
+    return info
+
+
+def clear_cache(repo_path: str | None = None) -> None:
+    with _cache_lock:
+        if repo_path is None:
+            _cache.clear()
+        else:
+            _cache.pop(str(Path(repo_path).resolve()), None)
+
+
+@traced
+def summary(
+    repo_path: str,
+    timeout: float = SUMMARY_TIMEOUT_SECONDS,
+    cancel: threading.Event | None = None,
+) -> dict:
+    """Summarise a repo within ``timeout`` seconds.
+
+    If full status is too slow, untracked files are skipped (``-uno``) and
+    counted by a sampled ``ls-files`` instead; the result is then marked
+    ``partial``. Raises GitCancelled when ``cancel`` is set.
+    """
     path = Path(repo_path)
     if not path.exists() or not path.is_dir():
         return {"ok": False, "message": "Repo path tidak ditemukan."}
 
+    git_dir = git_utils.find_git_dir(path.resolve())
+    cache_key = str(path.resolve())
+    meta_key = metadata_key(git_dir) if git_dir else None
+    if meta_key is not None:
+        with _cache_lock:
+            cached = _cache.get(cache_key)
+            if cached and cached[0] == meta_key and time.monotonic() - cached[1] < CACHE_TTL_SECONDS:
+                _cache.move_to_end(cache_key)
+                return dict(cached[2])
+
+    deadline = time.monotonic() + timeout
+    partial = False
     try:
-        inside = _run_git(path, ["rev-parse", "--is-inside-work-tree"])
-        if inside.lower() != "true":
-            return {"ok": False, "message": "Bukan repository git."}
-        branch = _run_git(path, ["rev-parse", "--abbrev-ref", "HEAD"])
-        last_commit = _run_git(path, ["log", "-1", "--pretty=%s"])
-        status = _run_git(path, ["status", "--porcelain"])
+        try:
+            raw = _run_git(
+                path,
+                [*_STATUS_ARGS, "--untracked-files=normal"],
+                strip=False,
+                deadline=_slice(deadline, 0.5),
+                cancel=cancel,
+            )
+        except GitTimeout:
+            partial = True
+            raw = _run_git(
+                path,
+                [*_STATUS_ARGS, "--untracked-files=no"],
+                strip=False,
+                deadline=_slice(deadline, 0.7),
+                cancel=cancel,
+            )
+        status = _parse_status_v2(raw)
+        if partial:
+            status["untracked"] = _sample_untracked(path, deadline, cancel)
+            status["unstaged"] += status["untracked"]
+        last_commit = None
+        if status["oid"]:
+            if git_dir is not None:
+                last_commit = git_utils.read_commit_subject(git_dir, status["oid"])
+            if last_commit is None:
+                last_commit = _packed_subject(path, status["oid"])
+            if last_commit is None:
+                last_commit = _run_git(
+                    path, ["log", "-1", "--pretty=%s"], deadline=deadline, cancel=cancel
+                )
+    except GitCancelled:
+        raise
+    except GitTimeout as exc:
+        head = git_utils.read_head(path.resolve())
+        return {
+            "ok": False,
+            "partial": True,
+            "message": str(exc),
+            "branch": head.branch if head else None,
+            "last_commit": head.subject if head else None,
+        }
     except Exception as exc:  # noqa: BLE001
-        return {"ok": False, "message": str(exc)}
+        message = str(exc)
+        if "not a git repository" in message.lower():
+            message = "Bukan repository git."
+        return {"ok": False, "message": message}
 
-    staged = 0
-    unstaged = 0
-    for line in status.splitlines():
-        if not line:
-            continue
-        x = line[0]
-        y = line[1] if len(line) > 1 else " "
-        if x != " " and x != "?":
-            staged += 1
-        if y != " " or x == "?":
-            unstaged += 1
-
-    return {
+    result = {
         "ok": True,
         "message": "OK",
-        "branch": branch,
+        "branch": status["branch"],
         "last_commit": last_commit,
-        "staged": staged,
-        "unstaged": unstaged,
+        "staged": status["staged"],
+        "unstaged": status["unstaged"],
+        "untracked": status["untracked"],
+        "upstream": status["upstream"],
+        "ahead": status["ahead"],
+        "behind": status["behind"],
+        "partial": partial,
+        "untracked_mode": "sampled" if partial else "full",
+    }
+    if meta_key is not None and not partial:
+        # Status may refresh .git/index, so key the entry on the post-call metadata.
+        with _cache_lock:
+            _cache[cache_key] = (metadata_key(git_dir), time.monotonic(), result)
+            _cache.move_to_end(cache_key)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return dict(result)
+
+
+def discover(root: Path, max_depth: int = SCAN_MAX_DEPTH) -> list[Path]:
+    """Find git repositories under ``root`` without descending into them."""
+    found: list[Path] = []
+    pending: list[tuple[Path, int]] = [(root, 0)]
+    while pending:
+        current, depth = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        if any(entry.name == ".git" for entry in entries):
+            found.append(current)
+            continue
+        if depth >= max_depth:
+            continue
+        for entry in entries:
+            if entry.name in PRUNE_DIRS or entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((Path(entry.path), depth + 1))
+            except OSError:
+                continue
+    return sorted(found)
+
+
+def _indexed(root: str) -> dict[str, dict]:
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT path, meta_key, summary, scanned_at FROM git_repos WHERE root = ?",
+            (root,),
+        ).fetchall()
+    return {row["path"]: dict(row) for row in rows}
+
+
+def indexed_repos(root: str | None = None) -> list[dict]:
+    query = "SELECT path, root, summary, scanned_at FROM git_repos"
+    params: list[str] = []
+    if root:
+        query += " WHERE root = ?"
+        params.append(str(Path(root).resolve()))
+    query += " ORDER BY path"
+    with get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [
+        {
+            "path": row["path"],
+            "name": Path(row["path"]).name,
+            "scanned_at": row["scanned_at"],
+            **json.loads(row["summary"]),
+        }
+        for row in rows
+    ]
+
+
+def _fresh(scanned_at: str) -> bool:
+    try:
+        age = datetime.now() - datetime.fromisoformat(scanned_at)
+    except (TypeError, ValueError):
+        return False
+    return timedelta(0) <= age < timedelta(seconds=CACHE_TTL_SECONDS)
+
+
+def scan(root_path: str, max_depth: int = SCAN_MAX_DEPTH, force: bool = False, job=None) -> dict:
+    """Discover repos under ``root_path`` and summarise them on the git executor.
+
+    Repos whose git metadata is unchanged and whose stored summary is younger
+    than CACHE_TTL_SECONDS reuse the row in ``git_repos`` unless ``force`` is
+    set; work-tree edits do not touch the metadata.
+    """
+    root = Path(root_path)
+    if not root.exists() or not root.is_dir():
+        return {"error": "Root path tidak ditemukan."}
+    root = root.resolve()
+    root_key = str(root)
+
+    repos = discover(root, max_depth)
+    if job is not None:
+        job.report(0.1, f"Found {len(repos)} repositories")
+    previous = _indexed(root_key)
+
+    reused: dict[str, dict] = {}
+    to_check: list[tuple[Path, Path | None]] = []
+    for repo in repos:
+        git_dir = git_utils.find_git_dir(repo)
+        meta_key = json.dumps(metadata_key(git_dir) if git_dir else None)
+        stored = previous.get(str(repo))
+        if not force and stored and stored["meta_key"] == meta_key and _fresh(stored["scanned_at"]):
+            reused[str(repo)] = {**json.loads(stored["summary"]), "scanned_at": stored["scanned_at"]}
+        else:
+            to_check.append((repo, git_dir))
+
+    checked: dict[str, dict] = {}
+    rows: list[tuple] = []
+    if to_check:
+        # The shared git executor bounds git concurrency across scans and requests.
+        futures = [(repo, git_dir, submit(summary, str(repo))) for repo, git_dir in to_check]
+        for done, (repo, git_dir, future) in enumerate(futures, start=1):
+            result = future.result()
+            # Status may have refreshed .git/index; store the metadata it left behind.
+            meta_key = json.dumps(metadata_key(git_dir) if git_dir else None)
+            scanned_at = now_iso()
+            checked[str(repo)] = {**result, "scanned_at": scanned_at}
+            rows.append((str(repo), root_key, meta_key, json.dumps(result), scanned_at))
+            if job is not None:
+                job.report(0.1 + 0.85 * done / len(futures), f"Checked {repo.name}")
+
+    gone = [(path,) for path in previous if path not in reused and path not in checked]
+    with get_connection() as conn:
+        if rows:
+            conn.executemany(
+                """
+                INSERT INTO git_repos (path, root, meta_key, summary, scanned_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    root = excluded.root,
+                    meta_key = excluded.meta_key,
+                    summary = excluded.summary,
+                    scanned_at = excluded.scanned_at
+                """,
+                rows,
+            )
+        if gone:
+            conn.executemany("DELETE FROM git_repos WHERE path = ?", gone)
+        conn.commit()
+
+    items = []
+    for repo in repos:
+        key = str(repo)
+        data = checked.get(key) or reused[key]
+        items.append({"path": key, "name": repo.name, "cached": key in reused, **data})
+    return {
+        "root": root_key,
+        "repos": items,
+        "checked": len(checked),
+        "reused": len(reused),
+        "removed": len(gone),
     }
@@ -1,19 +1,26 @@
-"""GitHub data loader for offline profile display."""
+"""GitHub profile sync and SQLite-backed store for offline display."""
 
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
 import re
-import urllib.error
+import sqlite3
+import threading
+import time
 import urllib.parse
-import urllib.request
 from datetime import datetime
 from html import unescape
 from html.parser import HTMLParser
 from pathlib import Path
 from typing import Any
 
+from app.db import get_connection
+from app.utils import contribution_stats, http_client
 from app.utils.path_utils import data_dir
+from app.utils.time_utils import now_iso
+from app.utils.tracing import traced
 
 
 def _read_json(path: Path) -> dict[str, Any]:
@@ -23,82 +30,639 @@ def _read_json(path: Path) -> dict[str, Any]:
         return {}
 
 
-def summary(year: int | None = None) -> dict[str, Any]:
-    path = data_dir() / "github_profile.json"
-    if not path.exists():
-        return {
-            "profile": None,
-            "repos": [],
-            "contributions": [],
-            "available_years": [],
-            "year": year or datetime.now().year,
-            "message": "No GitHub profile data found. Add data/github_profile.json."
-        }
-
-    data = _read_json(path)
-    profile = data.get("profile") if isinstance(data, dict) else None
+def _to_int(value: Any) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _normalize_repo(item: dict[str, Any]) -> dict[str, Any] | None:
+    name = item.get("name")
+    if not name:
+        return None
+    return {
+        "name": str(name),
+        "description": item.get("description"),
+        "language": item.get("language"),
+        "stars": _to_int(item.get("stars", item.get("stargazers_count"))) or 0,
+        "updated_at": item.get("updated_at") or "",
+        "private": bool(item.get("private")),
+        "html_url": item.get("html_url"),
+    }
+
+
+def _normalize_contributions(items: Any) -> dict[str, int]:
+    days: dict[str, int] = {}
+    if not isinstance(items, list):
+        return days
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        day = item.get("date")
+        count = _to_int(item.get("count"))
+        if not isinstance(day, str) or not re.match(r"^\d{4}-\d{2}-\d{2}$", day) or count is None:
+            continue
+        days[day] = count
+    return days
+
+
+def _upsert_profile(conn, username: str, profile: dict[str, Any], meta: dict[str, Any]) -> None:
+    conn.execute(
+        """
+        INSERT INTO github_profiles
+        (username, name, bio, location, followers, following, avatar_file,
+         message, last_sync, last_sync_year, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(username) DO UPDATE SET
+            name = excluded.name,
+            bio = excluded.bio,
+            location = excluded.location,
+            followers = excluded.followers,
+            following = excluded.following,
+            avatar_file = excluded.avatar_file,
+            message = excluded.message,
+            last_sync = excluded.last_sync,
+            last_sync_year = excluded.last_sync_year,
+            updated_at = excluded.updated_at
+        """,
+        (
+            username,
+            profile.get("name"),
+            profile.get("bio"),
+            profile.get("location"),
+            _to_int(profile.get("followers")),
+            _to_int(profile.get("following")),
+            profile.get("avatar_file") or profile.get("avatar_path") or "",
+            meta.get("message"),
+            meta.get("last_sync"),
+            _to_int(meta.get("last_sync_year")),
+            now_iso(),
+        ),
+    )
+
+
+def _sync_repos(conn, username: str, repos: list[dict[str, Any]]) -> int:
+    existing = {
+        row["name"]: dict(row)
+        for row in conn.execute(
+            """
+            SELECT name, description, language, stars, updated_at, private, html_url
+            FROM github_repos WHERE username = ?
+            """,
+            (username,),
+        ).fetchall()
+    }
+    changed: list[tuple] = []
+    seen: set[str] = set()
+    for repo in repos:
+        seen.add(repo["name"])
+        row = (
+            repo["name"],
+            repo["description"],
+            repo["language"],
+            repo["stars"],
+            repo["updated_at"],
+            int(repo["private"]),
+            repo["html_url"],
+        )
+        current = existing.get(repo["name"])
+        if current is not None and tuple(current.values()) == row:
+            continue
+        changed.append((username, *row))
+    if changed:
+        conn.executemany(
+            """
+            INSERT INTO github_repos
+            (username, name, description, language, stars, updated_at, private, html_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(username, name) DO UPDATE SET
+                description = excluded.description,
+                language = excluded.language,
+                stars = excluded.stars,
+                updated_at = excluded.updated_at,
+                private = excluded.private,
+                html_url = excluded.html_url
+            """,
+            changed,
+        )
+    removed = [(username, name) for name in existing if name not in seen]
+    if removed:
+        conn.executemany("DELETE FROM github_repos WHERE username = ? AND name = ?", removed)
+    return len(changed) + len(removed)
+
+
+def _sync_contribution_year(conn, username: str, year: int, days: dict[str, int]) -> int:
+    existing = {
+        row["day"]: int(row["count"])
+        for row in conn.execute(
+            "SELECT day, count FROM github_contributions WHERE username = ? AND year = ?",
+            (username, year),
+        ).fetchall()
+    }
+    changed = [
+        (username, day, year, count)
+        for day, count in days.items()
+        if existing.get(day) != count
+    ]
+    if changed:
+        conn.executemany(
+            """
+            INSERT INTO github_contributions (username, day, year, count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(username, day) DO UPDATE SET count = excluded.count
+            """,
+            changed,
+        )
+    removed = [(username, day) for day in existing if day not in days]
+    if removed:
+        conn.executemany(
+            "DELETE FROM github_contributions WHERE username = ? AND day = ?", removed
+        )
+    conn.execute(
+        """
+        INSERT INTO github_contribution_years (username, year, synced_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(username, year) DO UPDATE SET synced_at = excluded.synced_at
+        """,
+        (username, year, now_iso()),
+    )
+    conn.execute(
+        """
+        INSERT INTO github_contribution_stats (username, year, stats)
+        VALUES (?, ?, ?)
+        ON CONFLICT(username, year) DO UPDATE SET stats = excluded.stats
+        """,
+        (username, year, json.dumps(contribution_stats.year_stats(year, days))),
+    )
+    _touch(conn, "year", f"{username}:{year}", len(days))
+    return len(changed) + len(removed)
+
+
+def _year_stats(conn, username: str) -> dict[int, dict[str, Any]]:
+    rows = conn.execute(
+        "SELECT year, stats FROM github_contribution_stats WHERE username = ?",
+        (username,),
+    ).fetchall()
+    return {int(row["year"]): json.loads(row["stats"]) for row in rows}
+
+
+AVATAR_CACHE_BYTES = 16 * 1024 * 1024
+CONTRIBUTION_CACHE_DAYS = 366 * 40
+_CACHE_BUDGETS = {"avatar": AVATAR_CACHE_BYTES, "year": CONTRIBUTION_CACHE_DAYS}
+# Reads only note LRU hits in memory; _evict, which runs inside the sync and
+# import transactions, writes them before it consults the order.
+_used_lock = threading.Lock()
+_used: dict[tuple[str, str], float] = {}
+# (path, mtime, size) of the legacy JSON last checked by _ensure_imported.
+_import_lock = threading.Lock()
+_import_checked: tuple[str, int, int] | None = None
+_AVATAR_TYPES = (
+    (b"\x89PNG", ".png"),
+    (b"\xff\xd8", ".jpg"),
+    (b"GIF8", ".gif"),
+)
+
+
+def _avatar_dir() -> Path:
+    return data_dir() / "github_avatars"
+
+
+def _store_avatar(data: bytes) -> str | None:
+    """Write avatar bytes to the content-addressed store and return the file name."""
+    suffix = next((ext for magic, ext in _AVATAR_TYPES if data.startswith(magic)), ".img")
+    file_name = hashlib.sha256(data).hexdigest() + suffix
+    target = _avatar_dir() / file_name
+    if target.exists():
+        return file_name
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+    except OSError:
+        return None
+    return file_name
+
+
+def _touch(conn, kind: str, key: str, size: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO github_cache_entries (kind, key, size, last_used)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(kind, key) DO UPDATE SET
+            size = excluded.size,
+            last_used = excluded.last_used
+        """,
+        (kind, key, size, time.time()),
+    )
+
+
+def _mark_used(kind: str, key: str) -> None:
+    """Record a cache hit without a write; ``_evict`` applies it later."""
+    with _used_lock:
+        _used[(kind, key)] = time.time()
+
+
+def _apply_used(conn) -> None:
+    with _used_lock:
+        used = [(last_used, kind, key) for (kind, key), last_used in _used.items()]
+        _used.clear()
+    conn.executemany(
+        "UPDATE github_cache_entries SET last_used = MAX(last_used, ?) WHERE kind = ? AND key = ?",
+        used,
+    )
+
+
+def _drop_year(conn, username: str, year: int) -> None:
+    params = (username, year)
+    conn.execute("DELETE FROM github_contributions WHERE username = ? AND year = ?", params)
+    conn.execute("DELETE FROM github_contribution_years WHERE username = ? AND year = ?", params)
+    conn.execute("DELETE FROM github_contribution_stats WHERE username = ? AND year = ?", params)
+
+
+def _evict(conn, keep: set[tuple[str, str]] = frozenset()) -> list[Path]:
+    """Drop least recently used avatars/years beyond their budgets.
+
+    Returns avatar files to unlink once the transaction has committed.
+    """
+    _apply_used(conn)
+    stale_files: list[Path] = []
+    for kind, budget in _CACHE_BUDGETS.items():
+        row = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) AS total FROM github_cache_entries WHERE kind = ?",
+            (kind,),
+        ).fetchone()
+        total = int(row["total"])
+        if total <= budget:
+            continue
+        for entry in conn.execute(
+            "SELECT key, size FROM github_cache_entries WHERE kind = ? ORDER BY last_used ASC",
+            (kind,),
+        ).fetchall():
+            if total <= budget:
+                break
+            if (kind, entry["key"]) in keep:
+                continue
+            if kind == "year":
+                username, _, year = entry["key"].rpartition(":")
+                _drop_year(conn, username, int(year))
+            else:
+                stale_files.append(_avatar_dir() / entry["key"])
+            conn.execute(
+                "DELETE FROM github_cache_entries WHERE kind = ? AND key = ?",
+                (kind, entry["key"]),
+            )
+            total -= int(entry["size"])
+    return stale_files
+
+
+def _unlink_all(paths: list[Path]) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except OSError:
+            continue
+
+
+def import_json(path: Path | None = None) -> dict[str, Any]:
+    """Load a legacy ``github_profile.json`` (or the sample format) into SQLite."""
+    source = path or data_dir() / "github_profile.json"
+    data = _read_json(source)
+    if not isinstance(data, dict) or not data:
+        return {"error": f"No GitHub data found in {source.name}."}
+
+    profile = data.get("profile")
     if not isinstance(profile, dict):
         profile = {}
+    username = profile.get("username") or profile.get("name")
+    username = _parse_username(str(username)) if username else None
+    if not username:
+        return {"error": "GitHub profile username is missing."}
 
-    avatar_file = profile.get("avatar_file") or profile.get("avatar_path")
+    repos = [
+        repo
+        for repo in (
+            _normalize_repo(item) for item in data.get("repos") or [] if isinstance(item, dict)
+        )
+        if repo
+    ]
+
+    by_year: dict[int, dict[str, int]] = {}
+    contributions_by_year = data.get("contributions_by_year")
+    if isinstance(contributions_by_year, dict):
+        for key, items in contributions_by_year.items():
+            year_value = _to_int(key)
+            if year_value is not None:
+                by_year[year_value] = _normalize_contributions(items)
+    for day, count in _normalize_contributions(data.get("contributions")).items():
+        by_year.setdefault(int(day[:4]), {}).setdefault(day, count)
+
+    profile = dict(profile)
+    legacy_avatar = profile.get("avatar_file") or profile.get("avatar_path")
+    avatar_bytes = None
+    if legacy_avatar:
+        try:
+            avatar_bytes = (source.parent / Path(legacy_avatar).name).read_bytes()
+        except OSError:
+            avatar_bytes = None
+    profile["avatar_file"] = _store_avatar(avatar_bytes) if avatar_bytes else ""
+
+    with get_connection() as conn:
+        with conn:
+            _upsert_profile(conn, username, profile, data)
+            _sync_repos(conn, username, repos)
+            for year_value, days in by_year.items():
+                _sync_contribution_year(conn, username, year_value, days)
+            if avatar_bytes and profile["avatar_file"]:
+                _touch(conn, "avatar", profile["avatar_file"], len(avatar_bytes))
+            stale = _evict(conn)
+    _unlink_all(stale)
+
+    return {"username": username, "repos": len(repos), "years": sorted(by_year)}
+
+
+def _ensure_imported() -> None:
+    """Import the legacy JSON once per version of the file, even if that fails."""
+    global _import_checked
+    path = data_dir() / "github_profile.json"
+    try:
+        stat = path.stat()
+    except OSError:
+        return
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if _import_checked == key:
+        return
+    with _import_lock:
+        if _import_checked == key:
+            return
+        with get_connection() as conn:
+            row = conn.execute("SELECT 1 FROM github_profiles LIMIT 1").fetchone()
+        if row is None:
+            import_json(path)
+        _import_checked = key
+
+
+def _available_years(conn, username: str) -> list[int]:
+    rows = conn.execute(
+        "SELECT year FROM github_contribution_years WHERE username = ? ORDER BY year ASC",
+        (username,),
+    ).fetchall()
+    return [int(row["year"]) for row in rows]
+
+
+def _contributions_for_year(conn, username: str, year: int) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        """
+        SELECT day, count FROM github_contributions
+        WHERE username = ? AND year = ?
+        ORDER BY day ASC
+        """,
+        (username, year),
+    ).fetchall()
+    return [{"date": row["day"], "count": int(row["count"])} for row in rows]
+
+
+def _profile_out(row) -> dict[str, Any]:
+    profile = {
+        "name": row["name"],
+        "username": row["username"],
+        "bio": row["bio"],
+        "location": row["location"],
+        "followers": row["followers"],
+        "following": row["following"],
+        "avatar_file": row["avatar_file"] or "",
+    }
     avatar_url = None
-    if avatar_file:
-        file_name = Path(avatar_file).name
-        avatar_path = data_dir() / file_name
-        if avatar_path.exists():
-            avatar_url = f"/github/avatar?file={file_name}"
+    if profile["avatar_file"] and avatar_path(profile["avatar_file"]):
+        avatar_url = f"/github/avatar?file={Path(profile['avatar_file']).name}"
     profile["avatar_url"] = avatar_url
+    return profile
+
+
+TOP_REPOS = 5
+TOP_LANGUAGES = 10
+REPO_SORTS = {
+    "stars": ("stars", "DESC"),
+    "updated": ("updated_at", "DESC"),
+    "name": ("name", "ASC"),
+}
+_REPO_COLUMNS = "name, description, language, stars, updated_at, private, html_url"
+
+
+def _repo_out(row) -> dict[str, Any]:
+    return {**dict(row), "private": bool(row["private"])}
+
+
+def _empty_repo_stats() -> dict[str, Any]:
+    return {"total": 0, "public": 0, "private": 0, "stars": 0, "languages": []}
+
+
+def _repo_stats(conn, username: str) -> dict[str, Any]:
+    row = conn.execute(
+        """
+        SELECT COUNT(*) AS total,
+               COALESCE(SUM(private), 0) AS private,
+               COALESCE(SUM(stars), 0) AS stars
+        FROM github_repos WHERE username = ?
+        """,
+        (username,),
+    ).fetchone()
+    languages = conn.execute(
+        """
+        SELECT language, COUNT(*) AS total
+        FROM github_repos
+        WHERE username = ? AND language IS NOT NULL AND language != ''
+        GROUP BY language
+        ORDER BY total DESC, language ASC
+        LIMIT ?
+        """,
+        (username, TOP_LANGUAGES),
+    ).fetchall()
+    total = int(row["total"])
+    private = int(row["private"])
+    return {
+        "total": total,
+        "public": total - private,
+        "private": private,
+        "stars": int(row["stars"]),
+        "languages": [{"language": item["language"], "count": int(item["total"])} for item in languages],
+    }
 
-    repos = data.get("repos", []) if isinstance(data, dict) else []
-    contributions = data.get("contributions", []) if isinstance(data, dict) else []
-    if not isinstance(repos, list):
-        repos = []
-    if not isinstance(contributions, list):
-        contributions = []
 
-    contributions_by_year = data.get("contributions_by_year") if isinstance(data, dict) else None
-    if not isinstance(contributions_by_year, dict):
-        contributions_by_year = {}
+def _encode_cursor(sort: str, value: Any, name: str) -> str:
+    raw = json.dumps([sort, value, name], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
-    available_years: list[int] = []
-    for key in contributions_by_year.keys():
-        try:
-            available_years.append(int(key))
-        except (TypeError, ValueError):
-            continue
-    available_years = sorted(set(available_years))
 
-    last_sync_year = data.get("last_sync_year") if isinstance(data, dict) else None
+def _decode_cursor(cursor: str, sort: str) -> tuple[Any, str]:
     try:
-        last_sync_year = int(last_sync_year) if last_sync_year is not None else None
-    except (TypeError, ValueError):
-        last_sync_year = None
-
-    selected_year = year or last_sync_year
-    if selected_year is None and available_years:
-        selected_year = max(available_years)
-    if selected_year is None:
-        selected_year = datetime.now().year
-
-    if contributions_by_year:
-        year_key = str(selected_year)
-        year_contrib = contributions_by_year.get(year_key, [])
-        if isinstance(year_contrib, list):
-            contributions = year_contrib
-        else:
-            contributions = []
-
-    message = data.get("message") if isinstance(data, dict) else None
-    last_sync = data.get("last_sync") if isinstance(data, dict) else None
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, name = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Cursor tidak valid.") from None
+    if cursor_sort != sort or not isinstance(name, str):
+        raise ValueError("Cursor tidak cocok dengan sort.")
+    return value, name
+
+
+@traced
+def repos(
+    sort: str = "updated",
+    language: str | None = None,
+    private: bool | None = None,
+    q: str | None = None,
+    limit: int = 30,
+    cursor: str | None = None,
+    user: str | None = None,
+) -> dict[str, Any]:
+    """Return one keyset-paginated page of stored repos for the active profile."""
+    if sort not in REPO_SORTS:
+        raise ValueError("sort harus stars, updated, atau name.")
+    column, direction = REPO_SORTS[sort]
+
+    where = ["username = ?"]
+    params: list[Any] = []
+    if language:
+        where.append("language = ?")
+        params.append(language)
+    if private is not None:
+        where.append("private = ?")
+        params.append(int(private))
+    if q:
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("name LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+
+    with get_connection() as conn:
+        username = _active_username(conn, user)
+        if username is None:
+            return {"items": [], "total": 0, "next_cursor": None, "sort": sort}
+        params.insert(0, username)
+        filter_sql = " AND ".join(where)
+        total = conn.execute(
+            f"SELECT COUNT(*) AS total FROM github_repos WHERE {filter_sql}", params
+        ).fetchone()["total"]
+
+        page_where = filter_sql
+        page_params = list(params)
+        if cursor:
+            value, name = _decode_cursor(cursor, sort)
+            comparator = "<" if direction == "DESC" else ">"
+            page_where += f" AND ({column}, name) {comparator} (?, ?)"
+            page_params.extend([value, name])
+        rows = conn.execute(
+            f"""
+            SELECT {_REPO_COLUMNS}
+            FROM github_repos
+            WHERE {page_where}
+            ORDER BY {column} {direction}, name {direction}
+            LIMIT ?
+            """,
+            [*page_params, limit + 1],
+        ).fetchall()
+
+    items = [_repo_out(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        next_cursor = _encode_cursor(sort, last[column], last["name"])
+    return {"items": items, "total": int(total), "next_cursor": next_cursor, "sort": sort}
+
+
+def _profile_row(conn, user: str | None = None):
+    if user:
+        return conn.execute(
+            "SELECT * FROM github_profiles WHERE username = ? COLLATE NOCASE",
+            (user,),
+        ).fetchone()
+    return conn.execute(
+        "SELECT * FROM github_profiles ORDER BY updated_at DESC LIMIT 1"
+    ).fetchone()
+
+
+def _active_username(conn, user: str | None = None) -> str | None:
+    row = _profile_row(conn, user)
+    return row["username"] if row else None
+
+
+def profiles() -> list[dict[str, Any]]:
+    """List every stored profile, most recently synced first."""
+    _ensure_imported()
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT * FROM github_profiles ORDER BY updated_at DESC"
+        ).fetchall()
+    return [
+        {**_profile_out(row), "last_sync": row["last_sync"], "last_sync_year": row["last_sync_year"]}
+        for row in rows
+    ]
+
+
+@traced
+def summary(year: int | None = None, user: str | None = None) -> dict[str, Any]:
+    _ensure_imported()
+    with get_connection() as conn:
+        row = _profile_row(conn, user)
+        if row is None:
+            return {
+                "profile": None,
+                "repo_stats": _empty_repo_stats(),
+                "top_repos": [],
+                "contributions": [],
+                "stats": None,
+                "stats_all": None,
+                "available_years": [],
+                "year": year or datetime.now().year,
+                "message": (
+                    f"No stored GitHub data for {user}. Sync the profile first."
+                    if user
+                    else "No GitHub profile data found. Add data/github_profile.json."
+                ),
+            }
+
+        username = row["username"]
+        available_years = _available_years(conn, username)
+        last_sync_year = _to_int(row["last_sync_year"])
+        selected_year = year
+        if selected_year is None and last_sync_year in available_years:
+            selected_year = last_sync_year
+        if selected_year is None and available_years:
+            selected_year = max(available_years)
+        if selected_year is None:
+            selected_year = datetime.now().year
+
+        repo_stats = _repo_stats(conn, username)
+        top_repos = [
+            _repo_out(repo)
+            for repo in conn.execute(
+                f"""
+                SELECT {_REPO_COLUMNS}
+                FROM github_repos WHERE username = ?
+                ORDER BY stars DESC, name DESC
+                LIMIT ?
+                """,
+                (username, TOP_REPOS),
+            ).fetchall()
+        ]
+        contributions = _contributions_for_year(conn, username, selected_year)
+        stats_by_year = _year_stats(conn, username)
+        _mark_used("year", f"{username}:{selected_year}")
+        if row["avatar_file"]:
+            _mark_used("avatar", Path(row["avatar_file"]).name)
+
     return {
-        "profile": profile,
-        "repos": repos,
+        "profile": _profile_out(row),
+        "repo_stats": repo_stats,
+        "top_repos": top_repos,
         "contributions": contributions,
+        "stats": stats_by_year.get(selected_year),
+        "stats_all": contribution_stats.combine(list(stats_by_year.values())),
         "available_years": available_years,
         "year": selected_year,
         "last_sync_year": last_sync_year,
-        "message": message,
-        "last_sync": last_sync,
+        "message": row["message"],
+        "last_sync": row["last_sync"],
     }
 
 
@@ -108,10 +672,15 @@ def avatar_path(file_name: str) -> Path | None:
     safe_name = Path(file_name).name
     if not safe_name:
         return None
-    path = data_dir() / safe_name
-    if not path.exists():
-        return None
-    return path
+    for path in (_avatar_dir() / safe_name, data_dir() / safe_name):
+        if path.is_file():
+            return path
+    return None
+
+
+def is_content_addressed(path: Path) -> bool:
+    """Avatars in the hashed store never change, so they can be cached forever."""
+    return path.parent == _avatar_dir()
 
 
 class _ContributionParser(HTMLParser):
@@ -184,43 +753,20 @@ def _parse_contribution_count(text: str | None) -> int | None:
 
 
 def _request_json(url: str) -> dict[str, Any]:
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "DDC-Desktop",
-            "Accept": "application/vnd.github+json",
-        },
-    )
-    with urllib.request.urlopen(req, timeout=10) as resp:
-        payload = resp.read().decode("utf-8")
-    return json.loads(payload)
+    resp = http_client.client().get(url, headers={"Accept": "application/vnd.github+json"})
+    return resp.json()
 
 
 def _request_text(url: str) -> str:
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "DDC-Desktop",
-            "Accept-Language": "en-US,en;q=0.9",
-        },
-    )
-    with urllib.request.urlopen(req, timeout=10) as resp:
-        return resp.read().decode("utf-8")
+    resp = http_client.client().get(url, headers={"Accept-Language": "en-US,en;q=0.9"})
+    return resp.text()
 
 
-def _download_binary(url: str, file_name: str) -> str | None:
-    req = urllib.request.Request(url, headers={"User-Agent": "DDC-Desktop"})
-    try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = resp.read()
-    except (urllib.error.URLError, urllib.error.HTTPError):
-        return None
-    target = data_dir() / file_name
+def _download_binary(url: str) -> bytes | None:
     try:
-        target.write_bytes(data)
-    except OSError:
+        return http_client.client().get(url).body
+    except http_client.HttpError:
         return None
-    return file_name
 
 
 def _parse_username(profile: str) -> str | None:
@@ -323,7 +869,25 @@ def _fallback_contributions(html: str) -> dict[str, int]:
     return _merge_contributions(date_by_id, count_by_id)
 
 
-def sync(profile: str, year: int | None = None) -> dict[str, Any]:
+def sync_key(profile: str, year: int | None = None) -> str | None:
+    """Deduplication key for sync jobs targeting the same profile and year."""
+    username = _parse_username(profile)
+    if not username:
+        return None
+    return f"{username.lower()}:{year or datetime.now().year}"
+
+
+def _report(job, progress: float, message: str) -> None:
+    if job is not None:
+        job.report(progress, message)
+
+
+def sync(profile: str, year: int | None = None, job=None) -> dict[str, Any]:
+    """Fetch a profile from GitHub and store it.
+
+    When run through ``job_service`` the job receives progress updates and
+    cancellation is honoured between fetches, before anything is written.
+    """
     username = _parse_username(profile)
     if not username:
         return {"error": "GitHub username or URL is required."}
@@ -332,51 +896,66 @@ def sync(profile: str, year: int | None = None) -> dict[str, Any]:
     data_dir().mkdir(parents=True, exist_ok=True)
 
     try:
+        _report(job, 0.05, "Fetching profile")
         profile_data = _fetch_profile(username)
+        _report(job, 0.3, "Fetching repositories")
         repos = _fetch_repos(username)
+        _report(job, 0.55, f"Fetching {target_year} contributions")
         contributions = _fetch_contributions(username, target_year)
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError):
+    except (http_client.HttpError, json.JSONDecodeError):
         return {"error": "Failed to fetch GitHub data. Check username or network access."}
 
+    username = profile_data.get("username") or username
     avatar_url = profile_data.get("avatar_url")
     avatar_file = None
+    avatar_bytes = None
     if avatar_url:
-        avatar_file = _download_binary(avatar_url, "github_avatar.png")
-
-    path = data_dir() / "github_profile.json"
-    existing = _read_json(path)
-    contributions_by_year = existing.get("contributions_by_year") if isinstance(existing, dict) else None
-    if not isinstance(contributions_by_year, dict):
-        contributions_by_year = {}
-    contributions_by_year[str(target_year)] = contributions
-
-    payload = {
-        "profile": {
-            "name": profile_data.get("name"),
-            "username": profile_data.get("username"),
-            "bio": profile_data.get("bio"),
-            "location": profile_data.get("location"),
-            "followers": profile_data.get("followers"),
-            "following": profile_data.get("following"),
-            "avatar_file": avatar_file or "",
-        },
-        "repos": repos,
-        "contributions": contributions,
-        "contributions_by_year": contributions_by_year,
-        "last_sync": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "last_sync_year": target_year,
+        _report(job, 0.8, "Downloading avatar")
+        avatar_bytes = _download_binary(avatar_url)
+        if avatar_bytes:
+            avatar_file = _store_avatar(avatar_bytes)
+    _report(job, 0.9, "Saving")
+
+    profile_row = {
+        "name": profile_data.get("name"),
+        "username": profile_data.get("username"),
+        "bio": profile_data.get("bio"),
+        "location": profile_data.get("location"),
+        "followers": profile_data.get("followers"),
+        "following": profile_data.get("following"),
+        "avatar_file": avatar_file or "",
     }
+    last_sync = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    repo_rows = [repo for repo in (_normalize_repo(item) for item in repos) if repo]
 
     try:
-        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    except OSError:
+        with get_connection() as conn:
+            with conn:
+                _upsert_profile(
+                    conn,
+                    username,
+                    profile_row,
+                    {"last_sync": last_sync, "last_sync_year": target_year},
+                )
+                _sync_repos(conn, username, repo_rows)
+                _sync_contribution_year(
+                    conn, username, target_year, _normalize_contributions(contributions)
+                )
+                keep = {("year", f"{username}:{target_year}")}
+                if avatar_file:
+                    _touch(conn, "avatar", avatar_file, len(avatar_bytes))
+                    keep.add(("avatar", avatar_file))
+                stale = _evict(conn, keep)
+            available_years = _available_years(conn, username)
+    except sqlite3.Error:
         return {"error": "Failed to save GitHub data."}
+    _unlink_all(stale)
 
     return {
-        "profile": payload["profile"],
-        "repos": repos,
+        "profile": profile_row,
+        "repo_count": len(repo_rows),
         "contributions": contributions,
-        "last_sync": payload["last_sync"],
+        "last_sync": last_sync,
         "last_sync_year": target_year,
-        "available_years": sorted(int(key) for key in contributions_by_year.keys() if str(key).isdigit()),
+        "available_years": available_years,
     }
@@ -0,0 +1,177 @@
+"""In-process background job runner with progress polling."""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.utils.time_utils import now_iso
+
+
+MAX_WORKERS = 2
+MAX_FINISHED_JOBS = 100
+ACTIVE_STATUSES = {"queued", "running"}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when cancellation was requested."""
+
+
+class Job:
+    def __init__(self, kind: str, key: str | None) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.progress = 0.0
+        self.message: str | None = None
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = now_iso()
+        self.started_at: str | None = None
+        self.finished_at: str | None = None
+        self.future: Future | None = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, progress: float, message: str | None = None) -> None:
+        """Update progress (0..1); raises JobCancelled if cancellation was requested."""
+        self.check_cancelled()
+        self.progress = max(0.0, min(1.0, float(progress)))
+        if message is not None:
+            self.message = message
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_lock = threading.Lock()
+_jobs: OrderedDict[str, Job] = OrderedDict()
+_inflight: dict[tuple[str, str], Job] = {}
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ddc-job")
+    return _executor
+
+
+def _finish(job: Job, status: str) -> None:
+    with _lock:
+        job.status = status
+        job.finished_at = now_iso()
+        if status == "succeeded":
+            job.progress = 1.0
+        if job.key is not None and _inflight.get((job.kind, job.key)) is job:
+            del _inflight[(job.kind, job.key)]
+        finished = [item for item in _jobs.values() if item.status not in ACTIVE_STATUSES]
+        for item in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            _jobs.pop(item.id, None)
+    job._done.set()
+
+
+def _run(job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+    if job.cancel_requested:
+        _finish(job, "cancelled")
+        return
+    job.status = "running"
+    job.started_at = now_iso()
+    try:
+        result = fn(job, *args, **kwargs)
+    except JobCancelled:
+        _finish(job, "cancelled")
+        return
+    except Exception as exc:  # noqa: BLE001
+        job.error = str(exc) or exc.__class__.__name__
+        _finish(job, "failed")
+        return
+    if isinstance(result, dict) and "error" in result:
+        job.error = str(result["error"])
+        _finish(job, "failed")
+        return
+    job.result = result
+    _finish(job, "succeeded")
+
+
+def submit(kind: str, fn: Callable[..., Any], *args: Any, key: str | None = None, **kwargs: Any) -> Job:
+    """Queue ``fn(job, *args, **kwargs)``.
+
+    Jobs sharing ``kind`` and ``key`` while one is still queued or running are
+    deduplicated: the in-flight job is returned instead of starting another.
+    """
+    with _lock:
+        if key is not None:
+            existing = _inflight.get((kind, key))
+            if existing is not None and not existing.cancel_requested:
+                return existing
+        job = Job(kind, key)
+        _jobs[job.id] = job
+        if key is not None:
+            _inflight[(kind, key)] = job
+    job.future = _get_executor().submit(_run, job, fn, args, kwargs)
+    return job
+
+
+def get(job_id: str) -> Job | None:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def list_jobs(kind: str | None = None) -> list[dict]:
+    with _lock:
+        jobs = [job for job in _jobs.values() if kind is None or job.kind == kind]
+    return [job.to_dict() for job in reversed(jobs)]
+
+
+def cancel(job_id: str) -> dict:
+    job = get(job_id)
+    if job is None:
+        return {"error": "Job not found."}
+    if job.status not in ACTIVE_STATUSES:
+        return job.to_dict()
+    job._cancel.set()
+    with _lock:
+        if job.key is not None and _inflight.get((job.kind, job.key)) is job:
+            del _inflight[(job.kind, job.key)]
+    if job.future is not None and job.future.cancel():
+        _finish(job, "cancelled")
+    return job.to_dict()
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        active = [job for job in _jobs.values() if job.status in ACTIVE_STATUSES]
+    for job in active:
+        job._cancel.set()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
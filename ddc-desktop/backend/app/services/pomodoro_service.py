@@ -145,11 +145,12 @@ def stats(range_name: str) -> dict:
     where_clause = ""
     params: list[str] = []
 
+    # end_time comes from now_iso(), so day ranges compare as strings.
     if range_name == "today":
-        where_clause = "AND date(end_time) = ?"
-        params.append(today.isoformat())
+        where_clause = "AND end_time >= ? AND end_time < ?"
+        params.extend([today.isoformat(), (today + timedelta(days=1)).isoformat()])
     elif range_name == "week":
-        where_clause = "AND date(end_time) >= ?"
+        where_clause = "AND end_time >= ?"
         params.append(week_start.isoformat())
 
     with get_connection() as conn:
@@ -2,79 +2,305 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
 from app.db import get_connection
-from app.utils.path_utils import out_dir
+from app.utils import path_utils
 from app.utils.time_utils import now_iso
+from app.utils.tracing import traced
+from modules.repo_forge import engine, introspect
 
 
-def _write_file(filename: str, content: str) -> str:
-    out_dir().mkdir(parents=True, exist_ok=True)
-    path = out_dir() / filename
-    path.write_text(content, encoding="utf-8")
-    return str(path)
-
-
-def _insert_history(doc_type: str, output_path: str) -> None:
-    with get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO readme_history (type, created_at, output_path)
-            VALUES (?, ?, ?)
-            """,
-            (doc_type, now_iso(), output_path),
-        )
-        conn.commit()
-
-
-def generate_profile(data: dict) -> dict:
-    content = f"""# {data['name']}
+PROFILE_TEMPLATE = """# {{name}}
 
 ## About
-{data['bio']}
+{{bio}}
 
 ## Tech Stack
-{data.get('tech') or 'Add your favorite tools and languages.'}
+{{tech}}
 
 ## Links
-{data.get('links') or 'Add links to your portfolio, GitHub, or socials.'}
+{{links}}
 
 ---
 Generated by Dragon Dev Companion Desktop.
 """
-    path = _write_file("README_PROFILE.md", content)
-    _insert_history("profile", path)
-    return {"path": path}
 
-
-def generate_project(data: dict) -> dict:
-    content = f"""# {data['title']}
+PROJECT_TEMPLATE = """# {{title}}
 
 ## Description
-{data['description']}
+{{description}}
 
 ## Features
-{data.get('features') or '- Feature one\\n- Feature two'}
+{{features}}
 
 ## Usage
-{data.get('usage') or 'Add setup and usage steps here.'}
+{{usage}}
 
 ## Tech Stack
-{data.get('stack') or 'List frameworks, languages, and tools.'}
+{{stack}}
 
 ## Links
-{data.get('links') or 'Add docs or repo links.'}
+{{links}}
 
 ---
 Generated by Dragon Dev Companion Desktop.
 """
-    path = _write_file("README_PROJECT.md", content)
-    _insert_history("project", path)
-    return {"path": path}
 
+HISTORY_LIMIT = 200
+HISTORY_PAGE_SIZE = 50
+
+PROFILE_DEFAULTS = {
+    "tech": "Add your favorite tools and languages.",
+    "links": "Add links to your portfolio, GitHub, or socials.",
+}
+PROJECT_DEFAULTS = {
+    "features": "- Feature one\n- Feature two",
+    "usage": "Add setup and usage steps here.",
+    "stack": "List frameworks, languages, and tools.",
+    "links": "Add docs or repo links.",
+}
+
+
+class TemplatePathError(ValueError):
+    """A template path that points outside the templates directory."""
+
+
+def _template_file(template_path: str) -> Path:
+    """Resolve ``template_path`` inside ``path_utils.templates_dir()``.
+
+    Relative paths are taken from the templates directory. Anything that
+    resolves outside it, through ``..`` or a symlink, is rejected so the API
+    cannot be used to read arbitrary files.
+    """
+    root = path_utils.templates_dir().resolve()
+    path = (root / template_path).resolve()
+    if not path.is_relative_to(root):
+        raise TemplatePathError(f"template harus berada di {root}")
+    return path
+
+
+def _render(source: str, template_path: str | None, data: dict, defaults: dict) -> str:
+    """Render ``data`` with a user template file when given, else the built-in one.
+
+    Raises OSError, TemplatePathError or TemplateError for an unusable
+    template file.
+    """
+    template = (
+        engine.load_template(_template_file(template_path))
+        if template_path
+        else engine.compile_template(source)
+    )
+    context = dict(data)
+    for key, default in defaults.items():
+        context[key] = data.get(key) or default
+    return template.render(context)
+
+
+def _store_dir() -> Path:
+    return path_utils.data_dir() / "readme_store"
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    # A unique temp name per call: routes run on a threadpool, so two
+    # requests in the same process can write the same file at once.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _write_file(filename: str, content: str) -> dict:
+    """Store ``content`` by hash and refresh the output file only when it changed."""
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    store = _store_dir()
+    store.mkdir(parents=True, exist_ok=True)
+    blob = store / f"{digest}.md"
+    if not blob.exists():
+        _atomic_write(blob, data)
+
+    out_dir = path_utils.out_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / filename
+    try:
+        current = hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        current = None
+    changed = current != digest
+    if changed:
+        _atomic_write(path, data)
+    return {"path": str(path), "hash": digest, "size": len(data), "changed": changed}
 
-def history() -> list[dict]:
+
+def _insert_history(doc_type: str, output: dict) -> None:
+    """Record a new version unless it matches the latest one of this type."""
+    with get_connection() as conn, conn:
+        # Take the write lock before reading the latest row, so two identical
+        # requests cannot both pass the check and insert twice.
+        conn.execute("BEGIN IMMEDIATE")
+        latest = conn.execute(
+            """
+            SELECT content_hash FROM readme_history
+            WHERE type = ?
+            ORDER BY created_at DESC, id DESC
+            LIMIT 1
+            """,
+            (doc_type,),
+        ).fetchone()
+        if latest is not None and latest["content_hash"] == output["hash"]:
+            return
+        conn.execute(
+            """
+            INSERT INTO readme_history (type, created_at, output_path, content_hash, size)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (doc_type, now_iso(), output["path"], output["hash"], output["size"]),
+        )
+        pruned = conn.execute(
+            """
+            SELECT id, content_hash FROM readme_history
+            WHERE type = ?
+            ORDER BY created_at DESC, id DESC
+            LIMIT -1 OFFSET ?
+            """,
+            (doc_type, HISTORY_LIMIT),
+        ).fetchall()
+        conn.executemany("DELETE FROM readme_history WHERE id = ?", [(row["id"],) for row in pruned])
+        orphans = [
+            row["content_hash"]
+            for row in pruned
+            if row["content_hash"]
+            and row["content_hash"] != output["hash"]
+            and conn.execute(
+                "SELECT 1 FROM readme_history WHERE content_hash = ? LIMIT 1",
+                (row["content_hash"],),
+            ).fetchone()
+            is None
+        ]
+    for digest in set(orphans):
+        (_store_dir() / f"{digest}.md").unlink(missing_ok=True)
+
+
+def _generated(doc_type: str, filename: str, content: str) -> dict:
+    output = _write_file(filename, content)
+    _insert_history(doc_type, output)
+    return {"path": output["path"], "hash": output["hash"], "changed": output["changed"]}
+
+
+@traced
+def generate_profile(data: dict) -> dict:
+    try:
+        content = _render(PROFILE_TEMPLATE, data.get("template_path"), data, PROFILE_DEFAULTS)
+    except (OSError, TemplatePathError, engine.TemplateError) as exc:
+        return {"error": f"Template tidak valid: {exc}"}
+    return _generated("profile", "README_PROFILE.md", content)
+
+
+@traced
+def generate_project(data: dict) -> dict:
+    try:
+        content = _render(PROJECT_TEMPLATE, data.get("template_path"), data, PROJECT_DEFAULTS)
+    except (OSError, TemplatePathError, engine.TemplateError) as exc:
+        return {"error": f"Template tidak valid: {exc}"}
+    return _generated("project", "README_PROJECT.md", content)
+
+
+@traced
+def generate_project_from_repo(data: dict) -> dict:
+    """Generate a project README pre-filled by scanning ``data['repo_path']``."""
+    repo = Path(data["repo_path"])
+    if not repo.exists() or not repo.is_dir():
+        return {"error": "Repo path tidak ditemukan."}
+    info = introspect.introspect(repo)
+    fields = introspect.project_fields(info)
+    stack = "\n".join(f"- {item}" for item in fields["stack"])
+    if fields["languages"]:
+        stack += f"\n\nLanguages: {fields['languages']}"
+    result = generate_project(
+        {
+            **fields,
+            "title": data.get("title") or fields["title"],
+            "description": data.get("description") or fields["description"] or info["name"],
+            "features": data.get("features"),
+            "usage": data.get("usage") or fields["usage"],
+            "stack": data.get("stack") or stack,
+            "stack_items": fields["stack"],
+            "links": data.get("links") or fields["license"],
+            "template_path": data.get("template_path"),
+        }
+    )
+    if "error" not in result:
+        result["repo"] = info
+    return result
+
+
+def _encode_cursor(created_at: str, row_id: int) -> str:
+    raw = json.dumps([created_at, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Cursor tidak valid.") from None
+    if not isinstance(created_at, str) or not isinstance(row_id, int):
+        raise ValueError("Cursor tidak valid.")
+    return created_at, row_id
+
+
+@traced
+def history(
+    doc_type: str | None = None,
+    limit: int = HISTORY_PAGE_SIZE,
+    cursor: str | None = None,
+) -> dict:
+    """Return one keyset-paginated page of history, newest first."""
+    where: list[str] = []
+    params: list = []
+    if doc_type:
+        where.append("type = ?")
+        params.append(doc_type)
+    if cursor:
+        created_at, row_id = _decode_cursor(cursor)
+        where.append("(created_at, id) < (?, ?)")
+        params.extend([created_at, row_id])
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
     with get_connection() as conn:
         rows = conn.execute(
-            "SELECT * FROM readme_history ORDER BY created_at DESC"
+            f"""
+            SELECT id, type, created_at, output_path, content_hash, size
+            FROM readme_history
+            {where_sql}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            [*params, limit + 1],
         ).fetchall()
-    return [dict(row) for row in rows]
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = _encode_cursor(items[-1]["created_at"], items[-1]["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def version(content_hash: str) -> dict:
+    """Return a stored README version by its content hash."""
+    if len(content_hash) != 64 or any(ch not in "0123456789abcdef" for ch in content_hash):
+        return {"error": "Hash tidak valid."}
+    try:
+        content = (_store_dir() / f"{content_hash}.md").read_text(encoding="utf-8")
+    except OSError:
+        return {"error": "Versi README tidak ditemukan."}
+    return {"hash": content_hash, "content": content}
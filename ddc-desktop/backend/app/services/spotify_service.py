@@ -1,39 +1,122 @@
-"""Spotify OAuth helpers (PKCE-friendly, no client secret)."""
+"""Spotify OAuth helpers (PKCE-friendly, no client secret) and Web API proxy.
+
+Tokens are kept in SQLite and never handed back to the browser; the
+frontend talks to ``/spotify/api/*`` and the backend attaches (and
+refreshes) the access token. GET responses for metadata are cached with a
+per-path TTL, and identical concurrent GETs share one upstream request.
+"""
 
 from __future__ import annotations
 
 import json
-import urllib.error
+import threading
+import time
 import urllib.parse
-import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Any
 
+from app.db import get_connection
+from app.utils import http_client
+from app.utils.time_utils import now_iso
+from app.utils.tracing import traced
+
 
 SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+SPOTIFY_API_URL = "https://api.spotify.com/v1"
+# Refresh this long before Spotify says the token expires.
+REFRESH_MARGIN_SECONDS = 60.0
+REQUEST_TIMEOUT_SECONDS = 15.0
+CACHE_SIZE = 256
+# Most specific prefix first; paths without a match are coalesced but not cached.
+CACHE_TTLS: tuple[tuple[str, float], ...] = (
+    ("me/player", 1.0),
+    ("me/playlists", 60.0),
+    ("me", 300.0),
+    ("playlists", 300.0),
+    ("tracks", 3600.0),
+    ("albums", 3600.0),
+    ("artists", 3600.0),
+)
+
+_token_lock = threading.Lock()
+_cache_lock = threading.Lock()
+_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+_inflight: dict[str, Future] = {}
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream": 0}
+
+
+def _error_message(exc: http_client.HttpStatusError, fallback: str) -> str:
+    try:
+        parsed = exc.json()
+    except (ValueError, AttributeError):
+        return fallback
+    if not isinstance(parsed, dict):
+        return fallback
+    error = parsed.get("error")
+    if isinstance(error, dict):
+        # Web API errors are {"error": {"status": 404, "message": "..."}}.
+        return error.get("message") or fallback
+    return parsed.get("error_description") or error or fallback
 
 
 def _post_form(payload: dict[str, str]) -> dict[str, Any]:
-    data = urllib.parse.urlencode(payload).encode("utf-8")
-    req = urllib.request.Request(
-        SPOTIFY_TOKEN_URL,
-        data=data,
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-    )
     try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        try:
-            body = exc.read().decode("utf-8")
-            parsed = json.loads(body)
-            message = parsed.get("error_description") or parsed.get("error") or "Spotify error."
-        except (OSError, json.JSONDecodeError, AttributeError):
-            message = "Spotify token request failed."
-        return {"error": message}
-    except urllib.error.URLError:
+        return http_client.client().post_form(SPOTIFY_TOKEN_URL, payload, timeout=15).json()
+    except http_client.HttpStatusError as exc:
+        return {"error": _error_message(exc, "Spotify token request failed.")}
+    except (http_client.HttpConnectionError, json.JSONDecodeError):
         return {"error": "Spotify connection failed."}
 
 
+def _store_tokens(client_id: str, data: dict[str, Any]) -> None:
+    expires_at = time.time() + float(data.get("expires_in") or 3600)
+    with get_connection() as conn:
+        # Refresh responses may omit refresh_token; keep the previous one then.
+        conn.execute(
+            """
+            INSERT INTO spotify_tokens (
+                id, client_id, access_token, refresh_token, token_type, scope, expires_at, updated_at
+            )
+            VALUES (1, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                client_id = excluded.client_id,
+                access_token = excluded.access_token,
+                refresh_token = COALESCE(excluded.refresh_token, spotify_tokens.refresh_token),
+                token_type = COALESCE(excluded.token_type, spotify_tokens.token_type),
+                scope = COALESCE(excluded.scope, spotify_tokens.scope),
+                expires_at = excluded.expires_at,
+                updated_at = excluded.updated_at
+            """,
+            (
+                client_id,
+                data["access_token"],
+                data.get("refresh_token"),
+                data.get("token_type"),
+                data.get("scope"),
+                expires_at,
+                now_iso(),
+            ),
+        )
+        conn.commit()
+
+
+def _load_tokens() -> dict[str, Any] | None:
+    with get_connection() as conn:
+        row = conn.execute("SELECT * FROM spotify_tokens WHERE id = 1").fetchone()
+    return dict(row) if row else None
+
+
+def _token_request(client_id: str, payload: dict[str, str]) -> dict[str, Any]:
+    result = _post_form(payload)
+    if "error" in result:
+        return result
+    if not result.get("access_token"):
+        return {"error": "Spotify did not return an access token."}
+    _store_tokens(client_id, result)
+    return status()
+
+
 def exchange_code(
     client_id: str,
     code: str,
@@ -47,7 +130,8 @@ def exchange_code(
         "redirect_uri": redirect_uri,
         "code_verifier": code_verifier,
     }
-    return _post_form(payload)
+    clear_cache()
+    return _token_request(client_id, payload)
 
 
 def refresh_token(client_id: str, refresh_token: str) -> dict[str, Any]:
@@ -56,4 +140,173 @@ def refresh_token(client_id: str, refresh_token: str) -> dict[str, Any]:
         "grant_type": "refresh_token",
         "refresh_token": refresh_token,
     }
-    return _post_form(payload)
+    return _token_request(client_id, payload)
+
+
+def status() -> dict[str, Any]:
+    tokens = _load_tokens()
+    if tokens is None:
+        return {"connected": False}
+    return {
+        "connected": True,
+        "scope": tokens["scope"],
+        "token_type": tokens["token_type"],
+        "expires_in": max(int(tokens["expires_at"] - time.time()), 0),
+    }
+
+
+def logout() -> dict[str, Any]:
+    with get_connection() as conn:
+        conn.execute("DELETE FROM spotify_tokens")
+        conn.commit()
+    clear_cache()
+    return {"connected": False}
+
+
+def _access_token(rejected: str | None = None) -> str | dict[str, Any]:
+    """Return a usable access token, refreshing it once it is close to expiry.
+
+    ``rejected`` is a token Spotify answered 401 for; it is refreshed unless
+    another thread already replaced it.
+    """
+    with _token_lock:
+        tokens = _load_tokens()
+        if tokens is None:
+            return {"error": "Spotify is not connected.", "status": 401}
+        fresh = tokens["expires_at"] - REFRESH_MARGIN_SECONDS > time.time()
+        if fresh and tokens["access_token"] != rejected:
+            return tokens["access_token"]
+        if not tokens["refresh_token"]:
+            return {"error": "Spotify session expired. Please reconnect.", "status": 401}
+        result = refresh_token(tokens["client_id"], tokens["refresh_token"])
+        if "error" in result:
+            return {"error": result["error"], "status": 401}
+        return _load_tokens()["access_token"]
+
+
+def _url(path: str, query: list[tuple[str, str]]) -> str:
+    url = f"{SPOTIFY_API_URL}/{path}"
+    if query:
+        url += "?" + urllib.parse.urlencode(query)
+    return url
+
+
+def _fetch(method: str, path: str, query: list[tuple[str, str]], body: bytes | None) -> dict[str, Any]:
+    headers = {"Accept": "application/json"}
+    if body:
+        headers["Content-Type"] = "application/json"
+    token: str | None = None
+    for attempt in range(2):
+        token = _access_token(rejected=token)
+        if isinstance(token, dict):
+            return token
+        headers["Authorization"] = f"Bearer {token}"
+        with _cache_lock:
+            _stats["upstream"] += 1
+        try:
+            resp = http_client.client().request(
+                method,
+                _url(path, query),
+                body=body,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT_SECONDS,
+            )
+        except http_client.HttpStatusError as exc:
+            if exc.status == 401 and attempt == 0:
+                # Revoked or clock-skewed token: force one refresh and retry.
+                continue
+            return {"error": _error_message(exc, "Spotify request failed."), "status": exc.status}
+        except http_client.HttpConnectionError:
+            return {"error": "Spotify connection failed.", "status": 502}
+        try:
+            data = resp.json() if resp.body else None
+        except json.JSONDecodeError:
+            return {"error": "Spotify returned an invalid response.", "status": 502}
+        return {"status": resp.status, "data": data}
+    return {"error": "Spotify session expired. Please reconnect.", "status": 401}
+
+
+def _ttl_for(path: str) -> float:
+    for prefix, ttl in CACHE_TTLS:
+        if path == prefix or path.startswith(prefix + "/"):
+            return ttl
+    return 0.0
+
+
+def _cache_key(path: str, query: list[tuple[str, str]]) -> str:
+    return _url(path, sorted(query))
+
+
+def _get(path: str, query: list[tuple[str, str]]) -> dict[str, Any]:
+    key = _cache_key(path, query)
+    ttl = _ttl_for(path)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return hit[1]
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+            _stats["misses"] += 1
+        else:
+            _stats["coalesced"] += 1
+    if not leader:
+        return future.result()
+
+    try:
+        result = _fetch("GET", path, query, None)
+    except BaseException as exc:
+        with _cache_lock:
+            _inflight.pop(key, None)
+        future.set_exception(exc)
+        raise
+    with _cache_lock:
+        if ttl > 0 and "error" not in result:
+            _cache[key] = (time.monotonic() + ttl, result)
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+        _inflight.pop(key, None)
+    future.set_result(result)
+    return result
+
+
+@traced
+def proxy(
+    method: str,
+    path: str,
+    query: list[tuple[str, str]] | None = None,
+    body: bytes | None = None,
+) -> dict[str, Any]:
+    """Forward a Web API call, e.g. ``proxy("GET", "me/playlists", [("limit", "50")])``."""
+    path = path.strip("/")
+    if not path or ".." in path.split("/"):
+        return {"error": "Invalid Spotify API path.", "status": 400}
+    query = list(query or [])
+    method = method.upper()
+    if method == "GET":
+        return _get(path, query)
+    result = _fetch(method, path, query, body)
+    if path == "me/player" or path.startswith("me/player/"):
+        # Player commands change what the next state poll should see.
+        clear_cache("me/player")
+    return result
+
+
+def clear_cache(prefix: str | None = None) -> None:
+    with _cache_lock:
+        if prefix is None:
+            _cache.clear()
+            return
+        base = f"{SPOTIFY_API_URL}/{prefix}"
+        for key in [key for key in _cache if key == base or key.startswith((base + "/", base + "?"))]:
+            del _cache[key]
+
+
+def cache_stats() -> dict[str, Any]:
+    with _cache_lock:
+        return {"entries": len(_cache), "inflight": len(_inflight), **_stats}
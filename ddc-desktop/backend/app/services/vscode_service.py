@@ -6,9 +6,12 @@ from datetime import date, datetime, timedelta
 
 from app.db import get_connection
 from app.utils.time_utils import now_iso
+from app.utils.tracing import traced
 
 
 ALLOWED_EVENTS = {"active", "inactive", "typing"}
+# created_at is written by now_iso() ("YYYY-MM-DD HH:MM:SS"), so date ranges are
+# plain string comparisons that can use the created_at indexes.
 
 
 def record_event(event_type: str, details: str | None = None) -> dict:
@@ -51,13 +54,14 @@ def _count_since(event_type: str, since: str) -> int:
             """
             SELECT COUNT(*) AS total
             FROM vscode_activity
-            WHERE event_type = ? AND datetime(created_at) >= datetime(?)
+            WHERE event_type = ? AND created_at >= ?
             """,
             (event_type, since),
         ).fetchone()
     return int(row["total"]) if row else 0
 
 
+@traced
 def summary(window_hours: int) -> dict:
     now = datetime.now()
     since = (now - timedelta(hours=window_hours)).replace(microsecond=0)
@@ -90,6 +94,7 @@ def summary(window_hours: int) -> dict:
     }
 
 
+@traced
 def history(window_hours: int, limit: int = 50) -> list[dict]:
     now = datetime.now()
     since = (now - timedelta(hours=window_hours)).replace(microsecond=0)
@@ -99,7 +104,7 @@ def history(window_hours: int, limit: int = 50) -> list[dict]:
         rows = conn.execute(
             """
             SELECT * FROM vscode_activity
-            WHERE datetime(created_at) >= datetime(?)
+            WHERE created_at >= ?
             ORDER BY created_at DESC
             LIMIT ?
             """,
@@ -108,48 +113,55 @@ def history(window_hours: int, limit: int = 50) -> list[dict]:
     return [dict(row) for row in rows]
 
 
+@traced
+def _day_items(rows, start_date: date, end_date: date) -> list[dict]:
+    """One item per day from start_date to end_date, zero-filled."""
+    counts: dict[str, dict[str, int]] = {}
+    for row in rows:
+        day = row["day"]
+        if day not in counts:
+            counts[day] = {"active": 0, "typing": 0, "inactive": 0}
+        counts[day][row["event_type"]] = int(row["total"])
+
+    items: list[dict] = []
+    cursor = start_date
+    while cursor <= end_date:
+        key = cursor.isoformat()
+        day_counts = counts.get(key, {"active": 0, "typing": 0, "inactive": 0})
+        items.append(
+            {
+                "date": key,
+                "active": day_counts["active"],
+                "typing": day_counts["typing"],
+                "inactive": day_counts["inactive"],
+            }
+        )
+        cursor += timedelta(days=1)
+    return items
+
+
+@traced
 def heatmap(days: int | None = None, year: int | None = None) -> dict:
     years = available_years()
     if year is not None:
         start_date = date(year, 1, 1)
         end_date = date(year, 12, 31)
         start_str = start_date.isoformat()
-        end_str = end_date.isoformat()
+        end_str = (end_date + timedelta(days=1)).isoformat()
 
         with get_connection() as conn:
             rows = conn.execute(
                 """
                 SELECT date(created_at) AS day, event_type, COUNT(*) AS total
                 FROM vscode_activity
-                WHERE date(created_at) BETWEEN ? AND ?
+                WHERE created_at >= ? AND created_at < ?
                 GROUP BY day, event_type
                 ORDER BY day ASC
                 """,
                 (start_str, end_str),
             ).fetchall()
 
-        counts: dict[str, dict[str, int]] = {}
-        for row in rows:
-            day = row["day"]
-            if day not in counts:
-                counts[day] = {"active": 0, "typing": 0, "inactive": 0}
-            counts[day][row["event_type"]] = int(row["total"])
-
-        items: list[dict] = []
-        cursor = start_date
-        while cursor <= end_date:
-            key = cursor.isoformat()
-            day_counts = counts.get(key, {"active": 0, "typing": 0, "inactive": 0})
-            items.append(
-                {
-                    "date": key,
-                    "active": day_counts["active"],
-                    "typing": day_counts["typing"],
-                    "inactive": day_counts["inactive"],
-                }
-            )
-            cursor += timedelta(days=1)
-
+        items = _day_items(rows, start_date, end_date)
         return {"year": year, "items": items, "available_years": years}
 
     if days is None:
@@ -168,60 +180,46 @@ def heatmap(days: int | None = None, year: int | None = None) -> dict:
             """
             SELECT date(created_at) AS day, event_type, COUNT(*) AS total
             FROM vscode_activity
-            WHERE date(created_at) >= ?
+            WHERE created_at >= ?
             GROUP BY day, event_type
             ORDER BY day ASC
             """,
             (start_str,),
         ).fetchall()
 
-    counts: dict[str, dict[str, int]] = {}
-    for row in rows:
-        day = row["day"]
-        if day not in counts:
-            counts[day] = {"active": 0, "typing": 0, "inactive": 0}
-        counts[day][row["event_type"]] = int(row["total"])
-
-    items: list[dict] = []
-    cursor = start_date
-    while cursor <= now:
-        key = cursor.isoformat()
-        day_counts = counts.get(key, {"active": 0, "typing": 0, "inactive": 0})
-        items.append(
-            {
-                "date": key,
-                "active": day_counts["active"],
-                "typing": day_counts["typing"],
-                "inactive": day_counts["inactive"],
-            }
-        )
-        cursor += timedelta(days=1)
+    items = _day_items(rows, start_date, now)
 
     return {"days": days, "items": items, "available_years": years}
 
 
+@traced
 def available_years() -> list[int]:
-    with get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT DISTINCT strftime('%Y', created_at) AS year
-            FROM vscode_activity
-            ORDER BY year ASC
-            """
-        ).fetchall()
-
+    # Hop from year to year along the created_at index instead of reading every row.
     years: list[int] = []
-    for row in rows:
-        value = row["year"]
-        if not value:
-            continue
-        try:
-            years.append(int(value))
-        except (TypeError, ValueError):
-            continue
-    return sorted(set(years))
-
-
+    lower = ""
+    with get_connection() as conn:
+        while True:
+            row = conn.execute(
+                """
+                SELECT created_at FROM vscode_activity
+                WHERE created_at >= ?
+                ORDER BY created_at
+                LIMIT 1
+                """,
+                (lower,),
+            ).fetchone()
+            if row is None:
+                break
+            prefix = row["created_at"][:4]
+            if len(prefix) == 4 and prefix.isdigit():
+                years.append(int(prefix))
+                lower = f"{int(prefix) + 1:04d}"
+            else:
+                lower = prefix + "\U0010ffff"
+    return years
+
+
+@traced
 def timeline(date_str: str, bucket_minutes: int) -> dict:
     try:
         target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
@@ -242,9 +240,9 @@ def timeline(date_str: str, bucket_minutes: int) -> dict:
             """
             SELECT created_at, event_type
             FROM vscode_activity
-            WHERE date(created_at) = ?
+            WHERE created_at >= ? AND created_at < ?
             """,
-            (target_date.isoformat(),),
+            (target_date.isoformat(), (target_date + timedelta(days=1)).isoformat()),
         ).fetchall()
 
     for row in rows:
@@ -0,0 +1,455 @@
+"""Filesystem-watch driven git summaries pushed to subscribers.
+
+Registered repos are watched with inotify where available (``.git`` plus the
+working tree) and otherwise polled with ``git status`` and backoff. Bursts of changes are
+debounced, only the affected repo is recomputed on the git executor, and the
+new summary is published to every subscriber when it differs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.db import get_connection
+from app.services import git_service
+from app.utils import inotify
+from app.utils.time_utils import now_iso
+from packages.core import git_utils
+
+
+DEBOUNCE_SECONDS = 0.3
+MAX_DELAY_SECONDS = 2.0
+POLL_MIN_SECONDS = 1.0
+POLL_MAX_SECONDS = 30.0
+LOOP_MAX_SECONDS = 1.0
+MAX_WATCHES_PER_REPO = 4096
+QUEUE_SIZE = 256
+
+
+@dataclass
+class _Repo:
+    path: Path
+    git_dir: Path
+    wds: set[int] = field(default_factory=set)
+    polling: bool = False
+    poll_interval: float = POLL_MIN_SECONDS
+    next_poll: float = 0.0
+    signature: str | None = None
+    first_change: float | None = None
+    last_change: float | None = None
+    tree_changed: bool = False
+    refreshing: bool = False
+    meta_key: tuple | None = None
+    summary: dict | None = None
+    updated_at: str | None = None
+    refreshed: float = 0.0
+    # Set when some directories (PRUNE_DIRS) are not watched, so the summary
+    # only stays fresh for git_service.CACHE_TTL_SECONDS.
+    partial: bool = False
+
+    @property
+    def pending(self) -> bool:
+        return self.refreshing or self.last_change is not None or self.summary is None
+
+    def mark(self, now: float, tree: bool) -> None:
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+        self.tree_changed = self.tree_changed or tree
+
+
+_lock = threading.RLock()
+_registering = threading.Lock()
+_repos: dict[str, _Repo] = {}
+_wd_map: dict[int, tuple[str, Path, bool]] = {}
+_subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+_notifier: inotify.Inotify | None = None
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def _key(repo_path: str) -> str:
+    return str(Path(repo_path).resolve())
+
+
+def _tree_dirs(root: Path, pruned: list[Path] | None = None):
+    """Directories of the working tree under ``root``.
+
+    Skips ``.git``, PRUNE_DIRS (collected into ``pruned`` when given) and
+    nested repositories, which get their own watches when registered: inotify
+    hands out one descriptor per directory, so two repos must not share any.
+    """
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        yield current
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name == ".git":
+                continue
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                path = Path(entry.path)
+                if entry.name in git_service.PRUNE_DIRS:
+                    if pruned is not None:
+                        pruned.append(path)
+                    continue
+                if os.path.lexists(path / ".git"):
+                    continue
+            except OSError:
+                continue
+            pending.append(path)
+
+
+def _signature(repo: _Repo) -> str | None:
+    """Fingerprint for polling mode, from ``git status``.
+
+    git answers from its index stat cache, so this is much cheaper than
+    stat-ing every file in the tree ourselves. A failed or slow status keeps
+    the previous fingerprint.
+    """
+    try:
+        return git_service.status_digest(repo.path)
+    except (RuntimeError, OSError):
+        return repo.signature
+
+
+def _add_watch(
+    key: str,
+    repo: _Repo,
+    directory: Path,
+    in_git: bool,
+    wd_map: dict[int, tuple[str, Path, bool]],
+) -> None:
+    if len(repo.wds) >= MAX_WATCHES_PER_REPO:
+        raise OSError("too many directories to watch")
+    wd = _notifier.add_watch(str(directory))
+    repo.wds.add(wd)
+    wd_map[wd] = (key, directory, in_git)
+
+
+def _remove_watches(repo: _Repo) -> None:
+    for wd in repo.wds:
+        _wd_map.pop(wd, None)
+        if _notifier is not None:
+            _notifier.rm_watch(wd)
+    repo.wds.clear()
+
+
+def _start_watching(key: str, repo: _Repo) -> dict[int, tuple[str, Path, bool]]:
+    """Attach inotify watches, falling back to polling when that is not possible.
+
+    Runs without ``_lock``: the returned watches go into ``_wd_map`` when the
+    repo is published. Events that arrive before then are dropped, and the
+    first refresh after publishing reads the repo fresh anyway.
+    """
+    watches: dict[int, tuple[str, Path, bool]] = {}
+    if _notifier is not None:
+        try:
+            _add_watch(key, repo, repo.git_dir, True, watches)
+            refs = git_utils.common_dir(repo.git_dir) / "refs"
+            for directory, _, _ in os.walk(refs):
+                _add_watch(key, repo, Path(directory), True, watches)
+            pruned: list[Path] = []
+            for directory in _tree_dirs(repo.path, pruned):
+                _add_watch(key, repo, directory, False, watches)
+            repo.partial = bool(pruned)
+            return watches
+        except OSError:
+            _remove_watches(repo)
+            watches.clear()
+    repo.polling = True
+    repo.signature = _signature(repo)
+    repo.next_poll = time.monotonic() + repo.poll_interval
+    return watches
+
+
+def _ensure_thread() -> None:
+    global _notifier, _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    if _notifier is None and inotify.available():
+        try:
+            _notifier = inotify.Inotify()
+        except OSError:
+            _notifier = None
+    _thread = threading.Thread(target=_loop, name="ddc-git-watch", daemon=True)
+    _thread.start()
+
+
+def _register(key: str) -> _Repo | None:
+    git_dir = git_utils.find_git_dir(Path(key))
+    if git_dir is None:
+        return None
+    # Registrations are serialised among themselves (two walks of one tree
+    # would share inotify watch descriptors), but the walk happens outside
+    # _lock so the watch loop and cached() keep running meanwhile.
+    with _registering:
+        with _lock:
+            repo = _repos.get(key)
+            if repo is not None:
+                return repo
+            _ensure_thread()
+        repo = _Repo(path=Path(key), git_dir=git_dir)
+        watches = _start_watching(key, repo)
+        with _lock:
+            _wd_map.update(watches)
+            _repos[key] = repo
+    return repo
+
+
+def watch(repo_path: str) -> dict:
+    """Start watching a repo and return its current summary."""
+    path = Path(repo_path)
+    if not path.exists() or not path.is_dir():
+        return {"error": "Repo path tidak ditemukan."}
+    key = _key(repo_path)
+    repo = _register(key)
+    if repo is None:
+        return {"error": "Bukan repository git."}
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO git_watched_repos (path, added_at) VALUES (?, ?)",
+            (key, now_iso()),
+        )
+        conn.commit()
+    if repo.summary is None:
+        _refresh(key)
+    return _describe(key, repo)
+
+
+def unwatch(repo_path: str) -> dict:
+    key = _key(repo_path)
+    with _lock:
+        repo = _repos.pop(key, None)
+        if repo is not None:
+            _remove_watches(repo)
+    with get_connection() as conn:
+        deleted = conn.execute("DELETE FROM git_watched_repos WHERE path = ?", (key,)).rowcount
+        conn.commit()
+    if repo is None and not deleted:
+        return {"error": "Repo tidak sedang dipantau."}
+    return {"repo": key, "watching": False}
+
+
+def restore() -> int:
+    """Re-register the repos persisted by earlier ``watch`` calls.
+
+    Runs on a background thread at startup; stops early on ``shutdown``.
+    """
+    with get_connection() as conn:
+        rows = conn.execute("SELECT path FROM git_watched_repos ORDER BY path").fetchall()
+    restored = 0
+    for row in rows:
+        if _stop.is_set():
+            break
+        repo = _register(row["path"])
+        if repo is not None:
+            with _lock:
+                repo.mark(time.monotonic(), tree=True)
+            restored += 1
+    return restored
+
+
+def cached(repo_path: str) -> dict | None:
+    """Return the pushed summary for a watched repo, or None if not watched or stale."""
+    with _lock:
+        repo = _repos.get(_key(repo_path))
+        if repo is None or repo.pending:
+            return None
+        if repo.partial and time.monotonic() - repo.refreshed >= git_service.CACHE_TTL_SECONDS:
+            # Let the watcher recompute it; the caller reads git meanwhile.
+            repo.mark(time.monotonic(), tree=True)
+            return None
+        return dict(repo.summary)
+
+
+def _describe(key: str, repo: _Repo) -> dict:
+    return {
+        "repo": key,
+        "mode": "poll" if repo.polling else "inotify",
+        "pending": repo.pending,
+        "summary": dict(repo.summary) if repo.summary is not None else None,
+        "updated_at": repo.updated_at,
+    }
+
+
+def watched() -> list[dict]:
+    with _lock:
+        return [_describe(key, repo) for key, repo in sorted(_repos.items())]
+
+
+def subscribe() -> asyncio.Queue:
+    """Register a queue on the running event loop that receives summary updates."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    with _lock:
+        _subscribers.add((asyncio.get_running_loop(), queue))
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue) -> None:
+    with _lock:
+        for item in [item for item in _subscribers if item[1] is queue]:
+            _subscribers.discard(item)
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    if queue.full():
+        # Slow consumer: drop the oldest update rather than block the watcher.
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+def _publish(event: dict) -> None:
+    with _lock:
+        subscribers = list(_subscribers)
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(_offer, queue, event)
+        except RuntimeError:
+            unsubscribe(queue)
+
+
+def _refresh(key: str) -> None:
+    with _lock:
+        repo = _repos.get(key)
+        if repo is None:
+            return
+        tree_changed = repo.tree_changed or repo.summary is None
+        repo.tree_changed = False
+    try:
+        # Our own status call rewrites .git/index; skip events that left metadata unchanged.
+        if not tree_changed and git_service.metadata_key(repo.git_dir) == repo.meta_key:
+            return
+        git_service.clear_cache(key)
+        result = git_service.summary(key)
+        meta_key = git_service.metadata_key(repo.git_dir)
+    except Exception as exc:  # noqa: BLE001
+        result, meta_key = {"ok": False, "message": str(exc)}, None
+    finally:
+        with _lock:
+            repo.refreshing = False
+    with _lock:
+        if _repos.get(key) is not repo:
+            return
+        changed = result != repo.summary
+        repo.summary = result
+        repo.meta_key = meta_key
+        repo.updated_at = now_iso()
+        repo.refreshed = time.monotonic()
+        event = _describe(key, repo)
+    if changed:
+        _publish(event)
+
+
+def _handle_event(wd: int, mask: int, name: str, now: float) -> None:
+    if mask & inotify.IN_Q_OVERFLOW:
+        for repo in _repos.values():
+            repo.mark(now, tree=True)
+        return
+    target = _wd_map.get(wd)
+    if target is None:
+        return
+    key, directory, in_git = target
+    repo = _repos.get(key)
+    if repo is None:
+        return
+    if mask & inotify.IN_IGNORED:
+        _wd_map.pop(wd, None)
+        repo.wds.discard(wd)
+        return
+    if name.endswith(".lock"):
+        return
+    if in_git and directory == repo.git_dir and (mask & inotify.IN_ISDIR):
+        return
+    if not in_git and mask & inotify.IN_ISDIR and mask & (inotify.IN_CREATE | inotify.IN_MOVED_TO):
+        if name in git_service.PRUNE_DIRS:
+            repo.partial = True
+        elif name != ".git" and not os.path.lexists(directory / name / ".git"):
+            try:
+                for sub in _tree_dirs(directory / name):
+                    _add_watch(key, repo, sub, False, _wd_map)
+            except OSError:
+                _remove_watches(repo)
+                repo.polling = True
+                repo.next_poll = now
+    repo.mark(now, tree=not in_git)
+
+
+def _poll(polled: list[tuple[_Repo, str]], now: float) -> None:
+    for repo, signature in polled:
+        if signature != repo.signature:
+            repo.signature = signature
+            repo.poll_interval = POLL_MIN_SECONDS
+            repo.mark(now, tree=True)
+        else:
+            repo.poll_interval = min(repo.poll_interval * 2, POLL_MAX_SECONDS)
+        repo.next_poll = now + repo.poll_interval
+
+
+def _flush(now: float) -> None:
+    for key, repo in list(_repos.items()):
+        if repo.last_change is None or repo.refreshing:
+            continue
+        quiet = now - repo.last_change >= DEBOUNCE_SECONDS
+        overdue = now - repo.first_change >= MAX_DELAY_SECONDS
+        if quiet or overdue:
+            repo.first_change = repo.last_change = None
+            repo.refreshing = True
+            git_service.submit(_refresh, key)
+
+
+def _next_timeout(now: float) -> float:
+    deadlines = [now + LOOP_MAX_SECONDS]
+    for repo in _repos.values():
+        if repo.polling:
+            deadlines.append(repo.next_poll)
+        if repo.last_change is not None and not repo.refreshing:
+            deadlines.append(min(repo.last_change + DEBOUNCE_SECONDS, repo.first_change + MAX_DELAY_SECONDS))
+    return max(0.0, min(deadlines) - now)
+
+
+def _loop() -> None:
+    while not _stop.is_set():
+        with _lock:
+            timeout = _next_timeout(time.monotonic())
+        notifier = _notifier
+        events = notifier.read(timeout) if notifier is not None else []
+        if notifier is None:
+            _stop.wait(timeout)
+        now = time.monotonic()
+        with _lock:
+            due = [repo for repo in _repos.values() if repo.polling and repo.next_poll <= now]
+        # Walk polled trees outside the lock so cached() reads never wait on it.
+        polled = [(repo, _signature(repo)) for repo in due]
+        with _lock:
+            now = time.monotonic()
+            for wd, mask, name in events:
+                _handle_event(wd, mask, name, now)
+            _poll(polled, now)
+            _flush(now)
+
+
+def shutdown() -> None:
+    global _notifier, _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=LOOP_MAX_SECONDS * 2)
+        _thread = None
+    with _lock:
+        for repo in _repos.values():
+            _remove_watches(repo)
+        _repos.clear()
+        if _notifier is not None:
+            _notifier.close()
+            _notifier = None
@@ -0,0 +1,132 @@
+"""Contribution calendar statistics (totals, streaks, distributions)."""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Any
+
+
+def _dense_counts(year: int, days: dict[str, int]) -> array:
+    start = date(year, 1, 1)
+    size = (date(year + 1, 1, 1) - start).days
+    counts = array("q", bytes(8 * size))
+    for key, count in days.items():
+        index = (date.fromisoformat(key) - start).days
+        if 0 <= index < size:
+            counts[index] = count
+    return counts
+
+
+def _runs(active: list[bool]) -> list[tuple[bool, int]]:
+    return [(flag, sum(1 for _ in group)) for flag, group in groupby(active)]
+
+
+def year_stats(year: int, days: dict[str, int], today: date | None = None) -> dict[str, Any]:
+    """Compute stats for one calendar year from ``{"YYYY-MM-DD": count}``.
+
+    Days are laid out in a dense per-year array so the distributions are
+    strided/sliced sums and streaks come from a single run-length pass.
+    Only days up to ``today`` count towards streaks, and ``current_streak``
+    is non-zero only when the run reaches today or yesterday, so a past
+    year has none unless ``today`` is the following 1 January.
+    """
+    today = today or date.today()
+    start = date(year, 1, 1)
+    counts = _dense_counts(year, days)
+    if today.year > year:
+        elapsed = len(counts)
+    elif today.year == year:
+        elapsed = (today - start).days + 1
+    else:
+        elapsed = 0
+
+    active = [count > 0 for count in counts[:elapsed]]
+    runs = _runs(active)
+    longest = max((length for flag, length in runs if flag), default=0)
+    leading = runs[0][1] if runs and runs[0][0] else 0
+    trailing = runs[-1][1] if runs and runs[-1][0] else 0
+    current = trailing
+    current_end = elapsed
+    if today.year > year and today != date(year + 1, 1, 1):
+        current = 0
+    elif elapsed and today.year == year and not active[-1]:
+        # Today without contributions yet does not break yesterday's streak.
+        earlier = _runs(active[:-1])
+        current = earlier[-1][1] if earlier and earlier[-1][0] else 0
+        current_end = elapsed - 1
+
+    offset = start.weekday()
+    weekdays = [sum(counts[(weekday - offset) % 7 :: 7]) for weekday in range(7)]
+    month_starts = [(date(year, month, 1) - start).days for month in range(1, 13)]
+    bounds = [*month_starts, len(counts)]
+    months = [sum(counts[bounds[idx] : bounds[idx + 1]]) for idx in range(12)]
+
+    best_index = max(range(len(counts)), key=counts.__getitem__)
+    best_count = counts[best_index]
+    return {
+        "year": year,
+        "days": elapsed,
+        "total": sum(counts),
+        "active_days": sum(active),
+        "longest_streak": longest,
+        "current_streak": current,
+        "leading_streak": leading,
+        "trailing_streak": trailing,
+        # Also true on an empty 1 January, so yesterday's run carries over.
+        "current_from_start": elapsed > 0 and current == current_end,
+        "best_day": {
+            "date": (start + timedelta(days=best_index)).isoformat() if best_count else None,
+            "count": best_count,
+        },
+        "weekdays": weekdays,
+        "months": months,
+    }
+
+
+def combine(stats: list[dict[str, Any]]) -> dict[str, Any]:
+    """Merge per-year stats, joining streaks that cross consecutive years."""
+    ordered = sorted(stats, key=lambda item: item["year"])
+    combined: dict[str, Any] = {
+        "years": [item["year"] for item in ordered],
+        "total": 0,
+        "active_days": 0,
+        "longest_streak": 0,
+        "current_streak": 0,
+        "best_day": {"date": None, "count": 0},
+        "weekdays": [0] * 7,
+        "months": [0] * 12,
+    }
+    carry = 0
+    previous_year = None
+    for item in ordered:
+        combined["total"] += item["total"]
+        combined["active_days"] += item["active_days"]
+        combined["weekdays"] = [a + b for a, b in zip(combined["weekdays"], item["weekdays"])]
+        combined["months"] = [a + b for a, b in zip(combined["months"], item["months"])]
+        if item["best_day"]["count"] > combined["best_day"]["count"]:
+            combined["best_day"] = dict(item["best_day"])
+
+        if previous_year is None or item["year"] != previous_year + 1:
+            carry = 0
+        joined = carry + item["leading_streak"] if item["leading_streak"] else 0
+        combined["longest_streak"] = max(combined["longest_streak"], item["longest_streak"], joined)
+        full_year = item["days"] > 0 and item["leading_streak"] == item["days"]
+        carry = carry + item["days"] if full_year else item["trailing_streak"]
+        previous_year = item["year"]
+
+    if ordered:
+        latest = ordered[-1]
+        current = latest["current_streak"]
+        if latest["current_from_start"]:
+            expected = latest["year"] - 1
+            for item in reversed(ordered[:-1]):
+                if item["year"] != expected:
+                    break
+                current += item["trailing_streak"]
+                if item["leading_streak"] != item["days"]:
+                    break
+                expected -= 1
+        combined["current_streak"] = current
+    return combined
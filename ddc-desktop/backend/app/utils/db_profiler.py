@@ -0,0 +1,251 @@
+"""Opt-in SQLite query profiler.
+
+Enabled with ``DDC_DB_PROFILE=1`` (or ``enable()``/``PUT /debug/db``), every
+connection from ``get_connection`` gets a trace callback (expanded statement
+text) and a progress handler (VM step count). Each statement is recorded
+with its duration and row count; anything slower than ``SLOW_QUERY_MS`` is
+logged. ``full_scans`` replays the recorded statements through
+``EXPLAIN QUERY PLAN`` so tests can fail on index regressions.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+
+SLOW_QUERY_MS = float(os.environ.get("DDC_SLOW_QUERY_MS", "100"))
+# The progress handler fires every this many SQLite VM instructions.
+PROGRESS_STEPS = 100
+RECENT_SIZE = 200
+
+logger = logging.getLogger(__name__)
+
+_enabled = os.environ.get("DDC_DB_PROFILE", "") not in ("", "0")
+_lock = threading.Lock()
+_recent: deque[dict[str, Any]] = deque(maxlen=RECENT_SIZE)
+_statements: dict[str, dict[str, Any]] = {}
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True) -> bool:
+    """Toggle profiling for connections opened from now on."""
+    global _enabled
+    _enabled = on
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _recent.clear()
+        _statements.clear()
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+class _Query:
+    __slots__ = ("sql", "params", "function", "expanded", "seconds", "rows", "steps")
+
+    def __init__(self, sql: str, params: Any, function: str) -> None:
+        self.sql = _normalize(sql)
+        self.params = params
+        self.function = function
+        self.expanded: str | None = None
+        self.seconds = 0.0
+        self.rows = 0
+        self.steps = 0
+
+
+def _finish(query: _Query) -> None:
+    ms = query.seconds * 1000
+    entry = {
+        "sql": query.sql,
+        "function": query.function,
+        "ms": round(ms, 3),
+        "rows": query.rows,
+        "vm_steps": query.steps * PROGRESS_STEPS,
+    }
+    with _lock:
+        _recent.append(entry)
+        stats = _statements.get(query.sql)
+        if stats is None:
+            stats = _statements[query.sql] = {
+                "sql": query.sql,
+                "function": query.function,
+                "params": query.params,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": 0,
+            }
+        stats["count"] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        stats["rows"] += query.rows
+    if ms >= SLOW_QUERY_MS:
+        logger.warning(
+            "slow query %.1f ms in %s (%d rows): %s",
+            ms,
+            query.function,
+            query.rows,
+            query.expanded or query.sql,
+        )
+
+
+class _Cursor(sqlite3.Cursor):
+    """Cursor that adds fetch time and fetched rows to its query record."""
+
+    _query: _Query | None = None
+
+    def _track(self, fetch, *args):
+        query = self._query
+        if query is None:
+            return fetch(*args)
+        start = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            query.seconds += time.perf_counter() - start
+
+    def _done(self) -> None:
+        query, self._query = self._query, None
+        if query is not None:
+            _finish(query)
+
+    def fetchone(self):
+        row = self._track(super().fetchone)
+        if row is None:
+            self._done()
+        elif self._query is not None:
+            self._query.rows += 1
+        return row
+
+    def fetchmany(self, size: int | None = None):
+        rows = self._track(super().fetchmany, self.arraysize if size is None else size)
+        if self._query is not None:
+            self._query.rows += len(rows)
+        if not rows:
+            self._done()
+        return rows
+
+    def fetchall(self):
+        rows = self._track(super().fetchall)
+        if self._query is not None:
+            self._query.rows += len(rows)
+        self._done()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+
+class Profile:
+    """Per-connection profiler state, attached by ``get_connection``."""
+
+    def __init__(self, conn: sqlite3.Connection, function: str) -> None:
+        self.function = function
+        self.current: _Query | None = None
+        self.open: list[_Cursor] = []
+        # Callbacks close over the profile, not the connection, so no cycle.
+        conn.set_trace_callback(self._on_trace)
+        conn.set_progress_handler(self._on_progress, PROGRESS_STEPS)
+
+    def _on_trace(self, statement: str) -> None:
+        if self.current is not None and self.current.expanded is None:
+            self.current.expanded = statement
+
+    def _on_progress(self) -> int:
+        if self.current is not None:
+            self.current.steps += 1
+        return 0
+
+    def execute(self, conn: sqlite3.Connection, sql: str, parameters: Any, many: bool = False) -> sqlite3.Cursor:
+        query = _Query(sql, None if many else parameters, self.function)
+        self.current = query
+        cursor = conn.cursor(_Cursor)
+        start = time.perf_counter()
+        try:
+            if many:
+                cursor.executemany(sql, parameters)
+            else:
+                cursor.execute(sql, parameters)
+        finally:
+            query.seconds += time.perf_counter() - start
+        if cursor.description is None:
+            query.rows = max(cursor.rowcount, 0)
+            _finish(query)
+        else:
+            cursor._query = query
+            self.open.append(cursor)
+        return cursor
+
+    def close(self) -> None:
+        """Record queries whose cursors were not read to the end."""
+        for cursor in self.open:
+            cursor._done()
+        self.open.clear()
+        self.current = None
+
+
+def report(limit: int = 20) -> dict[str, Any]:
+    with _lock:
+        statements = sorted(_statements.values(), key=lambda item: item["total_ms"], reverse=True)
+        recent = list(_recent)
+    return {
+        "enabled": _enabled,
+        "slow_query_ms": SLOW_QUERY_MS,
+        "statements": [
+            {key: value for key, value in item.items() if key != "params"}
+            | {"total_ms": round(item["total_ms"], 3), "max_ms": round(item["max_ms"], 3)}
+            for item in statements[:limit]
+        ],
+        "recent": recent[-limit:],
+    }
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: Any = None) -> list[str]:
+    """Return the ``EXPLAIN QUERY PLAN`` detail lines for a statement."""
+    if params is None:
+        params = [None] * sql.count("?")
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+def full_scans(
+    conn: sqlite3.Connection,
+    tables: Iterable[str],
+    allow: Iterable[str] = (),
+) -> list[dict[str, Any]]:
+    """Recorded statements whose plan scans one of ``tables``.
+
+    ``allow`` holds statements (whitespace-insensitive) that scan on purpose.
+    """
+    tables = set(tables)
+    allowed = {_normalize(sql) for sql in allow}
+    with _lock:
+        statements = [dict(item) for item in _statements.values()]
+    offenders = []
+    for item in statements:
+        if item["sql"] in allowed or item["sql"].upper().startswith(("EXPLAIN", "PRAGMA")):
+            continue
+        plan = explain(conn, item["sql"], item["params"])
+        scans = [line for line in plan if (match := _SCAN_RE.match(line)) and match.group(1) in tables]
+        if scans:
+            offenders.append({"sql": item["sql"], "function": item["function"], "plan": plan})
+    return offenders
@@ -0,0 +1,451 @@
+"""Pooled outbound HTTP client shared by the GitHub and Spotify services.
+
+Built on ``http.client`` so keep-alive connections can be reused per host
+(urllib opens a fresh TCP+TLS connection for every request). Adds capped
+per-host concurrency, jittered exponential backoff for idempotent requests,
+redirect handling, streaming bodies and per-host latency/error counters.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import random
+import ssl
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from app.utils import metrics, tracing
+
+
+DEFAULT_TIMEOUT = 10.0
+MAX_CONNECTIONS_PER_HOST = 6
+MAX_IDLE_PER_HOST = 4
+IDLE_TIMEOUT_SECONDS = 60.0
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 8.0
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+USER_AGENT = "DDC-Desktop"
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Dropped when a redirect leaves the original scheme and host.
+CREDENTIAL_HEADERS = {"authorization", "cookie", "proxy-authorization"}
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+_OUTBOUND_SECONDS = metrics.histogram(
+    "ddc_outbound_request_seconds",
+    "Outbound HTTP attempt latency by host.",
+    ("host",),
+)
+
+
+class HttpError(Exception):
+    """Base error for outbound requests."""
+
+    status: int | None = None
+
+
+class HttpConnectionError(HttpError):
+    """The request could not be sent or no response arrived (DNS, TLS, timeout)."""
+
+
+class HttpStatusError(HttpError):
+    """The server answered with a non-2xx status."""
+
+    def __init__(self, status: int, reason: str, body: bytes, headers: http.client.HTTPMessage) -> None:
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+@dataclass
+class Response:
+    status: int
+    headers: http.client.HTTPMessage
+    body: bytes
+    url: str
+
+    def text(self) -> str:
+        return self.body.decode(self.headers.get_content_charset() or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+class StreamResponse:
+    """Response whose body is read incrementally; the connection is pooled once drained."""
+
+    def __init__(self, pool: "_HostPool", conn, resp, url: str) -> None:
+        self.status = resp.status
+        self.headers = resp.headers
+        self.url = url
+        self._pool = pool
+        self._conn = conn
+        self._resp = resp
+        self._done = False
+
+    def iter_chunks(self, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        while True:
+            chunk = self._resp.read(size)
+            if not chunk:
+                self._release(reuse=True)
+                return
+            yield chunk
+
+    def read(self) -> bytes:
+        return b"".join(self.iter_chunks())
+
+    def _release(self, reuse: bool) -> None:
+        if self._done:
+            return
+        self._done = True
+        self._pool.release(self._conn, reuse=reuse and not self._resp.will_close)
+
+    def close(self) -> None:
+        if self._done:
+            return
+        # An unread body cannot be skipped on a keep-alive socket: drain it
+        # when small, otherwise drop the connection.
+        length = self._resp.length
+        if length is not None and length <= CHUNK_SIZE:
+            try:
+                self._resp.read()
+            except (OSError, http.client.HTTPException):
+                self._release(reuse=False)
+                return
+        self._release(reuse=self._resp.isclosed())
+
+
+class _HostStats:
+    __slots__ = ("requests", "errors", "retries", "opened", "reused", "latency_sum", "latency_max", "statuses")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.opened = 0
+        self.reused = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.statuses: dict[int, int] = {}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "connections_opened": self.opened,
+            "connections_reused": self.reused,
+            "latency_ms_avg": round(1000 * self.latency_sum / self.requests, 2) if self.requests else 0.0,
+            "latency_ms_max": round(1000 * self.latency_max, 2),
+            "latency_seconds_sum": round(self.latency_sum, 6),
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+        }
+
+
+class _HostPool:
+    def __init__(self, scheme: str, host: str, port: int, proxy: tuple[str, int] | None) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.proxy = proxy
+        self.idle: deque[tuple[Any, float]] = deque()
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        self.stats = _HostStats()
+        self.stats_lock = threading.Lock()
+        self.key = f"{scheme}://{host}:{port}"
+
+    def record(self, latency: float, status: int | None = None, error: bool = False, retry: bool = False) -> None:
+        with self.stats_lock:
+            stats = self.stats
+            stats.requests += 1
+            stats.latency_sum += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            if status is not None:
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if error:
+                stats.errors += 1
+            if retry:
+                stats.retries += 1
+        _OUTBOUND_SECONDS.observe(latency, self.key)
+
+    def _new_connection(self, timeout: float, context: ssl.SSLContext):
+        host, port = self.proxy or (self.host, self.port)
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=context)
+            if self.proxy:
+                conn.set_tunnel(self.host, self.port)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        with self.stats_lock:
+            self.stats.opened += 1
+        return conn
+
+    def acquire(self, timeout: float, context: ssl.SSLContext) -> tuple[Any, bool]:
+        if not self.slots.acquire(timeout=timeout):
+            raise HttpConnectionError(f"Too many concurrent requests to {self.host}")
+        now = time.monotonic()
+        with self.lock:
+            while self.idle:
+                conn, since = self.idle.pop()
+                if now - since < IDLE_TIMEOUT_SECONDS:
+                    with self.stats_lock:
+                        self.stats.reused += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return self._new_connection(timeout, context), False
+
+    def release(self, conn, reuse: bool) -> None:
+        try:
+            if reuse:
+                with self.lock:
+                    self.idle.append((conn, time.monotonic()))
+                    while len(self.idle) > MAX_IDLE_PER_HOST:
+                        self.idle.popleft()[0].close()
+            else:
+                conn.close()
+        finally:
+            self.slots.release()
+
+    def close(self) -> None:
+        with self.lock:
+            while self.idle:
+                self.idle.pop()[0].close()
+
+
+def _origin(url: str) -> tuple[str, str]:
+    parts = urllib.parse.urlsplit(url)
+    return parts.scheme.lower(), parts.netloc.lower()
+
+
+def _backoff(attempt: int, retry_after: str | None) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    # Full jitter: spreads retries from concurrent callers.
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+class HttpClient:
+    def __init__(self) -> None:
+        self._pools: dict[tuple[str, str, int], _HostPool] = {}
+        self._lock = threading.Lock()
+        self._context = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+
+    def _pool(self, parsed: urllib.parse.SplitResult) -> _HostPool:
+        scheme = parsed.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise HttpConnectionError(f"Unsupported URL scheme: {parsed.scheme}")
+        host = parsed.hostname or ""
+        port = parsed.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool(scheme, host, port, self._proxy_for(scheme, host))
+                self._pools[key] = pool
+            return pool
+
+    def _proxy_for(self, scheme: str, host: str) -> tuple[str, int] | None:
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        parsed = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        return (parsed.hostname or "", parsed.port or 80)
+
+    def _send(self, pool: _HostPool, method: str, url: str, body: bytes | None, headers: dict, timeout: float):
+        """Send once and return ``(conn, response)``; retries a stale pooled socket once."""
+        if pool.proxy and pool.scheme == "http":
+            target = url
+        else:
+            parsed = urllib.parse.urlsplit(url)
+            target = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        for _ in range(2):
+            conn, reused = pool.acquire(timeout, self._context)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except _STALE_ERRORS as exc:
+                pool.release(conn, reuse=False)
+                if not reused:
+                    raise HttpConnectionError(str(exc) or exc.__class__.__name__) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                pool.release(conn, reuse=False)
+                raise HttpConnectionError(str(exc) or exc.__class__.__name__) from exc
+        raise HttpConnectionError(f"Connection to {pool.host} was closed")
+
+    @contextmanager
+    def stream(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        retry: bool | None = None,
+    ) -> Iterator[StreamResponse]:
+        """Open a request and yield a StreamResponse for a 2xx answer.
+
+        Non-2xx answers raise HttpStatusError. Idempotent methods (or
+        ``retry=True``) are retried on connection errors and 429/5xx.
+        """
+        with tracing.span("http.request", method=method.upper()) as span:
+            if span.recording:
+                parsed = urllib.parse.urlsplit(url)
+                span.set(host=parsed.netloc, path=parsed.path)
+            with self._stream(method, url, body, headers, timeout, retry) as streamed:
+                span.set(status=streamed.status)
+                yield streamed
+
+    @contextmanager
+    def _stream(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None,
+        headers: dict[str, str] | None,
+        timeout: float,
+        retry: bool | None,
+    ) -> Iterator[StreamResponse]:
+        method = method.upper()
+        retry = method in IDEMPOTENT_METHODS if retry is None else retry
+        merged = {"User-Agent": USER_AGENT, **(headers or {})}
+        attempt = 0
+        redirects = 0
+        while True:
+            pool = self._pool(urllib.parse.urlsplit(url))
+            started = time.perf_counter()
+            try:
+                conn, resp = self._send(pool, method, url, body, merged, timeout)
+            except HttpConnectionError:
+                retrying = retry and attempt < MAX_RETRIES
+                pool.record(time.perf_counter() - started, error=True, retry=retrying)
+                if not retrying:
+                    raise
+                time.sleep(_backoff(attempt, None))
+                attempt += 1
+                continue
+            streamed = StreamResponse(pool, conn, resp, url)
+            failed = resp.status >= 400
+            retrying = failed and retry and resp.status in RETRY_STATUSES and attempt < MAX_RETRIES
+            pool.record(time.perf_counter() - started, resp.status, error=failed, retry=retrying)
+
+            if resp.status in REDIRECT_STATUSES and redirects < MAX_REDIRECTS:
+                location = resp.headers.get("Location")
+                streamed.read()
+                if location:
+                    target = urllib.parse.urljoin(url, location)
+                    if _origin(target) != _origin(url):
+                        merged = {key: value for key, value in merged.items() if key.lower() not in CREDENTIAL_HEADERS}
+                    url = target
+                    if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                        method, body = "GET", None
+                    redirects += 1
+                    continue
+            if failed or resp.status in REDIRECT_STATUSES:
+                payload = streamed.read()
+                if retrying:
+                    time.sleep(_backoff(attempt, resp.headers.get("Retry-After")))
+                    attempt += 1
+                    continue
+                raise HttpStatusError(resp.status, resp.reason, payload, resp.headers)
+            try:
+                yield streamed
+            finally:
+                streamed.close()
+            return
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        retry: bool | None = None,
+    ) -> Response:
+        with self.stream(method, url, body, headers, timeout, retry) as resp:
+            return Response(resp.status, resp.headers, resp.read(), resp.url)
+
+    def get(self, url: str, headers: dict[str, str] | None = None, timeout: float = DEFAULT_TIMEOUT) -> Response:
+        return self.request("GET", url, headers=headers, timeout=timeout)
+
+    def post_form(
+        self,
+        url: str,
+        fields: dict[str, str],
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> Response:
+        data = urllib.parse.urlencode(fields).encode("utf-8")
+        merged = {"Content-Type": "application/x-www-form-urlencoded", **(headers or {})}
+        return self.request("POST", url, body=data, headers=merged, timeout=timeout)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            pools = list(self._pools.values())
+        return {pool.key: pool.stats.to_dict() for pool in pools}
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+
+_default: HttpClient | None = None
+_default_lock = threading.Lock()
+
+
+def client() -> HttpClient:
+    """Return the process-wide client."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient()
+        return _default
+
+
+def shutdown() -> None:
+    global _default
+    with _default_lock:
+        if _default is not None:
+            _default.close()
+            _default = None
+
+
+def _collect() -> Iterator[metrics.Sample]:
+    current = _default
+    stats = current.stats() if current is not None else {}
+    fields = (
+        ("connections_opened", "ddc_outbound_connections_opened_total", "Outbound connections opened."),
+        ("connections_reused", "ddc_outbound_connections_reused_total", "Outbound requests on a reused connection."),
+        ("errors", "ddc_outbound_errors_total", "Outbound attempts that failed or returned an error status."),
+        ("retries", "ddc_outbound_retries_total", "Outbound attempts that were retried."),
+    )
+    for field, name, help in fields:
+        yield (name, "counter", help, [({"host": host}, item[field]) for host, item in sorted(stats.items())])
+
+
+metrics.register_collector(_collect)
@@ -0,0 +1,37 @@
+"""Deferred module imports for route handlers."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    ``import_module`` takes the per-module import lock, so two threads
+    touching the stand-in at once still import the module only once.
+    """
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: ModuleType | None = None
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the module has been imported (here or anywhere else)."""
+        return self._name in sys.modules
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
@@ -0,0 +1,169 @@
+"""tracemalloc-based allocation tracking per request route.
+
+Off by default because tracemalloc slows every allocation; enable it with
+``DDC_MEMORY_TRACKING=1`` or ``PUT /debug/memory?enabled=true``. While on,
+the HTTP middleware records each request's peak traced memory above what
+was allocated when it started, per route template. Routes whose peak
+exceeds their budget are flagged and logged. Overlapping requests share the
+process-wide peak, so their figures are upper bounds.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import tracemalloc
+from typing import Any
+
+from app.utils import metrics
+
+
+FRAMES = int(os.environ.get("DDC_MEMORY_FRAMES", "10"))
+DEFAULT_BUDGET_BYTES = int(float(os.environ.get("DDC_MEMORY_BUDGET_MB", "32")) * 1024 * 1024)
+# Per-route budgets in bytes, keyed by route template.
+ROUTE_BUDGETS: dict[str, int] = {}
+# Allocations made by the tracking itself or by imports are noise.
+_IGNORED = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_routes: dict[str, dict[str, Any]] = {}
+_inflight = 0
+_baseline: tracemalloc.Snapshot | None = None
+_EXCEEDED = metrics.counter(
+    "ddc_memory_budget_exceeded_total",
+    "Requests whose peak traced allocation exceeded the route budget.",
+    ("route",),
+)
+
+
+def enabled() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def enable(on: bool = True) -> bool:
+    global _baseline
+    if on and not tracemalloc.is_tracing():
+        tracemalloc.start(FRAMES)
+    elif not on and tracemalloc.is_tracing():
+        tracemalloc.stop()
+        _baseline = None
+    return tracemalloc.is_tracing()
+
+
+def budget(route: str) -> int:
+    return ROUTE_BUDGETS.get(route, DEFAULT_BUDGET_BYTES)
+
+
+def begin() -> int | None:
+    """Start measuring a request; returns the traced size to subtract, or None."""
+    global _inflight
+    if not tracemalloc.is_tracing():
+        return None
+    with _lock:
+        if _inflight == 0:
+            # Only reset when nobody else is being measured against the peak.
+            tracemalloc.reset_peak()
+        _inflight += 1
+        return tracemalloc.get_traced_memory()[0]
+
+
+def end(start: int | None, route: str) -> None:
+    global _inflight
+    if start is None:
+        return
+    with _lock:
+        _inflight -= 1
+        if not tracemalloc.is_tracing():
+            return
+        peak = max(tracemalloc.get_traced_memory()[1] - start, 0)
+        stats = _routes.get(route)
+        if stats is None:
+            stats = _routes[route] = {"route": route, "requests": 0, "peak_max": 0, "peak_total": 0, "over_budget": 0}
+        stats["requests"] += 1
+        stats["peak_total"] += peak
+        stats["peak_max"] = max(stats["peak_max"], peak)
+        stats["peak_last"] = peak
+        limit = budget(route)
+        over = peak > limit
+        if over:
+            stats["over_budget"] += 1
+    if over:
+        _EXCEEDED.inc(route)
+        logger.warning("%s peaked at %.1f MiB, budget %.1f MiB", route, peak / 2**20, limit / 2**20)
+
+
+def routes() -> list[dict[str, Any]]:
+    with _lock:
+        items = [dict(item) for item in _routes.values()]
+    for item in items:
+        item["peak_avg"] = item["peak_total"] // item["requests"]
+        item["budget"] = budget(item["route"])
+        del item["peak_total"]
+    return sorted(items, key=lambda item: item["peak_max"], reverse=True)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces([tracemalloc.Filter(False, pattern) for pattern in _IGNORED])
+
+
+def _site(stat: tracemalloc.Statistic | tracemalloc.StatisticDiff) -> dict[str, Any]:
+    frame = stat.traceback[0]
+    item = {"site": f"{frame.filename}:{frame.lineno}", "size": stat.size, "count": stat.count}
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        item["size_diff"] = stat.size_diff
+        item["count_diff"] = stat.count_diff
+    return item
+
+
+def top_sites(limit: int = 20) -> list[dict[str, Any]]:
+    if not tracemalloc.is_tracing():
+        return []
+    return [_site(stat) for stat in _snapshot().statistics("lineno")[:limit]]
+
+
+def mark_baseline() -> bool:
+    """Remember the current allocations for later ``diff`` calls."""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        return False
+    _baseline = _snapshot()
+    return True
+
+
+def diff(limit: int = 20) -> list[dict[str, Any]] | None:
+    """Allocation sites that grew the most since ``mark_baseline``."""
+    if _baseline is None or not tracemalloc.is_tracing():
+        return None
+    stats = _snapshot().compare_to(_baseline, "lineno")
+    return [_site(stat) for stat in stats[:limit] if stat.size_diff > 0]
+
+
+def report(limit: int = 20, with_diff: bool = False) -> dict[str, Any]:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+    route_stats = routes()
+    return {
+        "enabled": tracing,
+        "traced_current": current,
+        "traced_peak": peak,
+        "default_budget": DEFAULT_BUDGET_BYTES,
+        "routes": route_stats,
+        "over_budget": [item["route"] for item in route_stats if item["over_budget"]],
+        "top": top_sites(limit),
+        "diff": diff(limit) if with_diff else None,
+    }
+
+
+def reset() -> None:
+    global _baseline
+    with _lock:
+        _routes.clear()
+    _baseline = None
+
+
+if os.environ.get("DDC_MEMORY_TRACKING", "") not in ("", "0"):
+    enable()
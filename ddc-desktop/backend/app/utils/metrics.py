@@ -0,0 +1,236 @@
+"""In-process metrics registry rendered in the Prometheus text format.
+
+Updates go to a per-thread shard, so the hot path takes no lock; a scrape
+merges the shards (and folds in the ones of finished threads). Values read
+while another thread is updating may lag by that one update, which is fine
+for monitoring.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A collector yields (name, type, help, [(labels, value), ...]) at scrape time.
+Sample = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+_lock = threading.Lock()
+_metrics: dict[str, "_Metric"] = {}
+_collectors: list[Callable[[], Iterable[Sample]]] = []
+_shards: list[tuple[threading.Thread, dict]] = []
+_retired: dict = {}
+_local = threading.local()
+
+
+def _shard() -> dict:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _lock:
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def _merge(into: dict, shard: dict) -> None:
+    for key, cell in list(shard.items()):
+        current = into.get(key)
+        if current is None:
+            into[key] = list(cell)
+        else:
+            for index, value in enumerate(list(cell)):
+                current[index] += value
+
+
+def _snapshot() -> dict:
+    merged: dict = {}
+    with _lock:
+        alive = []
+        for thread, shard in _shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                _merge(_retired, shard)
+        _shards[:] = alive
+        _merge(merged, _retired)
+        shards = [shard for _, shard in alive]
+    for shard in shards:
+        _merge(merged, shard)
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Iterable[tuple[str, str]]) -> str:
+    body = ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs)
+    return f"{{{body}}}" if body else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def _cell(self, label_values: tuple[str, ...], size: int) -> list:
+        shard = _shard()
+        key = (self.name, label_values)
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0] * size
+        return cell
+
+    def render(self, cells: dict[tuple[str, ...], list]) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, cell in sorted(cells.items()):
+            lines.append(f"{self.name}{_labels(zip(self.labels, label_values))} {_number(cell[0])}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._cell(label_values, 1)[0] += amount
+
+
+class Gauge(_Metric):
+    """A gauge moved with inc/dec; per-thread deltas add up to the value."""
+
+    kind = "gauge"
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._cell(label_values, 1)[0] += amount
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self._cell(label_values, 1)[0] -= amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # Layout: one count per bucket, then +Inf overflow, sum, count.
+        cell = self._cell(label_values, len(self.buckets) + 3)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def render(self, cells: dict[tuple[str, ...], list]) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, cell in sorted(cells.items()):
+            pairs = list(zip(self.labels, label_values))
+            running = 0
+            for bound, count in zip((*self.buckets, float("inf")), cell):
+                running += count
+                lines.append(f"{self.name}_bucket{_labels([*pairs, ('le', _number(bound))])} {running}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_number(round(cell[-2], 6))}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {cell[-1]}")
+        return lines
+
+
+def _register(cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"metric {name} already registered as {metric.kind}")
+        return metric
+
+
+def counter(name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+    return _register(Counter, name, help, labels)
+
+
+def gauge(name: str, help: str, labels: tuple[str, ...] = ()) -> Gauge:
+    return _register(Gauge, name, help, labels)
+
+
+def histogram(
+    name: str,
+    help: str,
+    labels: tuple[str, ...] = (),
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return _register(Histogram, name, help, labels, buckets)
+
+
+def register_collector(collector: Callable[[], Iterable[Sample]]) -> None:
+    with _lock:
+        if collector not in _collectors:
+            _collectors.append(collector)
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # ru_maxrss is the peak, in KiB on Linux; good enough off Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _process() -> Iterable[Sample]:
+    yield ("process_resident_memory_bytes", "gauge", "Resident set size.", [({}, _rss_bytes())])
+    yield ("process_cpu_seconds_total", "counter", "User and system CPU time.", [({}, time.process_time())])
+    yield ("process_threads", "gauge", "Live Python threads.", [({}, threading.active_count())])
+
+
+def render() -> str:
+    merged = _snapshot()
+    with _lock:
+        metrics = sorted(_metrics.values(), key=lambda metric: metric.name)
+        collectors = [_process, *_collectors]
+    by_metric: dict[str, dict[tuple[str, ...], list]] = {}
+    for (name, label_values), cell in merged.items():
+        by_metric.setdefault(name, {})[label_values] = cell
+    lines: list[str] = []
+    for metric in metrics:
+        lines.extend(metric.render(by_metric.get(metric.name, {})))
+    for collector in collectors:
+        for name, kind, help, samples in collector():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(sorted(labels.items()))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Drop recorded values (metric definitions and collectors stay)."""
+    with _lock:
+        for _, shard in _shards:
+            shard.clear()
+        _retired.clear()
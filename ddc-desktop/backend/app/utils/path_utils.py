@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 
@@ -10,13 +11,18 @@ def base_dir() -> Path:
 
 
 def data_dir() -> Path:
-    return base_dir() / "data"
+    override = os.environ.get("DDC_DATA_DIR")
+    return Path(override) if override else base_dir() / "data"
 
 
 def out_dir() -> Path:
     return base_dir() / "out"
 
 
+def templates_dir() -> Path:
+    return data_dir() / "templates"
+
+
 def db_path() -> Path:
     return data_dir() / "ddc.db"
 
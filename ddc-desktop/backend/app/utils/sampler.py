@@ -0,0 +1,135 @@
+"""On-demand sampling profiler for the running backend.
+
+A background thread reads every thread's stack through
+``sys._current_frames()`` at a fixed interval while requests keep being
+served. No tracing hooks are installed, so the cost is one stack walk per
+thread per tick. Results come as collapsed stacks (``a;b;c count``, the
+input of flamegraph.pl / speedscope) plus a top-functions table.
+
+Off by default: ``GET /debug/profile`` answers 404 until ``DDC_PROFILER=1``
+or ``PUT /debug/profile?enabled=true`` turns it on.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType
+from typing import Any
+
+
+DEFAULT_INTERVAL_SECONDS = 0.005
+MAX_SECONDS = 30.0
+MAX_DEPTH = 64
+# Leaf frames that mean "blocked, waiting for work"; dropped unless idle=True.
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socketserver.py", "serve_forever"),
+    ("thread.py", "_worker"),
+}
+
+_enabled = os.environ.get("DDC_PROFILER", "") not in ("", "0")
+_busy = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profile is already running."""
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True) -> bool:
+    global _enabled
+    _enabled = on
+    return _enabled
+
+
+def _label(code: CodeType, cache: dict[CodeType, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        label = cache[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+    return label
+
+
+def _collect(seconds: float, interval: float, idle: bool) -> tuple[Counter, int]:
+    me = threading.get_ident()
+    labels: dict[CodeType, str] = {}
+    stacks: Counter = Counter()
+    ticks = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            leaf = frame.f_code
+            if not idle and (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                continue
+            parts: list[str] = []
+            while frame is not None and len(parts) < MAX_DEPTH:
+                parts.append(_label(frame.f_code, labels))
+                frame = frame.f_back
+            parts.append(names.get(ident, f"thread-{ident}"))
+            stacks[";".join(reversed(parts))] += 1
+        ticks += 1
+        time.sleep(interval)
+    return stacks, ticks
+
+
+def profile(
+    seconds: float,
+    interval: float = DEFAULT_INTERVAL_SECONDS,
+    idle: bool = False,
+    top: int = 30,
+) -> dict[str, Any]:
+    """Sample all threads for ``seconds``; raises ProfilerBusy if one is running."""
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running.")
+    try:
+        started = time.perf_counter()
+        stacks, ticks = _collect(min(seconds, MAX_SECONDS), interval, idle)
+        elapsed = time.perf_counter() - started
+    finally:
+        _busy.release()
+
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        # Recursion must not count a function twice for one sample.
+        for name in set(frames):
+            total[name] += count
+    samples = sum(stacks.values())
+    functions = [
+        {
+            "function": name,
+            "self": own[name],
+            "total": total[name],
+            "self_pct": round(100 * own[name] / samples, 1) if samples else 0.0,
+            "total_pct": round(100 * total[name] / samples, 1) if samples else 0.0,
+        }
+        for name, _ in sorted(total.items(), key=lambda item: (own[item[0]], item[1]), reverse=True)[:top]
+    ]
+    return {
+        "seconds": round(elapsed, 3),
+        "interval_ms": interval * 1000,
+        "ticks": ticks,
+        "samples": samples,
+        "top": functions,
+        "collapsed": collapsed(stacks),
+    }
+
+
+def collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
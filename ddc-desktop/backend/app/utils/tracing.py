@@ -0,0 +1,217 @@
+"""Per-request tracing spans kept in memory for ``/debug/traces``.
+
+``trace`` opens a root span (the HTTP middleware does this per request);
+``span`` and ``@traced`` record nested timings while a trace is active and
+cost one ContextVar lookup otherwise. Finished traces go to a ring buffer,
+and the slowest ones are kept separately so they survive bursts of fast
+requests. ``chrome`` converts traces to the Chrome trace-event format
+(load in chrome://tracing or https://ui.perfetto.dev).
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+import inspect
+import itertools
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable
+
+
+RECENT_SIZE = 200
+SLOWEST_SIZE = 20
+# Loops can open many spans; past this the rest are only counted.
+MAX_SPANS = 2000
+
+_lock = threading.Lock()
+_recent: deque["Trace"] = deque(maxlen=RECENT_SIZE)
+_slowest: list[tuple[float, int, "Trace"]] = []
+_ids = itertools.count(1)
+_current: ContextVar[tuple["Trace", int] | None] = ContextVar("ddc_trace", default=None)
+
+
+class Trace:
+    __slots__ = ("id", "name", "attrs", "wall", "start", "ms", "thread", "spans", "dropped", "_span_ids")
+
+    def __init__(self, name: str, attrs: dict[str, Any]) -> None:
+        self.id = next(_ids)
+        self.name = name
+        self.attrs = attrs
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        self.ms = 0.0
+        self.thread = threading.get_ident()
+        self.spans: list[dict[str, Any]] = []
+        self.dropped = 0
+        self._span_ids = itertools.count(1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "attrs": self.attrs,
+            "started_at": self.wall,
+            "ms": round(self.ms, 3),
+            "thread": self.thread,
+            "spans": sorted(self.spans, key=lambda item: item["start_ms"]),
+            "dropped_spans": self.dropped,
+        }
+
+
+class span:
+    """Time a block as a child of the current span: ``with span("db", sql=sql): ...``."""
+
+    __slots__ = ("name", "attrs", "_trace", "_id", "_parent", "_token", "_start")
+
+    def __init__(self, name: str, **attrs: Any) -> None:
+        self.name = name
+        self.attrs = attrs
+        self._trace: Trace | None = None
+
+    def __enter__(self) -> "span":
+        active = _current.get()
+        if active is None:
+            return self
+        self._trace, self._parent = active
+        self._id = next(self._trace._span_ids)
+        self._token = _current.set((self._trace, self._id))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        trace = self._trace
+        if trace is None:
+            return False
+        end = time.perf_counter()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        if len(trace.spans) >= MAX_SPANS:
+            trace.dropped += 1
+            return False
+        trace.spans.append(
+            {
+                "id": self._id,
+                "parent": self._parent,
+                "name": self.name,
+                "start_ms": round((self._start - trace.start) * 1000, 3),
+                "ms": round((end - self._start) * 1000, 3),
+                "thread": threading.get_ident(),
+                "attrs": self.attrs,
+            }
+        )
+        return False
+
+    @property
+    def recording(self) -> bool:
+        return self._trace is not None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+def traced(name: str | Callable | None = None) -> Callable:
+    """Decorator form of ``span``; the span name defaults to ``module.function``."""
+
+    def decorate(fn: Callable) -> Callable:
+        label = name if isinstance(name, str) else f"{fn.__module__.rpartition('.')[2]}.{fn.__qualname__}"
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(label):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate(name) if callable(name) else decorate
+
+
+class trace:
+    """Root span: everything timed inside is kept as one trace."""
+
+    __slots__ = ("trace", "_token")
+
+    def __init__(self, name: str, **attrs: Any) -> None:
+        self.trace = Trace(name, attrs)
+
+    def __enter__(self) -> Trace:
+        self._token = _current.set((self.trace, 0))
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.trace.ms = (time.perf_counter() - self.trace.start) * 1000
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.trace.attrs["error"] = exc_type.__name__
+        _record(self.trace)
+        return False
+
+
+def _record(item: Trace) -> None:
+    with _lock:
+        _recent.append(item)
+        entry = (item.ms, item.id, item)
+        if len(_slowest) < SLOWEST_SIZE:
+            heapq.heappush(_slowest, entry)
+        elif item.ms > _slowest[0][0]:
+            heapq.heapreplace(_slowest, entry)
+
+
+def traces(limit: int = 50, slowest: bool = False) -> list[dict[str, Any]]:
+    with _lock:
+        if slowest:
+            items = [entry[2] for entry in sorted(_slowest, reverse=True)]
+        else:
+            items = list(reversed(_recent))
+    return [item.to_dict() for item in items[:limit]]
+
+
+def chrome(items: list[dict[str, Any]]) -> dict[str, Any]:
+    """Chrome trace-event JSON; each trace is shown as its own process."""
+    events: list[dict[str, Any]] = []
+    for pid, item in enumerate(items, start=1):
+        base = item["started_at"] * 1_000_000
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": item["name"]}})
+        events.append(
+            {
+                "name": item["name"],
+                "cat": "request",
+                "ph": "X",
+                "ts": base,
+                "dur": item["ms"] * 1000,
+                "pid": pid,
+                "tid": item["thread"],
+                "args": item["attrs"],
+            }
+        )
+        for entry in item["spans"]:
+            events.append(
+                {
+                    "name": entry["name"],
+                    "cat": entry["name"].partition(".")[0],
+                    "ph": "X",
+                    "ts": base + entry["start_ms"] * 1000,
+                    "dur": entry["ms"] * 1000,
+                    "pid": pid,
+                    "tid": entry["thread"],
+                    "args": entry["attrs"],
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def reset() -> None:
+    with _lock:
+        _recent.clear()
+        _slowest.clear()
@@ -0,0 +1,115 @@
+"""Run the service benchmarks: ``python -m bench [--rows N] [--years Y]``.
+
+Exits with status 1 when a benchmark regresses beyond the threshold
+against ``bench/baseline.json`` for the same dataset. Use
+``--update-baseline`` to record the current numbers instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import app.db as db
+from bench import datagen, suite
+
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+def _dataset_key(args: argparse.Namespace) -> str:
+    return f"rows={args.rows},years={args.years},seed={args.seed}"
+
+
+def _prepare(path: Path, args: argparse.Namespace) -> tuple[date, dict[str, int]]:
+    """Generate the database at ``path`` unless a matching one is already there."""
+    meta_path = path.with_name(path.name + ".json")
+    suite.use_database(path)
+    if path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta["dataset"] == _dataset_key(args) and meta["end"] == date.today().isoformat():
+            print(f"Reusing {path}")
+            return date.fromisoformat(meta["end"]), meta["counts"]
+        path.unlink()
+
+    end = date.today()
+    print(f"Generating {args.rows} events over {args.years} years into {path} ...")
+    started = time.perf_counter()
+    db.init_db()
+    counts = datagen.generate(path, rows=args.rows, years=args.years, seed=args.seed, end=end)
+    print(f"  {counts} in {time.perf_counter() - started:.1f}s")
+    meta = {"dataset": _dataset_key(args), "end": end.isoformat(), "counts": counts}
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return end, counts
+
+
+def _print_result(name: str, result: dict) -> None:
+    print(
+        f"  {name:<22} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms"
+        f"  rows {result['rows']:>9}  vm_steps {result['vm_steps']:>11}"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=datagen.MIN_ROWS, help="vscode_activity rows (10k to 50M)")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", type=Path, help="keep the generated database here and reuse it on later runs")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, help="allowed slowdown as a fraction (default from baseline)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args(argv)
+    if args.years < 2:
+        parser.error("--years must be at least 2 so the previous calendar year has data.")
+
+    with tempfile.TemporaryDirectory(prefix="ddc-bench-") as tmp:
+        path = args.db.resolve() if args.db else Path(tmp) / "bench.db"
+        end, counts = _prepare(path, args)
+        only = set(args.only.split(",")) if args.only else None
+        print(f"Running benchmarks ({args.iterations} iterations):")
+        results = suite.run(end, args.iterations, args.warmup, only, progress=_print_result)
+
+    if args.json:
+        args.json.write_text(json.dumps({"dataset": _dataset_key(args), "results": results}, indent=2), encoding="utf-8")
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    datasets = baseline.setdefault("datasets", {})
+    threshold = args.threshold if args.threshold is not None else baseline.get("threshold", suite.DEFAULT_THRESHOLD)
+
+    if args.update_baseline:
+        entry = datasets.setdefault(_dataset_key(args), {"counts": counts, "results": {}})
+        entry["counts"] = counts
+        entry["results"].update(results)
+        baseline.setdefault("threshold", suite.DEFAULT_THRESHOLD)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline for {_dataset_key(args)} written to {args.baseline}")
+        return 0
+
+    recorded = datasets.get(_dataset_key(args))
+    if recorded is None:
+        print(f"No baseline for {_dataset_key(args)}; run with --update-baseline to record one.")
+        return 0
+    regressions = suite.compare(results, recorded["results"], threshold)
+    for item in regressions:
+        print(
+            f"REGRESSION {item['benchmark']} {item['metric']}: "
+            f"{item['baseline']} -> {item['current']} (threshold {threshold:.0%})"
+        )
+    if regressions:
+        return 1
+    print(f"No regressions beyond {threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
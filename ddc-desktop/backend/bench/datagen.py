@@ -0,0 +1,144 @@
+"""Deterministic synthetic data for the benchmark database.
+
+The same seed, row count, year span and end date always produce the same
+rows. VS Code events are spread evenly over the days in the span, inside
+working hours, and written in created_at order like the real extension
+would. Rows are streamed to ``executemany`` in chunks, so 50M events need
+no more memory than 10k.
+"""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+
+CHUNK_ROWS = 50_000
+MIN_ROWS = 10_000
+MAX_ROWS = 50_000_000
+# Weighted like a real extension: mostly typing heartbeats.
+EVENT_WEIGHTS = (("typing", 6), ("active", 3), ("inactive", 1))
+# Everything below is derived from the VS Code row count unless overridden.
+POMODORO_PER_EVENTS = 100
+TASKS_PER_EVENTS = 1_000
+WORKDAY_START_SECONDS = 8 * 3600
+WORKDAY_SECONDS = 12 * 3600
+
+
+def _span(years: int, end: date) -> tuple[date, int]:
+    # A fixed number of days, so the rows only shift with the end date.
+    days = years * 365
+    return end - timedelta(days=days - 1), days
+
+
+def _per_day(total: int, days: int) -> Iterator[tuple[int, int]]:
+    """(day_index, count) with counts summing to ``total``."""
+    base, extra = divmod(total, days)
+    for index in range(days):
+        yield index, base + (1 if index < extra else 0)
+
+
+def _clock(day: date, seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    return f"{day.isoformat()} {hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def vscode_rows(rng: random.Random, rows: int, start: date, days: int) -> Iterator[tuple[str, None, str]]:
+    events = [name for name, weight in EVENT_WEIGHTS for _ in range(weight)]
+    for index, count in _per_day(rows, days):
+        day = start + timedelta(days=index)
+        offsets = sorted(rng.randrange(WORKDAY_SECONDS) for _ in range(count))
+        for offset in offsets:
+            yield rng.choice(events), None, _clock(day, WORKDAY_START_SECONDS + offset)
+
+
+def pomodoro_rows(rng: random.Random, rows: int, start: date, days: int) -> Iterator[tuple]:
+    for index, count in _per_day(rows, days):
+        day = start + timedelta(days=index)
+        for offset in sorted(rng.randrange(WORKDAY_SECONDS) for _ in range(count)):
+            mode = "focus" if rng.random() < 0.75 else "break"
+            duration = 25 if mode == "focus" else 5
+            elapsed = round(duration * rng.uniform(0.5, 1.0), 2)
+            begin = WORKDAY_START_SECONDS + offset
+            began = _clock(day, begin)
+            ended = _clock(day, min(begin + int(elapsed * 60), 86_399))
+            yield mode, "stopped", began, ended, duration, elapsed, None, began, ended
+
+
+def task_rows(rng: random.Random, rows: int, start: date, days: int) -> Iterator[tuple]:
+    for number in range(rows):
+        created = start + timedelta(days=rng.randrange(days))
+        due = (created + timedelta(days=rng.randrange(1, 60))).isoformat() if rng.random() < 0.7 else None
+        status = rng.choices(("todo", "doing", "done"), (3, 1, 6))[0]
+        stamp = _clock(created, WORKDAY_START_SECONDS + rng.randrange(WORKDAY_SECONDS))
+        priority = rng.choice(("low", "med", "high"))
+        yield f"Task {number}", None, priority, due, status, stamp, stamp
+
+
+def _insert(conn: sqlite3.Connection, sql: str, rows: Iterator[tuple]) -> int:
+    total = 0
+    while True:
+        chunk = [row for _, row in zip(range(CHUNK_ROWS), rows)]
+        if not chunk:
+            return total
+        conn.executemany(sql, chunk)
+        total += len(chunk)
+
+
+def generate(
+    path: Path,
+    rows: int = MIN_ROWS,
+    years: int = 3,
+    seed: int = 0,
+    end: date | None = None,
+    pomodoro: int | None = None,
+    tasks: int | None = None,
+) -> dict[str, int]:
+    """Fill the (already initialised) database at ``path``; returns row counts."""
+    if not MIN_ROWS <= rows <= MAX_ROWS:
+        raise ValueError(f"rows must be between {MIN_ROWS} and {MAX_ROWS}.")
+    if years < 1:
+        raise ValueError("years must be at least 1.")
+    end = end or datetime.now().date()
+    start, days = _span(years, end)
+    pomodoro = max(rows // POMODORO_PER_EVENTS, 1) if pomodoro is None else pomodoro
+    tasks = max(rows // TASKS_PER_EVENTS, 1) if tasks is None else tasks
+
+    conn = sqlite3.connect(path)
+    try:
+        # A throwaway database: durability only slows the load down.
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        counts = {
+            "vscode_activity": _insert(
+                conn,
+                "INSERT INTO vscode_activity (event_type, details, created_at) VALUES (?, ?, ?)",
+                vscode_rows(random.Random(f"{seed}:vscode"), rows, start, days),
+            ),
+            "pomodoro_sessions": _insert(
+                conn,
+                """
+                INSERT INTO pomodoro_sessions
+                (mode, status, start_time, end_time, duration_minutes,
+                 elapsed_minutes, last_start_time, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                pomodoro_rows(random.Random(f"{seed}:pomodoro"), pomodoro, start, days),
+            ),
+            "tasks": _insert(
+                conn,
+                """
+                INSERT INTO tasks
+                (title, description, priority, due_date, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                task_rows(random.Random(f"{seed}:tasks"), tasks, start, days),
+            ),
+        }
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
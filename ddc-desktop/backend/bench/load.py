@@ -0,0 +1,395 @@
+"""End-to-end HTTP load generator: ``python -m bench.load --clients 10,50,200``.
+
+Starts ``app.main:app`` under uvicorn in a subprocess on a synthetic
+database, then replays a mix of virtual clients over keep-alive
+connections, one client per connection:
+
+- ``extension``: a VS Code window posting ``/vscode/event`` every heartbeat;
+- ``dashboard``: the desktop app polling status and stats, now and then
+  loading the full-year heatmap;
+- ``editor``: someone adding, editing, toggling and deleting a task.
+
+Each client fires on a fixed schedule, so the offered request rate is known.
+For every client count in the sweep it reports throughput, latency
+percentiles, error rate and ``database is locked`` errors (counted from the
+server's stderr). The saturation point is the first level where throughput
+falls below ``SATURATION_RATIO`` of the offered rate, or errors appear.
+The client is plain asyncio with no extra dependencies.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from bench import datagen
+
+
+# The real extension sends a heartbeat every 60 s plus debounced typing
+# events; the defaults are compressed so short runs still produce load.
+HEARTBEAT_SECONDS = 1.0
+POLL_SECONDS = 2.0
+EDIT_SECONDS = 10.0
+HEATMAP_CHANCE = 0.1
+DEFAULT_MIX = {"extension": 20, "dashboard": 2, "editor": 1}
+SATURATION_RATIO = 0.9
+MAX_ERROR_RATE = 0.01
+LOCKED = b"database is locked"
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+# The shared packages/ and modules/ live at the repo root.
+REPO_ROOT = BACKEND_DIR.parents[1]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def summary(self, seconds: float) -> dict[str, Any]:
+        samples = [ms for items in self.latencies.values() for ms in items]
+        errors = sum(self.errors.values())
+        total = len(samples) + errors
+        endpoints = {
+            name: {
+                "requests": len(self.latencies.get(name, ())) + self.errors.get(name, 0),
+                "errors": self.errors.get(name, 0),
+                "p50_ms": round(_percentile(self.latencies.get(name, []), 50), 2),
+                "p95_ms": round(_percentile(self.latencies.get(name, []), 95), 2),
+            }
+            for name in sorted(set(self.latencies) | set(self.errors))
+        }
+        return {
+            "requests": total,
+            "throughput_rps": round(len(samples) / seconds, 1),
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "p50_ms": round(_percentile(samples, 50), 2),
+            "p95_ms": round(_percentile(samples, 95), 2),
+            "p99_ms": round(_percentile(samples, 99), 2),
+            "max_ms": round(max(samples, default=0.0), 2),
+            "endpoints": endpoints,
+        }
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection; reconnects after failures."""
+
+    def __init__(self, host: str, port: int, stats: Stats) -> None:
+        self.host = host
+        self.port = port
+        self.stats = stats
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def _roundtrip(self, method: str, path: str, body: Any) -> tuple[int, bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(payload)}\r\n"
+        if body is not None:
+            head += "Content-Type: application/json\r\n"
+        self._writer.write(head.encode() + b"\r\n" + payload)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        headers: dict[bytes, bytes] = {}
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get(b"transfer-encoding") == b"chunked":
+            chunks = []
+            while size := int((await self._reader.readline()).strip(), 16):
+                chunks.append(await self._reader.readexactly(size + 2))
+            await self._reader.readline()
+            content = b"".join(chunk[:-2] for chunk in chunks)
+        else:
+            content = await self._reader.readexactly(int(headers.get(b"content-length", b"0")))
+        if headers.get(b"connection") == b"close":
+            await self.close()
+        return status, content
+
+    async def request(self, label: str, method: str, path: str, body: Any = None) -> Any:
+        """Send one request and record it under ``label``; returns parsed JSON or None."""
+        start = time.perf_counter()
+        try:
+            status, content = await self._roundtrip(method, path, body)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            await self.close()
+            self.stats.errors[label] += 1
+            return None
+        if status >= 400:
+            self.stats.errors[label] += 1
+            return None
+        self.stats.latencies[label].append((time.perf_counter() - start) * 1000)
+        return json.loads(content) if content else None
+
+    async def close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+async def extension(conn: Connection, rng: random.Random) -> None:
+    event = rng.choices(("typing", "active", "inactive"), (6, 3, 1))[0]
+    await conn.request("POST /vscode/event", "POST", "/vscode/event", {"event_type": event})
+
+
+async def dashboard(conn: Connection, rng: random.Random) -> None:
+    await conn.request("GET /vscode/status", "GET", "/vscode/status?window_hours=1")
+    await conn.request("GET /pomodoro/status", "GET", "/pomodoro/status")
+    await conn.request("GET /pomodoro/stats", "GET", "/pomodoro/stats?range=today")
+    if rng.random() < HEATMAP_CHANCE:
+        await conn.request("GET /vscode/heatmap", "GET", f"/vscode/heatmap?year={date.today().year}")
+
+
+async def editor(conn: Connection, rng: random.Random) -> None:
+    created = await conn.request("POST /tasks", "POST", "/tasks", {"title": f"Load {rng.random():.6f}"})
+    if not created:
+        return
+    task_id = created["data"]["id"]
+    await conn.request("PUT /tasks/{id}", "PUT", f"/tasks/{task_id}", {"priority": rng.choice(("low", "high"))})
+    await conn.request("POST /tasks/{id}/toggle_done", "POST", f"/tasks/{task_id}/toggle_done")
+    await conn.request("GET /tasks", "GET", "/tasks?status=todo")
+    await conn.request("DELETE /tasks/{id}", "DELETE", f"/tasks/{task_id}")
+
+
+# role -> (tick function, requests per tick)
+ROLES = {
+    "extension": (extension, 1.0),
+    "dashboard": (dashboard, 3.0 + HEATMAP_CHANCE),
+    "editor": (editor, 5.0),
+}
+
+
+def split_clients(total: int, mix: dict[str, int]) -> dict[str, int]:
+    """Spread ``total`` clients over the roles by weight, each role getting at least one."""
+    weights = sum(mix.values())
+    counts = {role: max(total * weight // weights, 1) for role, weight in mix.items() if weight}
+    biggest = max(counts, key=counts.get)
+    counts[biggest] = max(counts[biggest] + total - sum(counts.values()), 1)
+    return counts
+
+
+def offered_rps(counts: dict[str, int], intervals: dict[str, float]) -> float:
+    return sum(count * ROLES[role][1] / intervals[role] for role, count in counts.items())
+
+
+async def _client(role: str, interval: float, host: str, port: int, stats: Stats, deadline: float, seed: str) -> None:
+    rng = random.Random(seed)
+    tick = ROLES[role][0]
+    conn = Connection(host, port, stats)
+    # Random phase so clients do not fire in lockstep.
+    next_at = time.monotonic() + rng.uniform(0, interval)
+    try:
+        while next_at < deadline:
+            await asyncio.sleep(max(next_at - time.monotonic(), 0))
+            await tick(conn, rng)
+            next_at += interval
+    finally:
+        await conn.close()
+
+
+async def run_level(
+    host: str,
+    port: int,
+    counts: dict[str, int],
+    intervals: dict[str, float],
+    seconds: float,
+) -> dict[str, Any]:
+    stats = Stats()
+    started = time.monotonic()
+    deadline = started + seconds
+    clients = [
+        _client(role, intervals[role], host, port, stats, deadline, seed=f"{role}:{number}")
+        for role, count in counts.items()
+        for number in range(count)
+    ]
+    await asyncio.gather(*clients)
+    # Late ticks may finish after the deadline; count the time they took.
+    return stats.summary(max(time.monotonic() - started, seconds))
+
+
+class Server:
+    """``app.main:app`` under uvicorn in a child process, on its own data directory."""
+
+    def __init__(self, data_dir: Path, port: int) -> None:
+        self.data_dir = data_dir
+        self.port = port
+        self.locked = 0
+        # Seconds from spawning the process to the first /health response.
+        self.ready_seconds: float | None = None
+        self._process: asyncio.subprocess.Process | None = None
+        self._stderr: asyncio.Task | None = None
+
+    async def start(self, timeout: float = 30.0, poll: float = 0.1) -> None:
+        started = time.perf_counter()
+        self._process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning", "--no-access-log",
+            cwd=BACKEND_DIR,
+            env={**os.environ, "DDC_DATA_DIR": str(self.data_dir), "PYTHONPATH": self._pythonpath()},
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._stderr = asyncio.create_task(self._watch_stderr())
+        deadline = time.monotonic() + timeout
+        probe = Connection("127.0.0.1", self.port, Stats())
+        while time.monotonic() < deadline:
+            if self._process.returncode is not None:
+                raise RuntimeError(f"Server exited with {self._process.returncode}.")
+            if await probe.request("health", "GET", "/health"):
+                self.ready_seconds = time.perf_counter() - started
+                await probe.close()
+                return
+            await asyncio.sleep(poll)
+        raise RuntimeError("Server did not answer /health in time.")
+
+    @staticmethod
+    def _pythonpath() -> str:
+        return os.pathsep.join(filter(None, (str(REPO_ROOT), os.environ.get("PYTHONPATH"))))
+
+    async def _watch_stderr(self) -> None:
+        async for line in self._process.stderr:
+            if LOCKED in line:
+                self.locked += 1
+
+    async def stop(self) -> None:
+        if self._process is None:
+            return
+        if self._process.returncode is None:
+            self._process.terminate()
+            await self._process.wait()
+        await self._stderr
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        role, _, weight = part.partition("=")
+        if role not in ROLES:
+            raise argparse.ArgumentTypeError(f"Unknown role {role!r}; choose from {', '.join(ROLES)}.")
+        mix[role] = int(weight or 1)
+    return mix
+
+
+async def sweep(args: argparse.Namespace, data_dir: Path | None) -> list[dict[str, Any]]:
+    server = None
+    if args.url:
+        host, _, port = args.url.removeprefix("http://").rstrip("/").partition(":")
+        port = int(port or 80)
+    else:
+        host, port = "127.0.0.1", _free_port()
+        server = Server(data_dir, port)
+        await server.start()
+
+    intervals = {"extension": args.heartbeat, "dashboard": args.poll, "editor": args.edit}
+    levels = []
+    try:
+        for total in args.clients:
+            counts = split_clients(total, args.mix)
+            locked_before = server.locked if server else 0
+            result = await run_level(host, port, counts, intervals, args.duration)
+            result |= {
+                "clients": total,
+                "mix": counts,
+                "offered_rps": round(offered_rps(counts, intervals), 1),
+                "locked": (server.locked - locked_before) if server else None,
+            }
+            levels.append(result)
+            _print_level(result, args.verbose)
+    finally:
+        if server is not None:
+            await server.stop()
+    return levels
+
+
+def saturation(levels: list[dict[str, Any]]) -> int | None:
+    for level in levels:
+        keeping_up = level["throughput_rps"] >= SATURATION_RATIO * level["offered_rps"]
+        if not keeping_up or level["error_rate"] > MAX_ERROR_RATE or level["locked"]:
+            return level["clients"]
+    return None
+
+
+def _print_level(level: dict[str, Any], verbose: bool) -> None:
+    locked = "-" if level["locked"] is None else level["locked"]
+    print(
+        f"{level['clients']:>6} clients  offered {level['offered_rps']:>7.1f} rps  "
+        f"got {level['throughput_rps']:>7.1f} rps  p50 {level['p50_ms']:>7.1f}  p95 {level['p95_ms']:>7.1f}  "
+        f"p99 {level['p99_ms']:>7.1f} ms  errors {level['error_rate']:>6.2%}  locked {locked}"
+    )
+    if verbose:
+        for name, item in level["endpoints"].items():
+            print(
+                f"         {name:<30} {item['requests']:>7}  p50 {item['p50_ms']:>7.1f}  "
+                f"p95 {item['p95_ms']:>7.1f} ms  errors {item['errors']}"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.load", description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", default="10,50,100,200", type=lambda v: [int(n) for n in v.split(",")])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per client level")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="e.g. extension=20,dashboard=2,editor=1")
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT_SECONDS, help="seconds between extension events")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="seconds between dashboard polls")
+    parser.add_argument("--edit", type=float, default=EDIT_SECONDS, help="seconds between task edit rounds")
+    parser.add_argument("--rows", type=int, default=datagen.MIN_ROWS, help="vscode_activity rows to seed")
+    parser.add_argument("--url", help="load an already running backend instead (no lock counting)")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    parser.add_argument("--verbose", action="store_true", help="per-endpoint breakdown")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="ddc-load-") as tmp:
+        data_dir = None
+        if not args.url:
+            import app.db
+
+            from bench import suite
+
+            data_dir = Path(tmp)
+            suite.use_database(data_dir / "ddc.db")
+            app.db.init_db()
+            datagen.generate(data_dir / "ddc.db", rows=args.rows)
+        levels = asyncio.run(sweep(args, data_dir))
+
+    point = saturation(levels)
+    if point is None:
+        print(f"No saturation up to {levels[-1]['clients']} clients.")
+    else:
+        print(f"Saturated at {point} clients.")
+    if args.json:
+        args.json.write_text(json.dumps({"saturation_clients": point, "levels": levels}, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Startup benchmark: ``python -m bench.startup [--runs 10]``.
+
+The backend starts on every login (``scripts/launch.cmd``), so cold-start
+time is visible. Measured here, each over ``--runs`` fresh processes on a
+database whose schema is already in place:
+
+- ``import app.main``: module import time in a new interpreter;
+- ``first response /health``: spawning uvicorn until /health answers;
+- ``first response /vscode/status``: the first data request after that,
+  including the service's deferred import;
+- ``init_db (schema current)``: the startup hook's schema check, in-process.
+
+Exits with status 1 on a regression against the ``startup`` section of
+``bench/baseline.json``, like ``python -m bench``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import app.db as db
+from bench import load, suite
+from bench.__main__ import BASELINE_PATH
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def _summary(samples: list[float]) -> dict[str, Any]:
+    ms = [sample * 1000 for sample in samples]
+    return {
+        "runs": len(ms),
+        "p50_ms": round(suite._percentile(ms, 50), 3),
+        "p95_ms": round(suite._percentile(ms, 95), 3),
+        "max_ms": round(max(ms), 3),
+    }
+
+
+def import_seconds() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def first_responses(data_dir: Path) -> tuple[float, float]:
+    """Seconds to the first /health answer, and then to the first /vscode/status."""
+    server = load.Server(data_dir, load._free_port())
+    await server.start(poll=0.005)
+    try:
+        conn = load.Connection("127.0.0.1", server.port, load.Stats())
+        start = time.perf_counter()
+        if await conn.request("status", "GET", "/vscode/status") is None:
+            raise RuntimeError("/vscode/status failed.")
+        status_seconds = time.perf_counter() - start
+        await conn.close()
+    finally:
+        await server.stop()
+    return server.ready_seconds, status_seconds
+
+
+def init_db_seconds() -> float:
+    start = time.perf_counter()
+    db.init_db()
+    return time.perf_counter() - start
+
+
+def run(data_dir: Path, runs: int) -> dict[str, dict[str, Any]]:
+    suite.use_database(data_dir / "ddc.db")
+    db.init_db()
+    samples: dict[str, list[float]] = {
+        "import app.main": [],
+        "first response /health": [],
+        "first response /vscode/status": [],
+        "init_db (schema current)": [],
+    }
+    for _ in range(runs):
+        samples["import app.main"].append(import_seconds())
+        health, status = asyncio.run(first_responses(data_dir))
+        samples["first response /health"].append(health)
+        samples["first response /vscode/status"].append(status)
+        samples["init_db (schema current)"].append(init_db_seconds())
+    return {name: _summary(values) for name, values in samples.items()}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, help="allowed slowdown as a fraction (default from baseline)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="ddc-startup-") as tmp:
+        results = run(Path(tmp), args.runs)
+    for name, result in results.items():
+        print(f"  {name:<32} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms")
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    threshold = args.threshold if args.threshold is not None else baseline.get("threshold", suite.DEFAULT_THRESHOLD)
+    if args.update_baseline:
+        baseline["startup"] = results
+        baseline.setdefault("threshold", suite.DEFAULT_THRESHOLD)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Startup baseline written to {args.baseline}")
+        return 0
+    if "startup" not in baseline:
+        print("No startup baseline; run with --update-baseline to record one.")
+        return 0
+
+    regressions = suite.compare(results, baseline["startup"], threshold)
+    for item in regressions:
+        print(
+            f"REGRESSION {item['benchmark']} {item['metric']}: "
+            f"{item['baseline']} -> {item['current']} (threshold {threshold:.0%})"
+        )
+    if regressions:
+        return 1
+    print(f"No regressions beyond {threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Service-level benchmarks against a synthetic database.
+
+Each benchmark calls a service function the way its route does. Latency
+comes from timed iterations with profiling off. One extra profiled call
+adds up the rows SQLite returned and the VM steps it took (see
+``app.utils.db_profiler``). VM steps track rows scanned, so they are the
+stable regression signal; latency depends on the machine that recorded
+the baseline.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import app.db as db
+import app.utils.path_utils as path_utils
+from app.services import pomodoro_service, task_service, vscode_service
+from app.utils import db_profiler
+
+
+DEFAULT_THRESHOLD = 0.25
+# Latency below this is timer noise and never counts as a regression.
+MIN_REGRESSION_MS = 1.0
+CHECKED = ("p50_ms", "p95_ms", "rows", "vm_steps")
+
+
+def benchmarks(end: date) -> dict[str, Callable[[], Any]]:
+    """Benchmarks keyed by name; ``end`` is the last day of generated data."""
+    # The previous calendar year is always complete, unlike the current one.
+    last_year = end.year - 1
+    yesterday = (end - timedelta(days=1)).isoformat()
+    return {
+        "vscode.summary": lambda: vscode_service.summary(24),
+        "vscode.history": lambda: vscode_service.history(24, 50),
+        "vscode.heatmap_90d": lambda: vscode_service.heatmap(days=90),
+        "vscode.heatmap_365d": lambda: vscode_service.heatmap(days=365),
+        "vscode.heatmap_year": lambda: vscode_service.heatmap(year=last_year),
+        "vscode.timeline": lambda: vscode_service.timeline(yesterday, 15),
+        "pomodoro.stats_today": lambda: pomodoro_service.stats("today"),
+        "pomodoro.stats_week": lambda: pomodoro_service.stats("week"),
+        "pomodoro.stats_all": lambda: pomodoro_service.stats("all"),
+        "tasks.list_todo": lambda: task_service.list_tasks("todo"),
+        "tasks.list_all": lambda: task_service.list_tasks("all"),
+    }
+
+
+def use_database(path: Path) -> None:
+    """Point ``get_connection`` at ``path`` for the rest of the process."""
+    db.db_path = lambda: path
+    db.ensure_dirs = lambda: None
+    path_utils.data_dir = lambda: path.parent
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _scanned(fn: Callable[[], Any]) -> dict[str, int]:
+    was_enabled = db_profiler.enabled()
+    db_profiler.reset()
+    db_profiler.enable()
+    try:
+        fn()
+        recent = db_profiler.report(limit=db_profiler.RECENT_SIZE)["recent"]
+    finally:
+        db_profiler.enable(was_enabled)
+        db_profiler.reset()
+    return {
+        "queries": len(recent),
+        "rows": sum(item["rows"] for item in recent),
+        "vm_steps": sum(item["vm_steps"] for item in recent),
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int = 20, warmup: int = 2) -> dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "max_ms": round(max(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    } | _scanned(fn)
+
+
+def run(
+    end: date,
+    iterations: int = 20,
+    warmup: int = 2,
+    only: set[str] | None = None,
+    progress: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for name, fn in benchmarks(end).items():
+        if only and name not in only:
+            continue
+        results[name] = measure(fn, iterations, warmup)
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """Measurements more than ``threshold`` (a fraction) worse than baseline."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for key in CHECKED:
+            before, after = previous.get(key), current.get(key)
+            if before is None or after is None or after <= before * (1 + threshold):
+                continue
+            if key.endswith("_ms") and after - before < MIN_REGRESSION_MS:
+                continue
+            regressions.append({"benchmark": name, "metric": key, "baseline": before, "current": after})
+    return regressions
@@ -5,6 +5,7 @@ from pathlib import Path
 import pytest
 
 import app.db as db
+import app.utils.path_utils as path_utils
 
 
 @pytest.fixture()
@@ -21,5 +22,6 @@ def temp_db(tmp_path, monkeypatch):
 
     monkeypatch.setattr(db, "db_path", _db_path)
     monkeypatch.setattr(db, "ensure_dirs", _ensure_dirs)
+    monkeypatch.setattr(path_utils, "data_dir", lambda: data_dir)
     db.init_db()
     return test_db
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+
+import app.db as db
+from bench import datagen, suite
+
+
+END = date(2026, 3, 15)
+
+
+def _dump(path) -> list[tuple]:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT event_type, created_at FROM vscode_activity ORDER BY id").fetchall()
+
+
+def test_generator_is_deterministic_and_ordered(temp_db, tmp_path, monkeypatch):
+    counts = datagen.generate(temp_db, rows=10_000, years=2, seed=7, end=END)
+    assert counts == {"vscode_activity": 10_000, "pomodoro_sessions": 100, "tasks": 10}
+
+    other = tmp_path / "other.db"
+    monkeypatch.setattr(db, "db_path", lambda: other)
+    db.init_db()
+    datagen.generate(other, rows=10_000, years=2, seed=7, end=END)
+    rows = _dump(temp_db)
+    assert rows == _dump(other)
+    stamps = [created_at for _, created_at in rows]
+    assert stamps == sorted(stamps)
+    assert stamps[0] >= "2024-03-16" and stamps[-1] < "2026-03-16"
+
+
+def test_benchmarks_count_rows_and_flag_regressions(temp_db):
+    datagen.generate(temp_db, rows=10_000, years=2, seed=0)
+    results = suite.run(date.today(), iterations=2, warmup=0, only={"vscode.heatmap_year", "tasks.list_all"})
+    assert results["vscode.heatmap_year"]["rows"] >= 365
+    assert results["vscode.heatmap_year"]["vm_steps"] > 0
+    assert results["tasks.list_all"]["rows"] == 10
+
+    baseline = {name: dict(result) for name, result in results.items()}
+    assert suite.compare(results, baseline) == []
+    baseline["tasks.list_all"]["vm_steps"] = results["tasks.list_all"]["vm_steps"] // 2
+    baseline["tasks.list_all"]["p50_ms"] = results["tasks.list_all"]["p50_ms"] / 2
+    (regression,) = suite.compare(results, baseline)
+    assert regression["benchmark"] == "tasks.list_all" and regression["metric"] == "vm_steps"
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import subprocess
+
+from app.services import commit_service
+from packages.core import git_utils
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def _commit(repo, name, lines, when):
+    (repo / name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    _git(repo, "add", name)
+    _git(repo, "commit", "-q", "-m", f"add {name}", "--date", when)
+
+
+def test_index_is_incremental_and_feeds_heatmap(tmp_path, temp_db):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "dragon@example.com")
+    _git(repo, "config", "user.name", "Dragon")
+    _commit(repo, "a.txt", ["1", "2", "3"], "2024-03-01T10:00:00+00:00")
+    _commit(repo, "b.txt", ["1"], "2024-03-01T12:00:00+00:00")
+
+    first = commit_service.index_repo(str(repo))
+    assert first["added"] == 2
+    assert first["full"] is True
+    assert commit_service.index_repo(str(repo))["added"] == 0
+
+    _commit(repo, "c.txt", ["1", "2"], "2024-03-03T09:00:00+00:00")
+    second = commit_service.index_repo(str(repo))
+    assert second["added"] == 1
+    assert second["full"] is False
+
+    data = commit_service.heatmap(year=2024, author="dragon@example.com")
+    by_day = {item["date"]: item for item in data["items"]}
+    assert len(data["items"]) == 366
+    assert by_day["2024-03-01"]["commits"] == 2
+    assert by_day["2024-03-01"]["additions"] == 4
+    assert by_day["2024-03-03"]["commits"] == 1
+    assert data["available_years"] == [2024]
+
+
+def test_failed_git_log_keeps_the_previous_index(tmp_path, temp_db):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "dragon@example.com")
+    _git(repo, "config", "user.name", "Dragon")
+    _commit(repo, "a.txt", ["1"], "2024-03-01T10:00:00+00:00")
+    root = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True, text=True).stdout.strip()
+    _commit(repo, "b.txt", ["1"], "2024-03-02T10:00:00+00:00")
+    first = commit_service.index_repo(str(repo))
+    assert first["added"] == 2
+
+    _commit(repo, "c.txt", ["1"], "2024-03-03T10:00:00+00:00")
+    # Without the root commit, the ancestry check fails and the full log errors out.
+    (repo / ".git" / "objects" / root[:2] / root[2:]).unlink()
+    result = commit_service.index_repo(str(repo))
+    assert "error" in result
+    assert result["head"] == first["head"]
+
+    with commit_service.get_connection() as conn:
+        state = conn.execute("SELECT head_sha FROM git_commit_index_state").fetchone()
+        count = conn.execute("SELECT COUNT(*) FROM git_commits").fetchone()[0]
+    assert state["head_sha"] == first["head"]
+    assert count == 2
+
+
+def test_head_sha_falls_back_to_the_object_pool(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "config", "user.email", "dragon@example.com")
+    _git(tmp_path, "config", "user.name", "Dragon")
+    _commit(tmp_path, "a.txt", ["a"], "2025-01-01T10:00:00")
+    expected = subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=tmp_path, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+    monkeypatch.setattr(git_utils, "read_head_sha", lambda git_dir: None)
+    assert commit_service._head_sha(tmp_path) == expected
+    assert commit_service._head_sha(tmp_path / "missing") is None
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import date
+
+from app.utils import contribution_stats
+
+
+def test_year_stats_streaks_and_distributions():
+    days = {
+        "2024-01-01": 2,
+        "2024-01-02": 1,
+        "2024-01-05": 4,
+        "2024-01-06": 1,
+        "2024-01-07": 3,
+        "2024-12-31": 5,
+    }
+    stats = contribution_stats.year_stats(2024, days, today=date(2025, 3, 1))
+    assert stats["days"] == 366
+    assert stats["total"] == 16
+    assert stats["active_days"] == 6
+    assert stats["longest_streak"] == 3
+    assert stats["leading_streak"] == 2
+    assert stats["trailing_streak"] == 1
+    # The year is over and its last run ended long before today.
+    assert stats["current_streak"] == 0
+    assert stats["best_day"] == {"date": "2024-12-31", "count": 5}
+    # 2024-01-01 is a Monday.
+    assert stats["weekdays"][0] == 2
+    assert stats["weekdays"][6] == 3
+    assert stats["months"][0] == 11
+    assert stats["months"][11] == 5
+
+
+def test_current_year_ignores_empty_today():
+    days = {"2025-03-01": 1, "2025-03-02": 1}
+    stats = contribution_stats.year_stats(2025, days, today=date(2025, 3, 3))
+    assert stats["days"] == 62
+    assert stats["current_streak"] == 2
+    assert stats["trailing_streak"] == 0
+
+
+def test_combine_joins_streaks_across_years():
+    first = contribution_stats.year_stats(
+        2024, {"2024-12-30": 1, "2024-12-31": 1}, today=date(2025, 1, 3)
+    )
+    second = contribution_stats.year_stats(
+        2025, {"2025-01-01": 1, "2025-01-02": 2}, today=date(2025, 1, 3)
+    )
+    combined = contribution_stats.combine([second, first])
+    assert combined["years"] == [2024, 2025]
+    assert combined["total"] == 5
+    assert combined["longest_streak"] == 4
+    assert combined["current_streak"] == 4
+    assert combined["best_day"] == {"date": "2025-01-02", "count": 2}
+
+
+def test_current_streak_of_a_finished_year_only_counts_until_yesterday():
+    days = {"2024-12-30": 1, "2024-12-31": 2}
+    stale = contribution_stats.year_stats(2024, days, today=date(2026, 10, 19))
+    assert stale["current_streak"] == 0
+    assert stale["trailing_streak"] == 2
+    assert contribution_stats.combine([stale])["current_streak"] == 0
+
+    fresh = contribution_stats.year_stats(2024, days, today=date(2025, 1, 1))
+    assert fresh["current_streak"] == 2
+    assert contribution_stats.combine([fresh])["current_streak"] == 2
+
+
+def test_empty_new_years_day_keeps_yesterdays_streak():
+    today = date(2025, 1, 1)
+    first = contribution_stats.year_stats(2024, {"2024-12-30": 1, "2024-12-31": 1}, today=today)
+    second = contribution_stats.year_stats(2025, {}, today=today)
+    assert contribution_stats.combine([first, second])["current_streak"] == 2
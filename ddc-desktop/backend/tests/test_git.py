@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import subprocess
+import time
+
+import pytest
+
+from app.services import git_service
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture()
+def repo(tmp_path):
+    git_service.clear_cache()
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "config", "user.email", "dragon@example.com")
+    _git(tmp_path, "config", "user.name", "Dragon")
+    (tmp_path / "a.txt").write_text("a", encoding="utf-8")
+    _git(tmp_path, "add", "a.txt")
+    _git(tmp_path, "commit", "-q", "-m", "first commit")
+    return tmp_path
+
+
+def test_summary_counts_from_porcelain_v2(repo):
+    (repo / "a.txt").write_text("changed", encoding="utf-8")
+    (repo / "b.txt").write_text("b", encoding="utf-8")
+    (repo / "c.txt").write_text("c", encoding="utf-8")
+    _git(repo, "add", "c.txt")
+
+    result = git_service.summary(str(repo))
+    assert result["ok"] is True
+    assert result["branch"] == "main"
+    assert result["last_commit"] == "first commit"
+    assert result["staged"] == 1
+    assert result["unstaged"] == 2
+    assert result["untracked"] == 1
+
+
+def test_packed_commit_subject_comes_from_the_object_pool(repo, monkeypatch):
+    _git(repo, "gc", "-q")
+    calls = []
+    original = git_service._run_git
+
+    def counting(repo_path, args, *rest, **kwargs):
+        calls.append(args[0])
+        return original(repo_path, args, *rest, **kwargs)
+
+    monkeypatch.setattr(git_service, "_run_git", counting)
+    assert git_service.summary(str(repo))["last_commit"] == "first commit"
+    assert "log" not in calls
+
+
+def test_summary_is_cached_until_metadata_changes(repo, monkeypatch):
+    calls = []
+    original = git_service._run_git
+
+    def counting(path, args, strip=True, **kwargs):
+        calls.append(args[0])
+        return original(path, args, strip, **kwargs)
+
+    monkeypatch.setattr(git_service, "_run_git", counting)
+    git_service.summary(str(repo))
+    git_service.summary(str(repo))
+    assert calls == ["status"]
+
+    (repo / "d.txt").write_text("d", encoding="utf-8")
+    _git(repo, "add", "d.txt")
+    result = git_service.summary(str(repo))
+    assert calls == ["status", "status"]
+    assert result["staged"] == 1
+
+
+def test_summary_falls_back_to_partial_result_on_timeout(repo, monkeypatch):
+    (repo / "a.txt").write_text("changed", encoding="utf-8")
+    (repo / "b.txt").write_text("b", encoding="utf-8")
+    original = git_service._run_git
+
+    def slow_untracked(path, args, strip=True, **kwargs):
+        if "--untracked-files=normal" in args:
+            raise git_service.GitTimeout("git status melewati batas waktu.")
+        return original(path, args, strip, **kwargs)
+
+    monkeypatch.setattr(git_service, "_run_git", slow_untracked)
+    result = git_service.summary(str(repo))
+    assert result["ok"] is True
+    assert result["partial"] is True
+    assert result["untracked_mode"] == "sampled"
+    assert result["untracked"] == 1
+    assert result["unstaged"] == 2
+
+    def always_slow(path, args, strip=True, **kwargs):
+        raise git_service.GitTimeout("git status melewati batas waktu.")
+
+    monkeypatch.setattr(git_service, "_run_git", always_slow)
+    result = git_service.summary(str(repo))
+    assert result["ok"] is False
+    assert result["partial"] is True
+    assert result["branch"] == "main"
+
+
+def test_run_git_kills_process_past_deadline(repo):
+    with pytest.raises(git_service.GitTimeout):
+        git_service._run_git(repo, ["status"], deadline=time.monotonic())
+
+
+def test_summary_outside_repo(tmp_path):
+    result = git_service.summary(str(tmp_path))
+    assert result["ok"] is False
+
+
+def test_scan_discovers_and_reuses_unchanged_repos(tmp_path, temp_db):
+    git_service.clear_cache()
+    root = tmp_path / "workspace"
+    for name in ("alpha", "nested/beta"):
+        repo_dir = root / name
+        repo_dir.mkdir(parents=True)
+        _git(repo_dir, "init", "-q", "-b", "main")
+    (root / "node_modules" / "pkg").mkdir(parents=True)
+    _git(root / "node_modules" / "pkg", "init", "-q")
+
+    first = git_service.scan(str(root))
+    assert [item["name"] for item in first["repos"]] == ["alpha", "beta"]
+    assert first["checked"] == 2
+
+    (root / "alpha" / "x.txt").write_text("x", encoding="utf-8")
+    _git(root / "alpha", "add", "x.txt")
+    second = git_service.scan(str(root))
+    assert second["checked"] == 1
+    assert second["reused"] == 1
+    alpha = next(item for item in second["repos"] if item["name"] == "alpha")
+    assert alpha["staged"] == 1
+
+    shallow = git_service.scan(str(root), max_depth=1)
+    assert [item["name"] for item in shallow["repos"]] == ["alpha"]
+    assert shallow["removed"] == 1
+    assert len(git_service.indexed_repos(str(root))) == 1
+
+
+def test_scan_rechecks_stored_summaries_after_the_ttl(tmp_path, temp_db, monkeypatch):
+    git_service.clear_cache()
+    repo_dir = tmp_path / "workspace" / "alpha"
+    repo_dir.mkdir(parents=True)
+    _git(repo_dir, "init", "-q", "-b", "main")
+    assert git_service.scan(str(repo_dir.parent))["checked"] == 1
+
+    # A work-tree edit leaves the .git metadata key unchanged.
+    (repo_dir / "x.txt").write_text("x", encoding="utf-8")
+    assert git_service.scan(str(repo_dir.parent))["reused"] == 1
+    monkeypatch.setattr(git_service, "CACHE_TTL_SECONDS", 0.0)
+    rescanned = git_service.scan(str(repo_dir.parent))
+    assert rescanned["checked"] == 1
+    assert rescanned["repos"][0]["untracked"] == 1
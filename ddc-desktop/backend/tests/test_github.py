@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import app.services.github_service as github_service
+
+
+SAMPLE = Path(__file__).resolve().parents[3] / "examples" / "github_profile.sample.json"
+
+
+def _use_data_dir(monkeypatch, temp_db: Path) -> Path:
+    data_dir = temp_db.parent
+    monkeypatch.setattr(github_service, "data_dir", lambda: data_dir)
+    return data_dir
+
+
+def test_import_sample_json(temp_db, monkeypatch):
+    _use_data_dir(monkeypatch, temp_db)
+
+    result = github_service.import_json(SAMPLE)
+    assert result["username"] == "raymond"
+    assert result["years"] == [2025]
+
+    summary = github_service.summary(2025)
+    assert summary["profile"]["username"] == "raymond"
+    assert summary["repo_stats"]["total"] == 2
+    assert summary["top_repos"][0]["name"] == "dragon-dev-companion"
+    assert summary["available_years"] == [2025]
+    assert summary["contributions"][0] == {"date": "2025-01-02", "count": 3}
+    assert summary["stats"]["total"] == 36
+    assert summary["stats_all"]["years"] == [2025]
+
+
+def test_summary_imports_legacy_file_once(temp_db, monkeypatch):
+    data_dir = _use_data_dir(monkeypatch, temp_db)
+    (data_dir / "github_profile.json").write_text(SAMPLE.read_text(encoding="utf-8"), encoding="utf-8")
+
+    summary = github_service.summary()
+    assert summary["profile"]["name"] == "Raymond Jonathan"
+    assert summary["year"] == 2025
+
+
+def test_broken_legacy_file_is_not_reparsed_on_every_read(temp_db, monkeypatch):
+    data_dir = _use_data_dir(monkeypatch, temp_db)
+    legacy = data_dir / "github_profile.json"
+    legacy.write_text('{"profile": {"bio": "no username"}}', encoding="utf-8")
+    calls = []
+    import_json = github_service.import_json
+    monkeypatch.setattr(github_service, "import_json", lambda path: calls.append(path) or import_json(path))
+
+    assert github_service.summary()["profile"] is None
+    assert github_service.profiles() == []
+    assert len(calls) == 1
+
+    legacy.write_text(SAMPLE.read_text(encoding="utf-8"), encoding="utf-8")
+    assert github_service.summary()["profile"]["username"] == "raymond"
+    assert len(calls) == 2
+
+
+def test_summary_records_cache_use_without_writing(temp_db, monkeypatch):
+    _use_data_dir(monkeypatch, temp_db)
+    github_service.import_json(SAMPLE)
+    with github_service.get_connection() as conn:
+        before = conn.execute("SELECT kind, key, last_used FROM github_cache_entries").fetchall()
+        github_service.summary(2025)
+        assert conn.execute("SELECT kind, key, last_used FROM github_cache_entries").fetchall() == before
+    assert ("year", "raymond:2025") in github_service._used
+
+
+def test_sync_upserts_only_changed_days(temp_db, monkeypatch):
+    _use_data_dir(monkeypatch, temp_db)
+    days = [{"date": "2024-01-01", "count": 1}, {"date": "2024-01-02", "count": 0}]
+
+    monkeypatch.setattr(
+        github_service,
+        "_fetch_profile",
+        lambda username: {"name": "Octo", "username": username, "avatar_url": None},
+    )
+    monkeypatch.setattr(
+        github_service,
+        "_fetch_repos",
+        lambda username: [{"name": "alpha", "stars": 3, "updated_at": "2024-01-01"}],
+    )
+    monkeypatch.setattr(github_service, "_fetch_contributions", lambda username, year: days)
+
+    first = github_service.sync("octo", 2024)
+    assert first["available_years"] == [2024]
+
+    with github_service.get_connection() as conn:
+        assert github_service._sync_contribution_year(
+            conn, "octo", 2024, {"2024-01-01": 1, "2024-01-02": 0}
+        ) == 0
+        assert github_service._sync_contribution_year(
+            conn, "octo", 2024, {"2024-01-01": 1, "2024-01-02": 5}
+        ) == 1
+        conn.commit()
+
+    summary = github_service.summary(2024)
+    assert summary["contributions"][1]["count"] == 5
+    assert summary["top_repos"][0]["name"] == "alpha"
+
+
+def test_repos_keyset_pagination_and_filters(temp_db, monkeypatch):
+    _use_data_dir(monkeypatch, temp_db)
+    github_service.import_json(SAMPLE)
+    with github_service.get_connection() as conn:
+        github_service._sync_repos(
+            conn,
+            "raymond",
+            [
+                github_service._normalize_repo(
+                    {"name": f"repo-{idx}", "stars": idx % 3, "language": "Go", "private": idx == 4}
+                )
+                for idx in range(7)
+            ],
+        )
+        conn.commit()
+
+    names: list[str] = []
+    cursor = None
+    while True:
+        page = github_service.repos(sort="stars", limit=3, cursor=cursor)
+        assert page["total"] == 7
+        names.extend(item["name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert names == ["repo-5", "repo-2", "repo-4", "repo-1", "repo-6", "repo-3", "repo-0"]
+
+    filtered = github_service.repos(sort="name", private=False, q="-4")
+    assert filtered["total"] == 0
+    by_name = github_service.repos(sort="name", language="Go", q="REPO-1")
+    assert [item["name"] for item in by_name["items"]] == ["repo-1"]
+
+
+def test_profiles_are_kept_per_user_and_years_evicted_lru(temp_db, monkeypatch):
+    data_dir = _use_data_dir(monkeypatch, temp_db)
+    monkeypatch.setattr(github_service, "CONTRIBUTION_CACHE_DAYS", 4)
+    monkeypatch.setitem(github_service._CACHE_BUDGETS, "year", 4)
+    avatar = b"\x89PNG fake avatar"
+    monkeypatch.setattr(github_service, "_download_binary", lambda url: avatar)
+    monkeypatch.setattr(
+        github_service,
+        "_fetch_profile",
+        lambda username: {"name": username.title(), "username": username, "avatar_url": "x"},
+    )
+    monkeypatch.setattr(github_service, "_fetch_repos", lambda username: [])
+    monkeypatch.setattr(
+        github_service,
+        "_fetch_contributions",
+        lambda username, year: [
+            {"date": f"{year}-01-01", "count": 1},
+            {"date": f"{year}-01-02", "count": 2},
+        ],
+    )
+
+    github_service.sync("alice", 2023)
+    github_service.sync("bob", 2024)
+    assert github_service.summary(user="alice")["available_years"] == [2023]
+
+    github_service.sync("carol", 2024)
+    # bob's year was least recently used and pushed the cache over budget.
+    assert github_service.summary(user="bob")["available_years"] == []
+    alice = github_service.summary(user="ALICE")
+    assert alice["profile"]["name"] == "Alice"
+    assert alice["contributions"][1]["count"] == 2
+    assert sorted(item["username"] for item in github_service.profiles()) == ["alice", "bob", "carol"]
+
+    avatar_file = alice["profile"]["avatar_file"]
+    assert avatar_file.endswith(".png")
+    path = github_service.avatar_path(avatar_file)
+    assert path == data_dir / "github_avatars" / avatar_file
+    assert github_service.is_content_addressed(path)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ports: set[int] = set()
+    failures: dict[str, int] = {}
+
+    def log_message(self, *args) -> None:  # keep pytest output quiet
+        pass
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self.ports.add(self.client_address[1])
+        if self.path.startswith("/flaky"):
+            remaining = self.failures.get(self.path, 0)
+            if remaining:
+                self.failures[self.path] = remaining - 1
+                self._send(503, b"busy", {"Retry-After": "0"})
+                return
+        if self.path == "/moved":
+            self._send(302, b"", {"Location": "/json"})
+            return
+        if self.path in ("/here", "/away"):
+            host = "127.0.0.1" if self.path == "/here" else "localhost"
+            self._send(302, b"", {"Location": f"http://{host}:{self.server.server_address[1]}/headers"})
+            return
+        if self.path == "/headers":
+            self._send(200, json.dumps({key.lower(): value for key, value in self.headers.items()}).encode())
+            return
+        if self.path == "/big":
+            self._send(200, b"x" * 200_000)
+            return
+        self._send(200, json.dumps({"path": self.path}).encode())
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path == "/fail":
+            self._send(503, b'{"error": "down"}')
+            return
+        self._send(200, json.dumps({"form": body.decode()}).encode())
+
+
+@pytest.fixture()
+def server():
+    _Handler.ports = set()
+    _Handler.failures = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF_BASE_SECONDS", 0)
+    instance = http_client.HttpClient()
+    instance._proxies = {}
+    yield instance
+    instance.close()
+
+
+def test_connections_are_reused_per_host(server, client):
+    for index in range(5):
+        assert client.get(f"{server}/json?n={index}").json() == {"path": f"/json?n={index}"}
+    assert len(_Handler.ports) == 1
+    stats = next(iter(client.stats().values()))
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
+
+
+def test_idempotent_requests_retry_but_posts_do_not(server, client):
+    _Handler.failures["/flaky"] = 2
+    assert client.get(f"{server}/flaky").status == 200
+    with pytest.raises(http_client.HttpStatusError) as excinfo:
+        client.post_form(f"{server}/fail", {"a": "1"})
+    assert excinfo.value.status == 503
+    assert excinfo.value.json() == {"error": "down"}
+    stats = next(iter(client.stats().values()))
+    assert stats["retries"] == 2
+    assert stats["errors"] == 3
+    assert stats["statuses"] == {"200": 1, "503": 3}
+
+
+def test_redirects_streaming_and_connection_errors(server, client):
+    assert client.get(f"{server}/moved").json() == {"path": "/json"}
+    with client.stream("GET", f"{server}/big") as resp:
+        sizes = [len(chunk) for chunk in resp.iter_chunks(50_000)]
+    assert sizes == [50_000] * 4
+    assert client.post_form(f"{server}/form", {"a": "b c"}).json() == {"form": "a=b+c"}
+    assert len(_Handler.ports) == 1
+
+    secrets = {"Authorization": "Bearer t", "Cookie": "s=1", "Accept": "application/json"}
+    same = client.get(f"{server}/here", headers=secrets).json()
+    assert same["authorization"] == "Bearer t" and same["cookie"] == "s=1"
+    other = client.get(f"{server}/away", headers=secrets).json()
+    assert "authorization" not in other and "cookie" not in other
+    assert other["accept"] == "application/json"
+
+    with pytest.raises(http_client.HttpConnectionError):
+        client.request("GET", "http://127.0.0.1:9/unreachable", timeout=1, retry=False)
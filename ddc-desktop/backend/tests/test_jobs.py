@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import threading
+
+from app.services import job_service
+
+
+def test_job_result_and_progress():
+    def work(job, value):
+        job.report(0.5, "halfway")
+        return {"value": value * 2}
+
+    job = job_service.submit("test", work, 21)
+    assert job.wait(5)
+    data = job.to_dict()
+    assert data["status"] == "succeeded"
+    assert data["result"] == {"value": 42}
+    assert data["progress"] == 1.0
+    assert job_service.get(job.id) is job
+
+
+def test_error_dict_marks_job_failed():
+    job = job_service.submit("test", lambda job: {"error": "nope"})
+    assert job.wait(5)
+    assert job.status == "failed"
+    assert job.error == "nope"
+
+
+def test_inflight_jobs_are_deduplicated_and_cancellable():
+    release = threading.Event()
+
+    def work(job):
+        while not release.wait(0.01):
+            job.check_cancelled()
+        return "done"
+
+    first = job_service.submit("test", work, key="same")
+    second = job_service.submit("test", work, key="same")
+    assert first is second
+
+    job_service.cancel(first.id)
+    assert first.wait(5)
+    assert first.status == "cancelled"
+
+    third = job_service.submit("test", work, key="same")
+    assert third is not first
+    release.set()
+    assert third.wait(5)
+    assert third.result == "done"
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+
+from bench import load
+
+
+def test_clients_are_split_by_weight():
+    assert load.split_clients(23, {"extension": 20, "dashboard": 2, "editor": 1}) == {
+        "extension": 20,
+        "dashboard": 2,
+        "editor": 1,
+    }
+    assert load.split_clients(2, {"extension": 20, "dashboard": 2, "editor": 1}) == {
+        "extension": 1,
+        "dashboard": 1,
+        "editor": 1,
+    }
+
+
+def test_saturation_is_the_first_level_that_falls_behind():
+    levels = [
+        {"clients": 10, "offered_rps": 10.0, "throughput_rps": 9.8, "error_rate": 0.0, "locked": 0},
+        {"clients": 50, "offered_rps": 50.0, "throughput_rps": 49.0, "error_rate": 0.0, "locked": 1},
+        {"clients": 100, "offered_rps": 100.0, "throughput_rps": 60.0, "error_rate": 0.0, "locked": 0},
+    ]
+    assert load.saturation(levels) == 50
+    levels[1]["locked"] = 0
+    assert load.saturation(levels) == 100
+    assert load.saturation(levels[:2]) is None
+
+
+def test_mixed_workload_against_a_live_server(temp_db):
+    async def scenario():
+        server = load.Server(temp_db.parent, load._free_port())
+        await server.start()
+        try:
+            counts = {"extension": 2, "dashboard": 1, "editor": 1}
+            intervals = {"extension": 0.2, "dashboard": 0.5, "editor": 0.5}
+            return await load.run_level("127.0.0.1", server.port, counts, intervals, 1.0), server.locked
+        finally:
+            await server.stop()
+
+    result, locked = asyncio.run(scenario())
+    assert result["error_rate"] == 0.0 and locked == 0
+    assert result["endpoints"]["POST /vscode/event"]["requests"] >= 8
+    assert result["endpoints"]["DELETE /tasks/{id}"]["requests"] >= 1
+    assert result["throughput_rps"] > 0
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import inspect
+
+import pytest
+
+from app.utils import memory
+
+
+@pytest.fixture()
+def tracking(monkeypatch):
+    monkeypatch.setattr(memory, "ROUTE_BUDGETS", {"/big": 1024 * 1024})
+    memory.reset()
+    memory.enable()
+    yield
+    memory.enable(False)
+    memory.reset()
+
+
+def _request(route: str, size: int) -> None:
+    start = memory.begin()
+    payload = [bytes(1024) for _ in range(size // 1024)]
+    del payload
+    memory.end(start, route)
+
+
+def test_peak_per_route_and_budget_flags(tracking, caplog):
+    _request("/small", 64 * 1024)
+    _request("/big", 4 * 1024 * 1024)
+    _request("/big", 128 * 1024)
+
+    report = memory.report()
+    by_route = {item["route"]: item for item in report["routes"]}
+    assert by_route["/big"]["requests"] == 2
+    assert by_route["/big"]["peak_max"] >= 4 * 1024 * 1024
+    assert by_route["/big"]["over_budget"] == 1
+    assert by_route["/small"]["over_budget"] == 0
+    assert report["over_budget"] == ["/big"]
+    assert any("/big peaked at" in record.message for record in caplog.records)
+
+
+def test_top_sites_and_diff_against_baseline(tracking):
+    assert memory.diff() is None
+    assert memory.mark_baseline()
+    site = f"test_memory.py:{inspect.currentframe().f_lineno + 1}"
+    leak = [bytearray(4096) for _ in range(256)]
+
+    report = memory.report(limit=50, with_diff=True)
+    assert any(item["site"].endswith(site) for item in report["top"])
+    grown = next(item for item in report["diff"] if item["site"].endswith(site))
+    assert grown["size_diff"] >= 256 * 4096
+    assert leak
+
+
+def test_disabled_tracking_is_a_no_op():
+    assert memory.begin() is None
+    memory.end(None, "/x")
+    assert memory.report()["enabled"] is False
+    assert memory.top_sites() == []
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import threading
+
+from app.services import task_service
+from app.utils import metrics
+
+
+def _line(text: str, prefix: str) -> str:
+    return next(line for line in text.splitlines() if line.startswith(prefix))
+
+
+def test_histogram_merges_thread_shards_into_cumulative_buckets():
+    histogram = metrics.histogram("test_latency_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+    counter = metrics.counter("test_events_total", "Test events.", ("kind",))
+    metrics.reset()
+
+    def work():
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, '/a"b')
+        counter.inc("x")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    histogram.observe(0.1, '/a"b')
+
+    text = metrics.render()
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert _line(text, 'test_latency_seconds_bucket{route="/a\\"b",le="0.1"}').endswith(" 5")
+    assert _line(text, 'test_latency_seconds_bucket{route="/a\\"b",le="1"}').endswith(" 9")
+    assert _line(text, 'test_latency_seconds_bucket{route="/a\\"b",le="+Inf"}').endswith(" 13")
+    assert _line(text, "test_latency_seconds_count").endswith(" 13")
+    assert _line(text, "test_latency_seconds_sum").endswith(" 22.3")
+    assert _line(text, 'test_events_total{kind="x"}').endswith(" 4")
+    assert _line(text, "process_threads ")
+
+
+def test_sqlite_queries_are_timed_per_service_function(temp_db):
+    metrics.reset()
+    task_service.add_task({"title": "Write tests", "priority": "high"})
+    task_service.list_tasks("all")
+
+    text = metrics.render()
+    assert _line(text, 'ddc_db_query_seconds_count{function="task_service.list_tasks"}')
+    assert _line(text, 'ddc_db_query_seconds_count{function="task_service.add_task"}')
+    assert _line(text, "ddc_db_connections_open ").endswith(" 0")
+    assert int(_line(text, "ddc_db_connections_total ").split()[-1]) >= 2
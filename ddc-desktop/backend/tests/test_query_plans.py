@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from datetime import date
+
+import pytest
+
+from app.services import pomodoro_service, task_service, vscode_service
+from app.utils import db_profiler
+
+
+# Tables that grow with use; a SCAN of one of these is an index regression.
+LARGE_TABLES = {"vscode_activity", "pomodoro_sessions", "tasks"}
+# Listing every task returns the whole table, so scanning it is the plan.
+INTENDED_SCANS = {"SELECT * FROM tasks ORDER BY due_date IS NULL, due_date, created_at"}
+
+
+@pytest.fixture()
+def profiled(temp_db, monkeypatch):
+    monkeypatch.setattr(db_profiler, "_enabled", True)
+    db_profiler.reset()
+    yield temp_db
+    db_profiler.reset()
+
+
+def _workload() -> None:
+    for event in ("active", "typing", "typing", "inactive"):
+        vscode_service.record_event(event)
+    vscode_service.summary(24)
+    vscode_service.history(24)
+    vscode_service.heatmap(days=30)
+    vscode_service.heatmap(year=date.today().year)
+    vscode_service.timeline(date.today().isoformat(), 15)
+
+    pomodoro_service.start_session("focus", 25)
+    pomodoro_service.pause_session()
+    pomodoro_service.resume_session()
+    pomodoro_service.stop_session()
+    for range_name in ("today", "week", "all"):
+        pomodoro_service.stats(range_name)
+
+    task = task_service.add_task({"title": "Profile queries", "priority": "high"})
+    task_service.list_tasks("todo")
+    task_service.list_tasks("all")
+    task_service.update_task(task["id"], {"priority": "low"})
+    task_service.toggle_done(task["id"])
+    task_service.delete_task(task["id"])
+
+
+def test_service_queries_use_indexes(profiled):
+    _workload()
+    with sqlite3.connect(profiled) as conn:
+        offenders = db_profiler.full_scans(conn, LARGE_TABLES, allow=INTENDED_SCANS)
+    assert offenders == []
+
+
+def test_profiler_records_rows_and_logs_slow_queries(profiled, monkeypatch, caplog):
+    monkeypatch.setattr(db_profiler, "SLOW_QUERY_MS", 0)
+    for _ in range(3):
+        vscode_service.record_event("typing")
+    with caplog.at_level(logging.WARNING, logger=db_profiler.logger.name):
+        assert len(vscode_service.history(24)) == 3
+
+    report = db_profiler.report()
+    history = next(item for item in report["recent"] if item["function"] == "vscode_service.history")
+    assert history["rows"] == 3
+    assert history["sql"].startswith("SELECT * FROM vscode_activity")
+    inserts = [item for item in report["statements"] if item["sql"].startswith("INSERT INTO vscode_activity")]
+    assert inserts[0]["count"] == 3 and inserts[0]["rows"] == 3
+    assert any("slow query" in record.message and "LIMIT 50" in record.message for record in caplog.records)
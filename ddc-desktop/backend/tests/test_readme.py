@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+import time
 from pathlib import Path
 
 import app.services.readme_service as readme_service
@@ -36,3 +38,129 @@ def test_generate_project(tmp_path, monkeypatch, temp_db):
     )
     output_path = Path(result["path"])
     assert output_path.exists()
+
+
+def test_generate_project_from_repo(tmp_path, monkeypatch, temp_db):
+    out_dir = tmp_path / "out"
+    monkeypatch.setattr(path_utils, "out_dir", lambda: out_dir)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "package.json").write_text(
+        '{"name": "dragon-web", "description": "Web lair.", "scripts": {"dev": "vite"},'
+        ' "dependencies": {"react": "^18"}, "license": "MIT"}',
+        encoding="utf-8",
+    )
+    (repo / "main.js").write_text("", encoding="utf-8")
+
+    result = readme_service.generate_project_from_repo({"repo_path": str(repo)})
+    content = Path(result["path"]).read_text(encoding="utf-8")
+    assert Path(result["path"]).parent == out_dir
+    assert "# dragon-web" in content
+    assert "Web lair." in content
+    assert "npm run dev" in content
+    assert "- React" in content
+    assert result["repo"]["license"] == "MIT"
+
+    missing = readme_service.generate_project_from_repo({"repo_path": str(tmp_path / "nope")})
+    assert "error" in missing
+
+
+def test_generate_project_with_template_file(tmp_path, monkeypatch, temp_db):
+    monkeypatch.setattr(path_utils, "out_dir", lambda: tmp_path / "out")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "pyproject.toml").write_text(
+        '[project]\nname = "lair"\ndependencies = ["fastapi"]\n', encoding="utf-8"
+    )
+    monkeypatch.setattr(path_utils, "templates_dir", lambda: tmp_path / "templates")
+    template = tmp_path / "templates" / "tpl.md"
+    template.parent.mkdir()
+    template.write_text("# {{title}}\n{{#stack_items}}\n* {{.}}\n{{/stack_items}}\n", encoding="utf-8")
+
+    result = readme_service.generate_project_from_repo(
+        {"repo_path": str(repo), "template_path": "tpl.md"}
+    )
+    assert Path(result["path"]).read_text(encoding="utf-8") == "# lair\n* Python\n* FastAPI\n"
+
+    template.write_text("{{#stack_items}}unclosed", encoding="utf-8")
+    broken = readme_service.generate_project({"title": "x", "description": "y", "template_path": str(template)})
+    assert "error" in broken
+
+
+def test_template_path_outside_templates_dir_is_rejected(tmp_path, monkeypatch, temp_db):
+    monkeypatch.setattr(path_utils, "out_dir", lambda: tmp_path / "out")
+    monkeypatch.setattr(path_utils, "templates_dir", lambda: tmp_path / "templates")
+    (tmp_path / "templates").mkdir()
+    secret = tmp_path / "secret.txt"
+    secret.write_text("token", encoding="utf-8")
+    (tmp_path / "templates" / "link.md").symlink_to(secret)
+
+    for template_path in (str(secret), "../secret.txt", "link.md"):
+        result = readme_service.generate_profile({"name": "Ray", "bio": "Dev", "template_path": template_path})
+        assert "templates" in result["error"]
+    assert not (tmp_path / "out").exists()
+
+
+def test_unchanged_readme_is_deduplicated_and_history_pages(tmp_path, monkeypatch, temp_db):
+    monkeypatch.setattr(path_utils, "out_dir", lambda: tmp_path / "out")
+    payload = {"name": "Ray", "bio": "Dev"}
+
+    first = readme_service.generate_profile(payload)
+    output = Path(first["path"])
+    mtime = output.stat().st_mtime_ns
+    second = readme_service.generate_profile(payload)
+    assert first["changed"] is True
+    assert second == {**first, "changed": False}
+    assert output.stat().st_mtime_ns == mtime
+
+    third = readme_service.generate_profile({"name": "Ray", "bio": "Dragon tamer"})
+    assert third["hash"] != first["hash"]
+    assert readme_service.version(first["hash"])["content"].startswith("# Ray")
+    assert "Dragon tamer" in output.read_text(encoding="utf-8")
+
+    readme_service.generate_project({"title": "DDC", "description": "Desc"})
+    page = readme_service.history(limit=2)
+    assert [item["type"] for item in page["items"]] == ["project", "profile"]
+    rest = readme_service.history(limit=2, cursor=page["next_cursor"])
+    assert [item["content_hash"] for item in rest["items"]] == [first["hash"]]
+    assert rest["next_cursor"] is None
+    assert len(readme_service.history("profile")["items"]) == 2
+
+
+def test_history_is_pruned_with_orphaned_versions(tmp_path, monkeypatch, temp_db):
+    monkeypatch.setattr(path_utils, "out_dir", lambda: tmp_path / "out")
+    monkeypatch.setattr(readme_service, "HISTORY_LIMIT", 2)
+
+    hashes = [readme_service.generate_profile({"name": "Ray", "bio": str(n)})["hash"] for n in range(3)]
+    kept = [item["content_hash"] for item in readme_service.history()["items"]]
+    assert kept == hashes[:0:-1]
+    assert "error" in readme_service.version(hashes[0])
+    assert "error" in readme_service.version("not-a-hash")
+
+
+def test_concurrent_identical_generations_record_one_version(tmp_path, monkeypatch, temp_db):
+    monkeypatch.setattr(path_utils, "out_dir", lambda: tmp_path / "out")
+    now_iso = readme_service.now_iso
+
+    def slow_now_iso():
+        # Widen the window between the "same as latest" check and the insert.
+        time.sleep(0.02)
+        return now_iso()
+
+    monkeypatch.setattr(readme_service, "now_iso", slow_now_iso)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def generate():
+        barrier.wait()
+        results.append(readme_service.generate_profile({"name": "Ray", "bio": "Dev"}))
+
+    threads = [threading.Thread(target=generate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8 and all("error" not in result for result in results)
+    assert len(readme_service.history()["items"]) == 1
+    assert not list((tmp_path / "out").glob("*.tmp"))
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import app.main as main
+from app.utils import sampler
+
+
+def _hot_loop(stop: threading.Event) -> None:
+    total = 0
+    while not stop.is_set():
+        total += sum(range(200))
+
+
+def test_profile_finds_the_hot_function_and_skips_idle_threads():
+    stop = threading.Event()
+    idle = threading.Event()
+    busy = threading.Thread(target=_hot_loop, args=(stop,), name="busy")
+    waiting = threading.Thread(target=idle.wait, name="waiting")
+    busy.start()
+    waiting.start()
+    try:
+        result = sampler.profile(0.3, interval=0.002)
+    finally:
+        stop.set()
+        idle.set()
+        busy.join()
+        waiting.join()
+
+    assert result["samples"] > 0 and result["ticks"] > 10
+    assert result["top"][0]["function"] == "test_sampler.py:_hot_loop"
+    assert result["top"][0]["self_pct"] > 50
+    lines = result["collapsed"].splitlines()
+    assert any(line.startswith("busy;") and "test_sampler.py:_hot_loop " in line for line in lines)
+    assert not any(line.startswith("waiting;") for line in lines)
+
+
+def test_only_one_profile_runs_at_a_time():
+    started = threading.Event()
+    results = []
+
+    def run():
+        started.set()
+        results.append(sampler.profile(0.3))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    started.wait()
+    while not sampler._busy.locked():
+        pass
+    with pytest.raises(sampler.ProfilerBusy):
+        sampler.profile(0.01)
+    thread.join()
+    assert results[0]["ticks"] > 0
+
+
+def test_profile_endpoint_is_off_until_enabled(monkeypatch):
+    monkeypatch.setattr(sampler, "_enabled", False)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main.debug_profile(seconds=0.01, interval_ms=5.0, idle=False, format="json"))
+    assert excinfo.value.status_code == 404
+
+    assert main.debug_profile_toggle(enabled=True)["data"] == {"enabled": True}
+    result = asyncio.run(main.debug_profile(seconds=0.01, interval_ms=5.0, idle=False, format="json"))
+    assert result["data"]["ticks"] > 0
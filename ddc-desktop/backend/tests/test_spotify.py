@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import app.main as main
+from app.services import spotify_service
+from app.utils import http_client
+
+
+class _Spotify(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits: list[str] = []
+    tokens: list[str] = []
+    delay = 0.0
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload: dict | None) -> None:
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        form = urllib.parse.parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if self.path == "/token":
+            self.hits.append(f"token:{form['grant_type'][0]}")
+            access = f"access-{len(self.tokens) + 1}"
+            self.tokens.append(access)
+            self._send(200, {"access_token": access, "token_type": "Bearer", "expires_in": 3600})
+            return
+        self._send(404, None)
+
+    def do_GET(self) -> None:
+        self.hits.append(self.path)
+        if self.headers.get("Authorization") != f"Bearer {self.tokens[-1]}":
+            self._send(401, {"error": {"status": 401, "message": "The access token expired"}})
+            return
+        time.sleep(self.delay)
+        if self.path.startswith("/v1/missing"):
+            self._send(404, {"error": {"status": 404, "message": "Not found."}})
+            return
+        self._send(200, {"path": self.path})
+
+    def do_PUT(self) -> None:
+        self.hits.append(f"PUT {self.path}")
+        self._send(204, None)
+
+
+@pytest.fixture()
+def spotify(temp_db, monkeypatch):
+    _Spotify.hits = []
+    _Spotify.tokens = ["access-0"]
+    _Spotify.delay = 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Spotify)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    local = http_client.HttpClient()
+    local._proxies = {}
+    monkeypatch.setattr(http_client, "_default", local)
+    monkeypatch.setattr(spotify_service, "SPOTIFY_TOKEN_URL", f"{base}/token")
+    monkeypatch.setattr(spotify_service, "SPOTIFY_API_URL", f"{base}/v1")
+    spotify_service.clear_cache()
+    spotify_service._store_tokens(
+        "client", {"access_token": "access-0", "refresh_token": "refresh", "expires_in": 3600}
+    )
+    yield _Spotify
+    local.close()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_tokens_stay_server_side_and_refresh_ahead_of_expiry(spotify):
+    status = spotify_service.exchange_code("client", "code", "verifier", "http://localhost/")
+    assert status["connected"] is True
+    assert "access_token" not in status and "refresh_token" not in status
+
+    with spotify_service.get_connection() as conn:
+        conn.execute("UPDATE spotify_tokens SET expires_at = ?", (time.time() + 30,))
+        conn.commit()
+    assert spotify_service.proxy("GET", "me")["data"] == {"path": "/v1/me"}
+    assert spotify.hits == ["token:authorization_code", "token:refresh_token", "/v1/me"]
+    assert spotify_service._load_tokens()["refresh_token"] == "refresh"
+
+    spotify_service.logout()
+    assert spotify_service.status() == {"connected": False}
+    assert spotify_service.proxy("GET", "me")["status"] == 401
+
+
+def test_rejected_token_is_refreshed_once(spotify):
+    spotify.tokens.append("access-server-side")
+    result = spotify_service.proxy("GET", "playlists/abc")
+    assert result["data"] == {"path": "/v1/playlists/abc"}
+    assert spotify.hits == ["/v1/playlists/abc", "token:refresh_token", "/v1/playlists/abc"]
+
+    missing = spotify_service.proxy("GET", "missing")
+    assert missing == {"error": "Not found.", "status": 404}
+    assert "error" in spotify_service.proxy("GET", "../token")
+
+
+def test_metadata_is_cached_and_concurrent_requests_coalesce(spotify, monkeypatch):
+    spotify.delay = 0.2
+    query = [("limit", "50")]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: spotify_service.proxy("GET", "me/player", query), range(8)))
+    assert all(item["data"] == {"path": "/v1/me/player?limit=50"} for item in results)
+    assert spotify.hits == ["/v1/me/player?limit=50"]
+    assert spotify_service.cache_stats()["coalesced"] == 7
+
+    spotify.delay = 0.0
+    for _ in range(3):
+        spotify_service.proxy("GET", "playlists/abc/tracks", [("offset", "0"), ("limit", "100")])
+    spotify_service.proxy("GET", "playlists/abc/tracks", [("limit", "100"), ("offset", "0")])
+    assert spotify.hits.count("/v1/playlists/abc/tracks?offset=0&limit=100") == 1
+
+    assert spotify_service.proxy("PUT", "me/player/pause")["status"] == 204
+    spotify_service.proxy("GET", "me/player", query)
+    assert spotify.hits.count("/v1/me/player?limit=50") == 2
+
+    monkeypatch.setattr(spotify_service, "CACHE_SIZE", 2)
+    spotify_service.proxy("GET", "albums/1")
+    spotify_service.proxy("GET", "albums/2")
+    spotify_service.proxy("GET", "playlists/abc/tracks", [("offset", "0"), ("limit", "100")])
+    assert spotify.hits.count("/v1/playlists/abc/tracks?offset=0&limit=100") == 2
+    assert spotify_service.cache_stats()["entries"] == 2
+
+
+def _request(origin: str | None) -> Request:
+    headers = [(b"origin", origin.encode())] if origin else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_spotify_and_debug_toggles_reject_foreign_origins():
+    main.trusted_origin(_request(None))
+    main.trusted_origin(_request(main.ALLOWED_ORIGINS[0]))
+    with pytest.raises(HTTPException) as excinfo:
+        main.trusted_origin(_request("https://evil.example"))
+    assert excinfo.value.status_code == 403
+
+    guarded = set()
+    for route in main.app.routes:
+        dependant = getattr(route, "dependant", None)
+        if dependant is not None and any(dep.call is main.trusted_origin for dep in dependant.dependencies):
+            guarded.update((route.path, method) for method in route.methods)
+    assert ("/spotify/api/{path:path}", "GET") in guarded
+    assert ("/spotify/api/{path:path}", "PUT") in guarded
+    assert {("/debug/db", "PUT"), ("/debug/memory", "PUT"), ("/debug/profile", "PUT")} <= guarded
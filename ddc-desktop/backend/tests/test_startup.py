@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import sqlite3
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import app.db as db
+from app.utils.lazy import LazyModule
+
+
+def _index_names(path) -> set[str]:
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_init_db_skips_ddl_while_schema_version_matches(temp_db):
+    with sqlite3.connect(temp_db) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+        conn.execute("DROP INDEX idx_tasks_status")
+    db.init_db()
+    assert "idx_tasks_status" not in _index_names(temp_db)
+
+    with sqlite3.connect(temp_db) as conn:
+        conn.execute("PRAGMA user_version = 0")
+    db.init_db()
+    assert "idx_tasks_status" in _index_names(temp_db)
+
+
+def test_importing_the_app_defers_service_modules():
+    code = (
+        "import sys, app.main; "
+        "print(','.join(sorted(name for name in sys.modules if name.startswith('app.services.'))))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    assert output == ""
+
+
+def test_startup_restores_watched_repos_in_the_background(temp_db, monkeypatch):
+    import app.main as main
+
+    with sqlite3.connect(temp_db) as conn:
+        conn.execute("INSERT INTO git_watched_repos (path, added_at) VALUES ('/repo', '2026-01-01')")
+    release, restored = threading.Event(), threading.Event()
+
+    class _Watch:
+        def restore(self):
+            release.wait(5)
+            restored.set()
+
+    monkeypatch.setattr(main, "watch_service", _Watch())
+    main.startup()
+    assert not restored.is_set()
+    release.set()
+    assert restored.wait(5)
+
+
+def test_lazy_module_imports_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = LazyModule("colorsys")
+    assert not module.loaded
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert module.loaded
+    assert module.rgb_to_hsv is sys.modules["colorsys"].rgb_to_hsv
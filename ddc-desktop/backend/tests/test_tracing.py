@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.services import git_service, vscode_service
+from app.utils import tracing
+
+
+@pytest.fixture(autouse=True)
+def clean_traces():
+    tracing.reset()
+    yield
+    tracing.reset()
+
+
+def test_spans_nest_under_the_request_trace(temp_db):
+    vscode_service.record_event("typing")
+    with tracing.trace("GET /vscode/heatmap", path="/vscode/heatmap"):
+        vscode_service.heatmap(days=30)
+        # The git executor carries the trace over to its worker thread.
+        git_service.submit(vscode_service.available_years).result()
+
+    (item,) = tracing.traces()
+    spans = {span["id"]: span for span in item["spans"]}
+    names = [span["name"] for span in item["spans"]]
+    assert names[0] == "vscode_service.heatmap"
+    assert names.count("vscode_service.available_years") == 2
+    assert "vscode_service._day_items" in names
+    day_loop = next(span for span in item["spans"] if span["name"] == "vscode_service._day_items")
+    assert spans[day_loop["parent"]]["name"] == "vscode_service.heatmap"
+    queries = [span for span in item["spans"] if span["name"] == "db.execute"]
+    assert queries and all(span["attrs"]["function"].startswith("vscode_service.") for span in queries)
+    assert any("GROUP BY" in span["attrs"]["sql"] for span in queries)
+    assert len({span["thread"] for span in item["spans"]}) == 2
+
+
+def test_untraced_code_records_nothing(temp_db):
+    with tracing.span("orphan") as span:
+        vscode_service.heatmap(days=7)
+    assert span.recording is False
+    assert tracing.traces() == []
+
+
+def test_ring_buffer_keeps_the_slowest_and_exports_chrome_events(monkeypatch):
+    monkeypatch.setattr(tracing, "SLOWEST_SIZE", 2)
+    for delay in (0.03, 0.0, 0.02, 0.0, 0.0):
+        with tracing.trace(f"req {delay}"):
+            with tracing.span("work", delay=delay):
+                time.sleep(delay)
+
+    assert [item["name"] for item in tracing.traces(limit=2)] == ["req 0.0", "req 0.0"]
+    slowest = tracing.traces(slowest=True)
+    assert [item["name"] for item in slowest] == ["req 0.03", "req 0.02"]
+
+    events = tracing.chrome(slowest)["traceEvents"]
+    complete = [event for event in events if event["ph"] == "X"]
+    assert [event["name"] for event in complete] == ["req 0.03", "work", "req 0.02", "work"]
+    assert {event["pid"] for event in complete} == {1, 2}
+    root, child = complete[:2]
+    assert root["ts"] <= child["ts"] and child["dur"] <= root["dur"]
+    assert child["args"] == {"delay": 0.03}
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import threading
+import time
+
+import pytest
+
+from app.services import git_service, watch_service
+from app.utils import inotify
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.fixture()
+def repo(tmp_path, temp_db, monkeypatch):
+    monkeypatch.setattr(watch_service, "DEBOUNCE_SECONDS", 0.05)
+    monkeypatch.setattr(watch_service, "POLL_MIN_SECONDS", 0.05)
+    monkeypatch.setattr(watch_service, "LOOP_MAX_SECONDS", 0.1)
+    git_service.clear_cache()
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "config", "user.email", "dragon@example.com")
+    _git(path, "config", "user.name", "Dragon")
+    (path / "a.txt").write_text("a", encoding="utf-8")
+    _git(path, "add", "a.txt")
+    _git(path, "commit", "-q", "-m", "first commit")
+    yield path
+    watch_service.shutdown()
+
+
+def _untracked(repo_path):
+    cached = watch_service.cached(str(repo_path))
+    return cached is not None and cached["untracked"] == 1 and cached
+
+
+@pytest.mark.skipif(not inotify.available(), reason="inotify not available")
+def test_watch_refreshes_on_inotify_change(repo):
+    result = watch_service.watch(str(repo))
+    assert result["mode"] == "inotify"
+    assert result["summary"]["untracked"] == 0
+
+    (repo / "sub").mkdir()
+    (repo / "sub" / "b.txt").write_text("b", encoding="utf-8")
+    summary = _wait_for(lambda: _untracked(repo))
+    assert summary["branch"] == "main"
+
+
+def test_watch_falls_back_to_polling_and_pushes_updates(repo, monkeypatch):
+    monkeypatch.setattr(inotify, "available", lambda: False)
+
+    async def scenario():
+        queue = watch_service.subscribe()
+        try:
+            result = watch_service.watch(str(repo))
+            assert result["mode"] == "poll"
+            (repo / "b.txt").write_text("b", encoding="utf-8")
+            while True:
+                event = await asyncio.wait_for(queue.get(), timeout=10)
+                if event["summary"]["untracked"] == 1:
+                    return event
+        finally:
+            watch_service.unsubscribe(queue)
+
+    event = asyncio.run(scenario())
+    assert event["repo"] == str(repo.resolve())
+    assert _wait_for(lambda: _untracked(repo))
+    assert [item["repo"] for item in watch_service.watched()] == [str(repo.resolve())]
+
+    assert watch_service.unwatch(str(repo)) == {"repo": str(repo.resolve()), "watching": False}
+    assert watch_service.cached(str(repo)) is None
+    assert "error" in watch_service.unwatch(str(repo))
+
+
+def test_registering_a_repo_does_not_block_readers(repo, monkeypatch):
+    monkeypatch.setattr(inotify, "available", lambda: False)
+    entered, release = threading.Event(), threading.Event()
+    status_digest = git_service.status_digest
+
+    def slow_digest(*args, **kwargs):
+        entered.set()
+        release.wait(5)
+        return status_digest(*args, **kwargs)
+
+    monkeypatch.setattr(git_service, "status_digest", slow_digest)
+    thread = threading.Thread(target=watch_service.watch, args=(str(repo),))
+    thread.start()
+    try:
+        assert entered.wait(5)
+        assert watch_service._lock.acquire(timeout=1)
+        watch_service._lock.release()
+        assert watch_service.watched() == []
+    finally:
+        release.set()
+        thread.join()
+    assert [item["mode"] for item in watch_service.watched()] == ["poll"]
+
+
+@pytest.mark.skipif(not inotify.available(), reason="inotify not available")
+def test_nested_repos_do_not_share_watches(repo):
+    child = repo / "child"
+    child.mkdir()
+    _git(child, "init", "-q", "-b", "main")
+    watch_service.watch(str(repo))
+    watch_service.watch(str(child))
+    parent_repo = watch_service._repos[str(repo.resolve())]
+    child_repo = watch_service._repos[str(child.resolve())]
+    assert parent_repo.wds and child_repo.wds
+    assert parent_repo.wds.isdisjoint(child_repo.wds)
+
+    assert watch_service.unwatch(str(child))["watching"] is False
+    (repo / "b.txt").write_text("b", encoding="utf-8")
+    # child/ itself is untracked in the parent, plus b.txt.
+    assert _wait_for(lambda: (watch_service.cached(str(repo)) or {}).get("untracked") == 2)
+
+
+@pytest.mark.skipif(not inotify.available(), reason="inotify not available")
+def test_unwatched_build_dirs_expire_the_cached_summary(repo, monkeypatch):
+    (repo / "build").mkdir()
+    watch_service.watch(str(repo))
+    assert _wait_for(lambda: watch_service.cached(str(repo)))
+    monkeypatch.setattr(git_service, "CACHE_TTL_SECONDS", 0.0)
+    assert watch_service.cached(str(repo)) is None
@@ -33,7 +33,7 @@ const SPOTIFY_SCOPES = [
   "playlist-read-private",
   "playlist-read-collaborative"
 ];
-const SPOTIFY_TOKEN_BUFFER_MS = 60 * 1000;
+const SPOTIFY_API_URL = "https://api.spotify.com/v1";
 const SPOTIFY_PKCE_KEY = "ddc_spotify_pkce";
 const SPOTIFY_AUTH_KEY = "ddc_spotify_auth";
 const SPOTIFY_TRACKS_KEY = "ddc_spotify_tracks";
@@ -395,82 +395,23 @@ export default function App() {
         window.history.replaceState({}, "", window.location.pathname);
         return;
       }
-      const data = res.data || {};
-      const expiresIn = Number(data.expires_in || 0);
-      const expiresAt = Date.now() + Math.max(expiresIn * 1000 - SPOTIFY_TOKEN_BUFFER_MS, 0);
-      setSpotifyAuth({
-        access_token: data.access_token,
-        refresh_token: data.refresh_token,
-        token_type: data.token_type,
-        scope: data.scope,
-        expires_at: expiresAt
-      });
+      setSpotifyAuth({ connected: true, scope: res.data?.scope });
       setSpotifyMessage("Spotify connected.");
       window.history.replaceState({}, "", window.location.pathname);
     });
   }, [baseUrl, settings.spotifyClientId]);
 
-  const ensureSpotifyToken = async () => {
-    if (!spotifyAuth?.access_token) {
-      return null;
-    }
-    if (spotifyAuth.expires_at && Date.now() < spotifyAuth.expires_at) {
-      return spotifyAuth.access_token;
-    }
-    if (!spotifyAuth.refresh_token) {
-      return spotifyAuth.access_token;
-    }
-    const clientId = settings.spotifyClientId?.trim();
-    if (!clientId) {
-      return spotifyAuth.access_token;
-    }
-    const refresh = await apiPost(baseUrl, "/spotify/refresh", {
-      client_id: clientId,
-      refresh_token: spotifyAuth.refresh_token
-    });
-    if (!refresh.ok) {
-      setSpotifyMessage(refresh.message || "Spotify refresh failed. Please reconnect.");
-      return null;
-    }
-    const data = refresh.data || {};
-    const expiresIn = Number(data.expires_in || 0);
-    const expiresAt = Date.now() + Math.max(expiresIn * 1000 - SPOTIFY_TOKEN_BUFFER_MS, 0);
-    const nextAuth = {
-      ...spotifyAuth,
-      access_token: data.access_token,
-      token_type: data.token_type || spotifyAuth.token_type,
-      scope: data.scope || spotifyAuth.scope,
-      expires_at: expiresAt,
-      refresh_token: data.refresh_token || spotifyAuth.refresh_token
-    };
-    setSpotifyAuth(nextAuth);
-    return nextAuth.access_token;
-  };
-
   const spotifyFetch = async (url) => {
-    const token = await ensureSpotifyToken();
-    if (!token) {
-      return { error: "Spotify is not connected." };
-    }
-    const response = await fetch(url, {
-      headers: { Authorization: `Bearer ${token}` }
-    });
-    if (response.status === 401 && spotifyAuth?.refresh_token) {
-      const refreshed = await ensureSpotifyToken();
-      if (refreshed) {
-        const retry = await fetch(url, {
-          headers: { Authorization: `Bearer ${refreshed}` }
-        });
-        if (!retry.ok) {
-          return { error: "Spotify request failed." };
-        }
-        return retry.json();
+    // Tokens live in the backend; it proxies (and caches) Web API calls.
+    const path = url.replace(SPOTIFY_API_URL, "");
+    const res = await apiGet(baseUrl, `/spotify/api${path}`);
+    if (!res.ok) {
+      if (res.message === "Spotify is not connected.") {
+        setSpotifyAuth(null);
       }
+      return { error: res.message || "Spotify request failed." };
     }
-    if (!response.ok) {
-      return { error: "Spotify request failed." };
-    }
-    return response.json();
+    return res.data || {};
   };
 
   const connectSpotify = async () => {
@@ -498,7 +439,8 @@ export default function App() {
     window.location.href = authUrl.toString();
   };
 
-  const disconnectSpotify = () => {
+  const disconnectSpotify = async () => {
+    await apiDelete(baseUrl, "/spotify/session");
     setSpotifyAuth(null);
     setSpotifyProfile(null);
     setSpotifyPlaylists([]);
@@ -507,7 +449,7 @@ export default function App() {
   };
 
   const loadSpotifyProfile = async () => {
-    const data = await spotifyFetch("https://api.spotify.com/v1/me");
+    const data = await spotifyFetch(`${SPOTIFY_API_URL}/me`);
     if (data.error) {
       setSpotifyMessage(data.error);
       return;
@@ -518,7 +460,7 @@ export default function App() {
   const loadSpotifyPlaylists = async () => {
     setSpotifySyncing(true);
     const items = [];
-    let nextUrl = "https://api.spotify.com/v1/me/playlists?limit=50";
+    let nextUrl = `${SPOTIFY_API_URL}/me/playlists?limit=50`;
     while (nextUrl) {
       const data = await spotifyFetch(nextUrl);
       if (data.error) {
@@ -552,7 +494,7 @@ export default function App() {
     }
     setSpotifySyncing(true);
     const tracks = [];
-    let nextUrl = `https://api.spotify.com/v1/playlists/${playlistId}/tracks?limit=100&fields=items(track(id,name,artists(name))),next`;
+    let nextUrl = `${SPOTIFY_API_URL}/playlists/${playlistId}/tracks?limit=100&fields=items(track(id,name,artists(name))),next`;
     while (nextUrl) {
       const data = await spotifyFetch(nextUrl);
       if (data.error) {
@@ -712,11 +654,11 @@ export default function App() {
   };
 
   useEffect(() => {
-    if (spotifyAuth?.access_token) {
+    if (spotifyAuth?.connected) {
       loadSpotifyProfile();
       loadSpotifyPlaylists();
     }
-  }, [spotifyAuth?.access_token]);
+  }, [spotifyAuth?.connected]);
 
   return (
     <div className="app">
@@ -761,7 +703,7 @@ export default function App() {
       {tab === "Spotify" && (
         <SpotifyPanel
           clientId={settings.spotifyClientId}
-          connected={Boolean(spotifyAuth?.access_token)}
+          connected={Boolean(spotifyAuth?.connected)}
           profile={spotifyProfile}
           playlists={spotifyPlaylists}
           syncing={spotifySyncing}
@@ -1324,7 +1266,7 @@ function SettingsPanel({ settings, onSave }) {
 function GitHubPanel({ baseUrl }) {
   const [summary, setSummary] = useState({
     profile: null,
-    repos: [],
+    repo_stats: null,
     contributions: [],
     available_years: [],
     year: null,
@@ -1335,14 +1277,51 @@ function GitHubPanel({ baseUrl }) {
   const [savedGithubUrl, setSavedGithubUrl] = useState("");
   const [syncing, setSyncing] = useState(false);
   const [githubYear, setGithubYear] = useState(new Date().getFullYear());
+  const [repos, setRepos] = useState([]);
+  const [repoCursor, setRepoCursor] = useState(null);
+  const [repoSort, setRepoSort] = useState("updated");
+  const [repoQuery, setRepoQuery] = useState("");
+  const [githubUser, setGithubUser] = useState("");
+  const [githubProfiles, setGithubProfiles] = useState([]);
+
+  const userParam = githubUser ? `&user=${encodeURIComponent(githubUser)}` : "";
+
+  const loadProfiles = () => {
+    apiGet(baseUrl, "/github/profiles").then((res) => {
+      if (res.ok && Array.isArray(res.data)) {
+        setGithubProfiles(res.data);
+      }
+    });
+  };
+
+  const loadRepos = (cursor = null) => {
+    const params = new URLSearchParams({ sort: repoSort, limit: "20" });
+    if (repoQuery.trim()) {
+      params.set("q", repoQuery.trim());
+    }
+    if (cursor) {
+      params.set("cursor", cursor);
+    }
+    if (githubUser) {
+      params.set("user", githubUser);
+    }
+    apiGet(baseUrl, `/github/repos?${params.toString()}`).then((res) => {
+      if (!res.ok) {
+        return;
+      }
+      const items = Array.isArray(res.data?.items) ? res.data.items : [];
+      setRepos((prev) => (cursor ? [...prev, ...items] : items));
+      setRepoCursor(res.data?.next_cursor || null);
+    });
+  };
 
   const refresh = () => {
-    apiGet(baseUrl, `/github/summary?year=${githubYear}`).then((res) => {
+    apiGet(baseUrl, `/github/summary?year=${githubYear}${userParam}`).then((res) => {
       if (!res.ok) {
         setMessage(res.message || "Failed to load GitHub data.");
         return;
       }
-      setSummary(res.data || { profile: null, repos: [], contributions: [] });
+      setSummary(res.data || { profile: null, repo_stats: null, contributions: [] });
       const available = res.data?.available_years || [];
       const serverYear = res.data?.year;
       if (serverYear && Number.isInteger(serverYear)) {
@@ -1360,14 +1339,20 @@ function GitHubPanel({ baseUrl }) {
     setSavedGithubUrl(stored);
   }, []);
 
-  useEffect(refresh, [baseUrl, githubYear]);
+  useEffect(refresh, [baseUrl, githubYear, githubUser]);
+  useEffect(() => loadRepos(), [baseUrl, repoSort, repoQuery, githubUser]);
+  useEffect(loadProfiles, [baseUrl]);
 
   const profile = summary.profile || {};
-  const repos = Array.isArray(summary.repos) ? summary.repos : [];
+  const repoTotal = summary.repo_stats?.total ?? 0;
   const contributions = Array.isArray(summary.contributions) ? summary.contributions : [];
   const avatarUrl = profile.avatar_url ? `${baseUrl}${profile.avatar_url}` : "/dragon.svg";
   const contribData = buildContributionGrid(contributions, githubYear);
-  const totalContrib = contributions.reduce((acc, item) => acc + (item.count || 0), 0);
+  const yearStats = summary.stats || null;
+  const allStats = summary.stats_all || null;
+  const totalContrib = yearStats
+    ? yearStats.total
+    : contributions.reduce((acc, item) => acc + (item.count || 0), 0);
   const availableYears = Array.isArray(summary.available_years) && summary.available_years.length
     ? summary.available_years.slice().sort((a, b) => b - a)
     : [githubYear];
@@ -1394,15 +1379,39 @@ function GitHubPanel({ baseUrl }) {
     localStorage.setItem("ddc_github_url", normalized);
     setSavedGithubUrl(normalized);
     setSyncing(true);
-      apiPost(baseUrl, "/github/sync", { profile: value, year: githubYear }).then((res) => {
-        setSyncing(false);
-        if (!res.ok) {
-          window.alert(res.message || "Failed to sync GitHub data.");
+    const finish = (res) => {
+      setSyncing(false);
+      const job = res.data || {};
+      if (!res.ok || job.status !== "succeeded") {
+        window.alert(res.message || job.error || "Failed to sync GitHub data.");
+        return;
+      }
+      window.alert("GitHub data synced.");
+      loadProfiles();
+      const syncedUser = job.result?.profile?.username;
+      if (syncedUser && syncedUser !== githubUser) {
+        setGithubUser(syncedUser);
+        return;
+      }
+      refresh();
+      loadRepos();
+    };
+    const poll = (jobId) => {
+      apiGet(baseUrl, `/jobs/${jobId}?wait=10`).then((res) => {
+        if (res.ok && ["queued", "running"].includes(res.data?.status)) {
+          poll(jobId);
           return;
         }
-        window.alert("GitHub data synced.");
-        refresh();
+        finish(res);
       });
+    };
+    apiPost(baseUrl, "/github/sync", { profile: value, year: githubYear }).then((res) => {
+      if (!res.ok) {
+        finish(res);
+        return;
+      }
+      poll(res.data.id);
+    });
   };
 
   return (
@@ -1414,7 +1423,7 @@ function GitHubPanel({ baseUrl }) {
           {profile.username ? <div className="github-handle">@{profile.username}</div> : null}
           <div className="github-bio">{profile.bio || "No profile bio available."}</div>
           <div className="github-meta">
-            <span>Repos: {repos.length}</span>
+            <span>Repos: {repoTotal}</span>
             <span>Followers: {profile.followers ?? "-"}</span>
             <span>Following: {profile.following ?? "-"}</span>
             {profile.location ? <span>Location: {profile.location}</span> : null}
@@ -1441,6 +1450,19 @@ function GitHubPanel({ baseUrl }) {
               <div className="muted">No link saved.</div>
             )}
           </div>
+          {githubProfiles.length > 1 ? (
+            <div className="github-link-row">
+              <label>Stored profiles</label>
+              <select value={githubUser} onChange={(event) => setGithubUser(event.target.value)}>
+                <option value="">Latest synced</option>
+                {githubProfiles.map((item) => (
+                  <option key={item.username} value={item.username}>
+                    {item.name || item.username} (@{item.username})
+                  </option>
+                ))}
+              </select>
+            </div>
+          ) : null}
           {summary.message ? <div className="muted">{summary.message}</div> : null}
           {message ? <div className="error">{message}</div> : null}
         </div>
@@ -1452,6 +1474,16 @@ function GitHubPanel({ baseUrl }) {
             <h3 className="section-title section-title-lg">GitHub Contributions</h3>
             <div className="muted">Calendar year view (Jan - Dec)</div>
             <div className="muted">Total contributions: {totalContrib}</div>
+            {yearStats ? (
+              <div className="muted">
+                Longest streak: {yearStats.longest_streak} days | Current streak: {yearStats.current_streak} days
+              </div>
+            ) : null}
+            {allStats && allStats.years.length > 1 ? (
+              <div className="muted">
+                All years: {allStats.total} contributions | Longest streak: {allStats.longest_streak} days
+              </div>
+            ) : null}
           </div>
           <div className="year-picker">
             <label>Year</label>
@@ -1513,6 +1545,18 @@ function GitHubPanel({ baseUrl }) {
             <h3 className="section-title section-title-lg">Repositories</h3>
             <div className="muted">Snapshot from local data file.</div>
           </div>
+          <div className="year-picker">
+            <input
+              value={repoQuery}
+              onChange={(event) => setRepoQuery(event.target.value)}
+              placeholder="Filter by name"
+            />
+            <select value={repoSort} onChange={(event) => setRepoSort(event.target.value)}>
+              <option value="updated">Updated</option>
+              <option value="stars">Stars</option>
+              <option value="name">Name</option>
+            </select>
+          </div>
         </div>
         <div className="github-repo-list">
           {repos.length ? (
@@ -1549,6 +1593,9 @@ function GitHubPanel({ baseUrl }) {
             <div className="muted">No repositories found.</div>
           )}
         </div>
+        {repoCursor ? (
+          <button onClick={() => loadRepos(repoCursor)}>Load more</button>
+        ) : null}
       </div>
     </div>
   );
@@ -1850,6 +1897,36 @@ function GitPanel({ baseUrl }) {
   const [repoPath, setRepoPath] = useState("");
   const [summary, setSummary] = useState(null);
   const [message, setMessage] = useState("");
+  const [watchedRepo, setWatchedRepo] = useState("");
+
+  useEffect(() => {
+    if (!watchedRepo) return undefined;
+    const source = new EventSource(`${baseUrl}/git/events`);
+    source.addEventListener("summary", (event) => {
+      const item = JSON.parse(event.data);
+      if (item.repo === watchedRepo && item.summary) {
+        setSummary(item.summary);
+      }
+    });
+    return () => source.close();
+  }, [baseUrl, watchedRepo]);
+
+  const toggleWatch = () => {
+    if (watchedRepo) {
+      apiDelete(baseUrl, `/git/watch?repo_path=${encodeURIComponent(watchedRepo)}`);
+      setWatchedRepo("");
+      return;
+    }
+    apiPost(baseUrl, "/git/watch", { repo_path: repoPath }).then((res) => {
+      if (!res.ok) {
+        setMessage(res.message || "Gagal memantau repo.");
+        return;
+      }
+      setSummary(res.data.summary);
+      setWatchedRepo(res.data.repo);
+      setMessage("");
+    });
+  };
 
   const fetchSummary = () => {
     apiPost(baseUrl, "/git/summary", { repo_path: repoPath }).then((res) => {
@@ -1873,6 +1950,9 @@ function GitPanel({ baseUrl }) {
         </div>
         <div className="actions">
           <button className="primary" onClick={fetchSummary}>Check</button>
+          <button className="ghost" onClick={toggleWatch}>
+            {watchedRepo ? "Stop live" : "Live"}
+          </button>
         </div>
         {message && <div className="error">{message}</div>}
         {summary && (
@@ -1883,6 +1963,7 @@ function GitPanel({ baseUrl }) {
             <div>Last commit: {summary.last_commit || "-"}</div>
             <div>Staged: {summary.staged ?? "-"}</div>
             <div>Unstaged: {summary.unstaged ?? "-"}</div>
+            <div>Untracked: {summary.untracked ?? "-"}{summary.partial ? " (sampel)" : ""}</div>
           </div>
         )}
       </div>
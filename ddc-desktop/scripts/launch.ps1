@@ -11,6 +11,12 @@ function Ensure-Setup {
     Write-Host "Setup belum lengkap, menjalankan setup..." -ForegroundColor Yellow
     & (Join-Path $scriptDir "setup.ps1")
   }
+
+  # Venvs created before the backend shared the repo root packages lack them.
+  & $backendPython -c "import importlib.util, sys; sys.exit(importlib.util.find_spec('packages') is None)"
+  if ($LASTEXITCODE -ne 0) {
+    & $backendPython -m pip install --no-deps -e (Split-Path -Parent $root)
+  }
 }
 
 function Install-VscodeExtension {
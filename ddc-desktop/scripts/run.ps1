@@ -12,4 +12,10 @@ if (-not (Test-Path $backendPython) -or -not (Test-Path $nodeModules)) {
   & (Join-Path $scriptDir "setup.ps1")
 }
 
+# Venvs created before the backend shared the repo root packages lack them.
+& $backendPython -c "import importlib.util, sys; sys.exit(importlib.util.find_spec('packages') is None)"
+if ($LASTEXITCODE -ne 0) {
+  & $backendPython -m pip install --no-deps -e (Split-Path -Parent $root)
+}
+
 & (Join-Path $scriptDir "dev.ps1")
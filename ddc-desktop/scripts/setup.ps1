@@ -12,6 +12,8 @@ if (-not (Test-Path ".\\backend\\.venv\\Scripts\\python.exe")) {
 & ".\\backend\\.venv\\Scripts\\python.exe" -m pip install -U pip setuptools wheel
 Set-Location ".\\backend"
 & ".\\.venv\\Scripts\\python.exe" -m pip install -e ".[dev]"
+# Shared git/template/introspection code from the repo root packages (stdlib only).
+& ".\\.venv\\Scripts\\python.exe" -m pip install --no-deps -e "..\\.."
 Set-Location $root
 
 Set-Location ".\\frontend"
@@ -2,12 +2,28 @@
 
 from __future__ import annotations
 
-from modules.repo_forge.templates import PROFILE_TEMPLATES, PROJECT_TEMPLATES
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
 
+from modules.repo_forge.engine import Template, compile_template
+from modules.repo_forge.introspect import PRUNE_DIRS, introspect, project_fields
+from modules.repo_forge.templates import PROFILE_TEMPLATES, PROJECT_DEFAULTS, PROJECT_TEMPLATES
 
-def render_profile_readme(name: str, style: str = "clean") -> str:
-    template = PROFILE_TEMPLATES.get(style, PROFILE_TEMPLATES["clean"])
-    return template.format(
+
+PACKAGE_MANIFESTS = ("pyproject.toml", "package.json", "Cargo.toml", "go.mod", "setup.py")
+BATCH_WORKERS = min(16, (os.cpu_count() or 2) * 2)
+
+
+def _template(templates: dict[str, str], style: str, template: Template | None) -> Template:
+    if template is not None:
+        return template
+    return compile_template(templates.get(style, templates["clean"]), style)
+
+
+def render_profile_readme(name: str, style: str = "clean", template: Template | None = None) -> str:
+    return _template(PROFILE_TEMPLATES, style, template).render(
         name=name,
         about="Write a short bio: what you build, what you love, what you are exploring.",
         github_handle="https://github.com/your-handle",
@@ -15,9 +31,86 @@ def render_profile_readme(name: str, style: str = "clean") -> str:
     )
 
 
-def render_project_readme(title: str, description: str, style: str = "clean") -> str:
-    template = PROJECT_TEMPLATES.get(style, PROJECT_TEMPLATES["clean"])
-    return template.format(
+def render_project_readme(
+    title: str,
+    description: str,
+    style: str = "clean",
+    usage: str | None = None,
+    stack: list[str] | None = None,
+    license: str | None = None,
+    languages: str | None = None,
+    template: Template | None = None,
+) -> str:
+    return _template(PROJECT_TEMPLATES, style, template).render(
         title=title,
-        description=description or "Add a crisp summary of the project goal and audience.",
+        description=description or PROJECT_DEFAULTS["description"],
+        usage=usage or PROJECT_DEFAULTS["usage"],
+        stack=stack or [],
+        languages=languages or "",
+        license=license or PROJECT_DEFAULTS["license"],
+    )
+
+
+def render_project_readme_from_repo(
+    repo_path: Path,
+    style: str = "clean",
+    title: str | None = None,
+    description: str | None = None,
+    template: Template | None = None,
+) -> str:
+    """Render a project README pre-filled from an introspected repository."""
+    fields = project_fields(introspect(repo_path))
+    return render_project_readme(
+        title=title or fields["title"],
+        description=description or fields["description"],
+        style=style,
+        usage=fields["usage"],
+        stack=fields["stack"],
+        license=fields["license"],
+        languages=fields["languages"],
+        template=template,
     )
+
+
+def discover_packages(root: Path, max_depth: int = 4) -> list[Path]:
+    """Find package directories (a manifest next to them) below a monorepo root."""
+    root = root.resolve()
+    found: list[Path] = []
+    pending: list[tuple[Path, int]] = [(root, 0)]
+    while pending:
+        current, depth = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        names = {entry.name for entry in entries}
+        if current != root and any(name in names for name in PACKAGE_MANIFESTS):
+            found.append(current)
+        if depth >= max_depth:
+            continue
+        for entry in entries:
+            if entry.name in PRUNE_DIRS or entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                pending.append((Path(entry.path), depth + 1))
+    return sorted(found)
+
+
+def render_batch(
+    packages: list[Path],
+    style: str = "clean",
+    template: Template | None = None,
+    workers: int = BATCH_WORKERS,
+) -> Iterator[tuple[Path, str | None, Exception | None]]:
+    """Render a README for every package in parallel, yielding results in input order."""
+    template = _template(PROJECT_TEMPLATES, style, template)
+
+    def _one(package: Path) -> tuple[Path, str | None, Exception | None]:
+        try:
+            return package, render_project_readme_from_repo(package, style, template=template), None
+        except Exception as exc:  # noqa: BLE001
+            return package, None, exc
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        yield from pool.map(_one, packages)
+
@@ -0,0 +1,171 @@
+"""Small compiled template engine for README generation.
+
+Templates use a Mustache-like subset::
+
+    {{name}}                 value lookup (dotted paths, ``{{.}}`` for the current item)
+    {{#items}}..{{/items}}   section: loops over lists, enters dicts, renders once if truthy
+    {{^items}}..{{/items}}   inverted section: renders when the value is missing or empty
+    {{! comment }}
+
+A tag alone on its line (sections and comments) does not leave a blank line.
+Each source is parsed once into a render plan; ``compile_template`` and
+``load_template`` cache the compiled form.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+
+_TAG_RE = re.compile(r"\{\{\s*([#^/!]?)\s*(.*?)\s*\}\}", re.S)
+_MISSING = object()
+
+
+class TemplateError(ValueError):
+    """Raised when a template cannot be parsed."""
+
+
+def _tokens(source: str) -> list[tuple[str, str]]:
+    """Split source into ``("text", s)`` and ``(kind, name)`` tokens, dropping standalone lines."""
+    tokens: list[tuple[str, str]] = []
+    position = 0
+    for match in _TAG_RE.finditer(source):
+        kind, name = match.group(1), match.group(2)
+        start, end = match.span()
+        if kind:
+            line_start = source.rfind("\n", 0, start) + 1
+            line_end = source.find("\n", end)
+            after_end = len(source) if line_end == -1 else line_end + 1
+            if (
+                line_start >= position
+                and not source[line_start:start].strip()
+                and not source[end:after_end].strip()
+            ):
+                start, end = line_start, after_end
+        if start > position:
+            tokens.append(("text", source[position:start]))
+        if kind != "!":
+            tokens.append((kind or "var", name))
+        position = end
+    if position < len(source):
+        tokens.append(("text", source[position:]))
+    return tokens
+
+
+def _path(name: str) -> tuple[str, ...]:
+    return () if name == "." else tuple(name.split("."))
+
+
+def _parse(source: str, name: str) -> list[tuple]:
+    root: list[tuple] = []
+    stack: list[tuple[str, list[tuple]]] = [("", root)]
+    for kind, value in _tokens(source):
+        nodes = stack[-1][1]
+        if kind == "text":
+            nodes.append(("text", value))
+        elif kind == "var":
+            nodes.append(("var", _path(value)))
+        elif kind in "#^":
+            children: list[tuple] = []
+            nodes.append(("section", _path(value), children, kind == "^"))
+            stack.append((value, children))
+        else:
+            if len(stack) == 1 or stack[-1][0] != value:
+                raise TemplateError(f"{name}: unexpected {{{{/{value}}}}}")
+            stack.pop()
+    if len(stack) > 1:
+        raise TemplateError(f"{name}: unclosed {{{{#{stack[-1][0]}}}}}")
+    return root
+
+
+def _lookup(contexts: list[Any], path: tuple[str, ...]) -> Any:
+    if not path:
+        return contexts[-1]
+    head, *rest = path
+    for context in reversed(contexts):
+        if isinstance(context, Mapping) and head in context:
+            value = context[head]
+            break
+    else:
+        return _MISSING
+    for part in rest:
+        if isinstance(value, Mapping) and part in value:
+            value = value[part]
+        elif isinstance(value, (list, tuple)) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+    return value
+
+
+def _render(nodes: list[tuple], contexts: list[Any], out: list[str]) -> None:
+    for node in nodes:
+        kind = node[0]
+        if kind == "text":
+            out.append(node[1])
+        elif kind == "var":
+            value = _lookup(contexts, node[1])
+            if value is not _MISSING and value is not None:
+                out.append(str(value))
+        else:
+            _, path, children, inverted = node
+            value = _lookup(contexts, path)
+            empty = value is _MISSING or not value
+            if inverted:
+                if empty:
+                    _render(children, contexts, out)
+            elif empty:
+                continue
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    contexts.append(item)
+                    _render(children, contexts, out)
+                    contexts.pop()
+            else:
+                contexts.append(value)
+                _render(children, contexts, out)
+                contexts.pop()
+
+
+class Template:
+    """A template compiled once into a render plan."""
+
+    def __init__(self, source: str, name: str = "<template>") -> None:
+        self.name = name
+        self.source = source
+        self._plan = _parse(source, name)
+
+    def render(self, context: Mapping[str, Any] | None = None, **values: Any) -> str:
+        contexts: list[Any] = [dict(context or {}, **values)]
+        out: list[str] = []
+        _render(self._plan, contexts, out)
+        return "".join(out)
+
+
+@lru_cache(maxsize=128)
+def compile_template(source: str, name: str = "<template>") -> Template:
+    return Template(source, name)
+
+
+_file_lock = threading.Lock()
+_file_cache: dict[Path, tuple[tuple[int, int], Template]] = {}
+
+
+def load_template(path: str | Path) -> Template:
+    """Compile a user template file, recompiling only when it changes on disk."""
+    resolved = Path(path).expanduser().resolve()
+    stat = resolved.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _file_lock:
+        cached = _file_cache.get(resolved)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    template = Template(resolved.read_text(encoding="utf-8"), resolved.name)
+    with _file_lock:
+        _file_cache[resolved] = (key, template)
+    return template
@@ -0,0 +1,459 @@
+"""Repository introspection used to pre-fill project READMEs."""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python 3.10
+    tomllib = None
+
+
+MAX_FILES_LISTED = 200_000
+MAX_FILES_READ = 32
+MAX_READ_BYTES = 256 * 1024
+WORKERS = min(8, os.cpu_count() or 2)
+CACHE_SIZE = 64
+
+PRUNE_DIRS = {
+    ".git",
+    ".hg",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".tox",
+    ".venv",
+    "__pycache__",
+    "build",
+    "dist",
+    "node_modules",
+    "target",
+    "venv",
+}
+
+LANGUAGES = {
+    ".c": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".cs": "C#",
+    ".css": "CSS",
+    ".dart": "Dart",
+    ".go": "Go",
+    ".h": "C",
+    ".hpp": "C++",
+    ".html": "HTML",
+    ".java": "Java",
+    ".js": "JavaScript",
+    ".jsx": "JavaScript",
+    ".kt": "Kotlin",
+    ".lua": "Lua",
+    ".mjs": "JavaScript",
+    ".php": "PHP",
+    ".ps1": "PowerShell",
+    ".py": "Python",
+    ".rb": "Ruby",
+    ".rs": "Rust",
+    ".scss": "SCSS",
+    ".sh": "Shell",
+    ".sql": "SQL",
+    ".svelte": "Svelte",
+    ".swift": "Swift",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".vue": "Vue",
+}
+
+MANIFESTS = {
+    "pyproject.toml",
+    "package.json",
+    "requirements.txt",
+    "Cargo.toml",
+    "go.mod",
+    "Dockerfile",
+    "docker-compose.yml",
+    "compose.yaml",
+}
+LICENSE_FILES = ("LICENSE", "LICENSE.md", "LICENSE.txt", "LICENCE", "LICENCE.md", "COPYING")
+ENTRY_POINTS = (
+    "__main__.py",
+    "main.py",
+    "app.py",
+    "manage.py",
+    "cli.py",
+    "main.go",
+    "main.rs",
+    "index.js",
+    "index.ts",
+    "main.js",
+    "main.ts",
+    "server.js",
+)
+
+# Package names that are worth naming in a tech stack section.
+KNOWN_PACKAGES = {
+    "django": "Django",
+    "fastapi": "FastAPI",
+    "flask": "Flask",
+    "numpy": "NumPy",
+    "pandas": "pandas",
+    "pydantic": "Pydantic",
+    "pytest": "pytest",
+    "rich": "Rich",
+    "sqlalchemy": "SQLAlchemy",
+    "textual": "Textual",
+    "typer": "Typer",
+    "uvicorn": "Uvicorn",
+    "@angular/core": "Angular",
+    "electron": "Electron",
+    "express": "Express",
+    "jest": "Jest",
+    "next": "Next.js",
+    "react": "React",
+    "svelte": "Svelte",
+    "tailwindcss": "Tailwind CSS",
+    "typescript": "TypeScript",
+    "vite": "Vite",
+    "vitest": "Vitest",
+    "vue": "Vue",
+}
+RUNNERS = {".py": "python", ".js": "node", ".ts": "npx tsx", ".go": "go run", ".rs": "cargo run --bin"}
+FILE_STACK = {
+    "Cargo.toml": "Cargo",
+    "go.mod": "Go modules",
+    "Dockerfile": "Docker",
+    "docker-compose.yml": "Docker Compose",
+    "compose.yaml": "Docker Compose",
+}
+LICENSE_PATTERNS = (
+    ("MIT", re.compile(r"\bMIT License\b|Permission is hereby granted, free of charge", re.I)),
+    ("Apache-2.0", re.compile(r"Apache License,?\s+Version 2\.0", re.I)),
+    ("GPL-3.0", re.compile(r"GNU GENERAL PUBLIC LICENSE\s+Version 3", re.I)),
+    ("GPL-2.0", re.compile(r"GNU GENERAL PUBLIC LICENSE\s+Version 2", re.I)),
+    ("LGPL-3.0", re.compile(r"GNU LESSER GENERAL PUBLIC LICENSE\s+Version 3", re.I)),
+    ("AGPL-3.0", re.compile(r"GNU AFFERO GENERAL PUBLIC LICENSE", re.I)),
+    ("MPL-2.0", re.compile(r"Mozilla Public License,?\s+(Version|v\.?)\s*2\.0", re.I)),
+    ("BSD-3-Clause", re.compile(r"Neither the name of", re.I)),
+    ("BSD-2-Clause", re.compile(r"Redistribution and use in source and binary forms", re.I)),
+    ("Unlicense", re.compile(r"This is free and unencumbered software", re.I)),
+)
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+_cache_lock = threading.Lock()
+_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+
+def _git_files(root: Path) -> list[str] | None:
+    """List tracked and untracked-but-not-ignored files, relative to ``root``."""
+    try:
+        proc = subprocess.Popen(
+            ["git", "ls-files", "-co", "--exclude-standard", "-z"],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    files: list[str] = []
+    tail = b""
+    for chunk in iter(lambda: proc.stdout.read(65536), b""):
+        parts = (tail + chunk).split(b"\0")
+        tail = parts.pop()
+        files.extend(os.fsdecode(part) for part in parts if part)
+        if len(files) >= MAX_FILES_LISTED:
+            proc.kill()
+            break
+    proc.stdout.close()
+    if proc.wait() not in (0, -9) and not files:
+        return None
+    return files
+
+
+def _ignore_patterns(root: Path) -> list[str]:
+    try:
+        lines = (root / ".gitignore").read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [line.strip().rstrip("/") for line in lines if line.strip() and not line.startswith(("#", "!"))]
+
+
+def _ignored(rel: str, name: str, patterns: list[str]) -> bool:
+    for pattern in patterns:
+        if pattern.startswith("/"):
+            if fnmatch.fnmatch(rel, pattern[1:]):
+                return True
+        elif fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel, pattern):
+            return True
+    return False
+
+
+def _walk(root: Path, top: Path, patterns: list[str]) -> list[str]:
+    found: list[str] = []
+    pending = [top]
+    while pending and len(found) < MAX_FILES_LISTED:
+        current = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            rel = Path(entry.path).relative_to(root).as_posix()
+            if entry.name in PRUNE_DIRS or _ignored(rel, entry.name, patterns):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    found.append(rel)
+            except OSError:
+                continue
+    return found
+
+
+def _walk_files(root: Path, pool: ThreadPoolExecutor) -> list[str]:
+    """Walk a non-git directory, one top-level subdirectory per worker."""
+    patterns = _ignore_patterns(root)
+    files: list[str] = []
+    subdirs: list[Path] = []
+    for entry in os.scandir(root):
+        if entry.name in PRUNE_DIRS or _ignored(entry.name, entry.name, patterns):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(Path(entry.path))
+        elif entry.is_file(follow_symlinks=False):
+            files.append(entry.name)
+    for chunk in pool.map(lambda sub: _walk(root, sub, patterns), subdirs):
+        files.extend(chunk)
+    return files[:MAX_FILES_LISTED]
+
+
+def _read(path: Path) -> str | None:
+    try:
+        with path.open("rb") as handle:
+            return handle.read(MAX_READ_BYTES).decode("utf-8", errors="replace")
+    except OSError:
+        return None
+
+
+def _requirement_name(spec: str) -> str:
+    match = _REQUIREMENT_NAME.match(spec)
+    return match.group(1).lower() if match else ""
+
+
+def _parse_pyproject(text: str, info: dict[str, Any]) -> None:
+    if tomllib is None:
+        return
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError:
+        return
+    project = data.get("project") or data.get("tool", {}).get("poetry") or {}
+    info["name"] = info["name"] or project.get("name")
+    info["description"] = info["description"] or project.get("description")
+    license_value = project.get("license")
+    if isinstance(license_value, dict):
+        license_value = license_value.get("text")
+    if isinstance(license_value, str) and len(license_value) < 40:
+        info["license"] = info["license"] or license_value
+    deps = list(project.get("dependencies") or [])
+    for extra in (project.get("optional-dependencies") or {}).values():
+        deps.extend(extra)
+    info["_packages"].update(_requirement_name(dep) for dep in deps if isinstance(dep, str))
+    for name, target in (project.get("scripts") or {}).items():
+        info["scripts"].setdefault(name, name)
+        info["entry_points"].append(f"{name} = {target}")
+    info["stack"].append("Python")
+
+
+def _parse_package_json(text: str, info: dict[str, Any]) -> None:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return
+    if not isinstance(data, dict):
+        return
+    info["name"] = info["name"] or data.get("name")
+    info["description"] = info["description"] or data.get("description")
+    if isinstance(data.get("license"), str):
+        info["license"] = info["license"] or data["license"]
+    for key in ("dependencies", "devDependencies", "peerDependencies"):
+        info["_packages"].update((data.get(key) or {}).keys())
+    for name in data.get("scripts") or {}:
+        info["scripts"].setdefault(name, f"npm {name}" if name in ("start", "test") else f"npm run {name}")
+    main = data.get("main")
+    if isinstance(main, str):
+        info["entry_points"].append(main)
+    bin_value = data.get("bin")
+    if isinstance(bin_value, str):
+        info["entry_points"].append(bin_value)
+    elif isinstance(bin_value, dict):
+        info["entry_points"].extend(f"{name} = {target}" for name, target in bin_value.items())
+    info["stack"].append("Node.js")
+
+
+def _parse_requirements(text: str, info: dict[str, Any]) -> None:
+    for line in text.splitlines():
+        if line.strip() and not line.lstrip().startswith(("#", "-")):
+            info["_packages"].add(_requirement_name(line))
+
+
+def _detect_license(text: str) -> str | None:
+    for spdx, pattern in LICENSE_PATTERNS:
+        if pattern.search(text):
+            return spdx
+    return None
+
+
+def tree_hash(files: list[str], root: Path, read: list[str]) -> str:
+    """Hash the file listing plus the stat of every file that would be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(root).encode())
+    for rel in files:
+        digest.update(rel.encode("utf-8", errors="surrogateescape") + b"\0")
+    for rel in read:
+        try:
+            stat = (root / rel).stat()
+        except OSError:
+            continue
+        digest.update(f"{rel}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def _select_reads(files: list[str]) -> list[str]:
+    """Pick manifests, licence and entry points, shallowest first, up to the read cap."""
+    wanted = []
+    for rel in files:
+        parts = rel.split("/")
+        name = parts[-1]
+        depth = len(parts) - 1
+        if depth == 0 and (name in MANIFESTS or name in LICENSE_FILES):
+            wanted.append((0, rel))
+        elif depth <= 2 and name in ENTRY_POINTS:
+            wanted.append((1 + depth, rel))
+    wanted.sort()
+    return [rel for _, rel in wanted[:MAX_FILES_READ]]
+
+
+def _inside_git(root: Path) -> bool:
+    return any((parent / ".git").exists() for parent in (root, *root.parents))
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def introspect(repo_path: str | Path) -> dict[str, Any]:
+    """Describe a repository: languages, stack, scripts, entry points and licence.
+
+    Files come from ``git ls-files`` (so ``.gitignore`` is honoured) or, outside
+    git, from a parallel walk that applies the top-level ``.gitignore``. At most
+    ``MAX_FILES_READ`` small files are opened; results are cached by tree hash.
+    """
+    root = Path(repo_path).resolve()
+    if not root.is_dir():
+        raise FileNotFoundError(f"Repo path not found: {repo_path}")
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        files = _git_files(root) if _inside_git(root) else None
+        source = "git"
+        if files is None:
+            files = _walk_files(root, pool)
+            source = "walk"
+        reads = _select_reads(files)
+        key = tree_hash(files, root, reads)
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached is not None:
+                _cache.move_to_end(key)
+                return dict(cached)
+        contents = dict(zip(reads, pool.map(lambda rel: _read(root / rel), reads)))
+
+    info: dict[str, Any] = {
+        "name": None,
+        "description": None,
+        "license": None,
+        "stack": [],
+        "scripts": {},
+        "entry_points": [],
+        "_packages": set(),
+    }
+    for rel, text in contents.items():
+        if text is None:
+            continue
+        name = rel.rsplit("/", 1)[-1]
+        if rel == "pyproject.toml":
+            _parse_pyproject(text, info)
+        elif rel == "package.json":
+            _parse_package_json(text, info)
+        elif rel == "requirements.txt":
+            _parse_requirements(text, info)
+        elif name in LICENSE_FILES and "/" not in rel:
+            info["license"] = info["license"] or _detect_license(text)
+        elif name in ENTRY_POINTS:
+            info["entry_points"].append(rel)
+        if name in FILE_STACK and "/" not in rel:
+            info["stack"].append(FILE_STACK[name])
+
+    counts = Counter(LANGUAGES.get(os.path.splitext(rel)[1].lower()) for rel in files)
+    counts.pop(None, None)
+    total = sum(counts.values())
+    languages = [
+        {"name": name, "files": count, "percent": round(100 * count / total, 1)}
+        for name, count in counts.most_common()
+    ]
+    packages = info.pop("_packages")
+    frameworks = sorted({label for package, label in KNOWN_PACKAGES.items() if package in packages})
+    stack = list(dict.fromkeys([*(item["name"] for item in languages[:3]), *info["stack"], *frameworks]))
+
+    result = {
+        "root": str(root),
+        "name": info["name"] or root.name,
+        "description": info["description"],
+        "languages": languages,
+        "stack": stack,
+        "scripts": info["scripts"],
+        "entry_points": list(dict.fromkeys(info["entry_points"])),
+        "license": info["license"],
+        "files": len(files),
+        "truncated": len(files) >= MAX_FILES_LISTED,
+        "source": source,
+        "tree_hash": key,
+    }
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return dict(result)
+
+
+def project_fields(info: dict[str, Any]) -> dict[str, Any]:
+    """Turn an ``introspect`` result into README template fields."""
+    languages = ", ".join(f"{item['name']} {item['percent']}%" for item in info["languages"][:5])
+    usage_lines = list(info["scripts"].values())
+    if not usage_lines:
+        usage_lines = [
+            f"{RUNNERS[os.path.splitext(entry)[1]]} {entry}"
+            for entry in info["entry_points"]
+            if os.path.splitext(entry)[1] in RUNNERS
+        ]
+    usage = "```\n" + "\n".join(usage_lines) + "\n```" if usage_lines else ""
+    license_text = f"Released under the {info['license']} license." if info["license"] else ""
+    return {
+        "title": info["name"],
+        "description": info["description"] or "",
+        "stack": list(info["stack"]),
+        "languages": languages,
+        "usage": usage,
+        "license": license_text,
+    }
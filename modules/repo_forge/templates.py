@@ -1,13 +1,13 @@
-"""README templates for DDC."""
+"""README templates for DDC (see ``engine`` for the syntax)."""
 
 from __future__ import annotations
 
 
 PROFILE_TEMPLATES = {
-    "clean": """# {name}
+    "clean": """# {{name}}
 
 ## About
-{about}
+{{about}}
 
 ## Featured Projects
 - Project One: short summary and link
@@ -19,8 +19,8 @@ PROFILE_TEMPLATES = {
 - Tools: Git, Docker, ...
 
 ## Stats and Presence
-- GitHub: {github_handle}
-- Website: {website}
+- GitHub: {{github_handle}}
+- Website: {{website}}
 
 ## Roadmap
 - [ ] Next milestone
@@ -29,12 +29,12 @@ PROFILE_TEMPLATES = {
 ## License
 This profile README is yours to customize.
 """,
-    "cute": """# {name}
+    "cute": """# {{name}}
 
 > Scales polished, claws sharp, and commits steady.
 
 ## About
-{about}
+{{about}}
 
 ## Featured Projects
 - Project One: short summary and link
@@ -59,21 +59,39 @@ This profile README is yours to customize.
 """,
 }
 
+PROJECT_DEFAULTS = {
+    "description": "Add a crisp summary of the project goal and audience.",
+    "usage": "Add setup and usage steps here.",
+    "license": "Choose a license and add it here.",
+}
+
 PROJECT_TEMPLATES = {
-    "clean": """# {title}
+    "clean": """# {{title}}
 
 ## About
-{description}
+{{description}}
 
 ## Features
 - Feature one
 - Feature two
 - Feature three
 
+## Usage
+{{usage}}
+
 ## Tech Stack
+{{#stack}}
+- {{.}}
+{{/stack}}
+{{^stack}}
 - Language: Python
 - Frameworks: ...
 - Tooling: ...
+{{/stack}}
+{{#languages}}
+
+Languages: {{languages}}
+{{/languages}}
 
 ## Screenshots
 ![Screenshot placeholder](./docs/screenshot-1.png)
@@ -84,24 +102,36 @@ PROJECT_TEMPLATES = {
 - [ ] Polish docs
 
 ## License
-Choose a license and add it here.
+{{license}}
 """,
-    "cute": """# {title}
+    "cute": """# {{title}}
 
 > Forged in the dragon's workshop, tuned for crisp builds.
 
 ## About
-{description}
+{{description}}
 
 ## Features
 - Feature one
 - Feature two
 - Feature three
 
+## Usage
+{{usage}}
+
 ## Tech Stack
+{{#stack}}
+- {{.}}
+{{/stack}}
+{{^stack}}
 - Language: Python
 - Frameworks: ...
 - Tooling: ...
+{{/stack}}
+{{#languages}}
+
+Languages: {{languages}}
+{{/languages}}
 
 ## Screenshots
 ![Screenshot placeholder](./docs/screenshot-1.png)
@@ -112,6 +142,6 @@ Choose a license and add it here.
 - [ ] Polish docs
 
 ## License
-Choose a license and add it here.
+{{license}}
 """,
 }
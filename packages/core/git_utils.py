@@ -4,11 +4,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+import atexit
+import re
 import subprocess
+import threading
+import time
+from typing import Iterable, Iterator
+import zlib
 
 from packages.core.config import PROJECT_ROOT
 
 
+# SHA-1 (40 hex) or SHA-256 (64 hex) object ids.
+_SHA_RE = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+
+
 @dataclass
 class GitSummary:
     is_repo: bool
@@ -18,6 +28,305 @@ class GitSummary:
     error: str | None = None
 
 
+@dataclass
+class HeadInfo:
+    git_dir: Path
+    branch: str | None
+    sha: str | None
+    subject: str | None
+
+
+def find_git_dir(path: Path) -> Path | None:
+    """Locate the git directory for ``path`` (or a parent), following ``.git`` files."""
+    for candidate in (path, *path.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = Path(content[len("gitdir:"):].strip())
+            return git_dir if git_dir.is_absolute() else (candidate / git_dir).resolve()
+    return None
+
+
+def common_dir(git_dir: Path) -> Path:
+    """Return the directory holding refs and objects (differs for linked worktrees)."""
+    commondir_file = git_dir / "commondir"
+    try:
+        value = commondir_file.read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    return (git_dir / value).resolve()
+
+
+def read_head_ref(git_dir: Path) -> str | None:
+    """Return the symbolic ref in HEAD (``refs/heads/main``), or None when detached."""
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if head.startswith("ref:"):
+        return head[4:].strip()
+    return None
+
+
+def resolve_ref(git_dir: Path, ref: str) -> str | None:
+    """Resolve a ref through its loose file, then ``packed-refs``."""
+    base = common_dir(git_dir)
+    try:
+        value = (base / ref).read_text(encoding="utf-8").strip()
+    except OSError:
+        value = None
+    if value:
+        if value.startswith("ref:"):
+            return resolve_ref(git_dir, value[4:].strip())
+        return value if _SHA_RE.match(value) else None
+    try:
+        with (base / "packed-refs").open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.strip().partition(" ")
+                if name == ref and _SHA_RE.match(sha):
+                    return sha
+    except OSError:
+        return None
+    return None
+
+
+def read_head_sha(git_dir: Path) -> str | None:
+    ref = read_head_ref(git_dir)
+    if ref is not None:
+        return resolve_ref(git_dir, ref)
+    try:
+        value = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return value if _SHA_RE.match(value) else None
+
+
+def read_loose_object(git_dir: Path, sha: str) -> tuple[str, bytes] | None:
+    """Return ``(type, body)`` for a loose object, or None if it is packed/missing."""
+    if not _SHA_RE.match(sha):
+        return None
+    path = common_dir(git_dir) / "objects" / sha[:2] / sha[2:]
+    try:
+        raw = zlib.decompress(path.read_bytes())
+    except (OSError, zlib.error):
+        return None
+    header, sep, body = raw.partition(b"\0")
+    if not sep:
+        return None
+    kind, _, _ = header.partition(b" ")
+    return kind.decode("ascii", errors="replace"), body
+
+
+def commit_subject(body: bytes) -> str:
+    """Match ``git log --pretty=%s``: the first paragraph joined into one line."""
+    _, _, message = body.partition(b"\n\n")
+    lines: list[str] = []
+    for line in message.decode("utf-8", errors="replace").splitlines():
+        if not line.strip():
+            if lines:
+                break
+            continue
+        lines.append(line.strip())
+    return " ".join(lines)
+
+
+def read_commit_subject(git_dir: Path, sha: str) -> str | None:
+    obj = read_loose_object(git_dir, sha)
+    if obj is None or obj[0] != "commit":
+        return None
+    return commit_subject(obj[1])
+
+
+def read_head(path: Path) -> HeadInfo | None:
+    """Read branch, HEAD SHA and commit subject without spawning git.
+
+    Returns None when the layout is not understood; ``subject`` is None when
+    the commit lives in a pack, so callers fall back to ``git log`` for it.
+    """
+    git_dir = find_git_dir(path)
+    if git_dir is None or not (git_dir / "HEAD").is_file():
+        return None
+    if (common_dir(git_dir) / "reftable").is_dir():
+        return None
+    ref = read_head_ref(git_dir)
+    branch = ref[len("refs/heads/"):] if ref and ref.startswith("refs/heads/") else None
+    sha = read_head_sha(git_dir)
+    subject = read_commit_subject(git_dir, sha) if sha else None
+    return HeadInfo(git_dir=git_dir, branch=branch, sha=sha, subject=subject)
+
+
+@dataclass
+class GitObject:
+    sha: str
+    type: str
+    size: int
+    data: bytes | None = None
+
+
+class _CatFileProcess:
+    """One ``git cat-file --batch`` (or ``--batch-check``) coprocess."""
+
+    # Requests written before reading replies; kept well under pipe buffer sizes.
+    PIPELINE_DEPTH = 64
+
+    def __init__(self, repo: Path, mode: str) -> None:
+        self.repo = repo
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", mode],
+            cwd=repo,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _read_reply(self, rev: str) -> GitObject | None:
+        header = self.proc.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file exited unexpectedly")
+        parts = header.decode("utf-8", errors="replace").split()
+        if len(parts) != 3:
+            # "<rev> missing" / "<rev> ambiguous"
+            return None
+        sha, kind, size = parts[0], parts[1], int(parts[2])
+        data = None
+        if self.mode == "--batch":
+            data = self.proc.stdout.read(size)
+            self.proc.stdout.read(1)
+        return GitObject(sha=sha, type=kind, size=size, data=data)
+
+    def query(self, revs: list[str]) -> list[GitObject | None]:
+        results: list[GitObject | None] = []
+        with self.lock:
+            for start in range(0, len(revs), self.PIPELINE_DEPTH):
+                chunk = revs[start : start + self.PIPELINE_DEPTH]
+                self.proc.stdin.write("".join(f"{rev}\n" for rev in chunk).encode("utf-8"))
+                self.proc.stdin.flush()
+                results.extend(self._read_reply(rev) for rev in chunk)
+            self.last_used = time.monotonic()
+        return results
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+            self.proc.stdout.close()
+
+
+class GitObjectPool:
+    """Per-repo pool of long-lived ``git cat-file`` coprocesses.
+
+    Object lookups are streamed through stdin/stdout of one process per repo
+    and mode instead of spawning ``git show``/``git log`` per object. Processes
+    idle longer than ``idle_timeout`` are closed on the next use, and at most
+    ``max_processes`` are kept open (least recently used closed first).
+    """
+
+    def __init__(self, max_processes: int = 8, idle_timeout: float = 60.0) -> None:
+        self.max_processes = max_processes
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._procs: dict[tuple[str, str], _CatFileProcess] = {}
+
+    def _acquire(self, repo: Path, mode: str) -> _CatFileProcess:
+        key = (str(repo.resolve()), mode)
+        stale: list[_CatFileProcess] = []
+        with self._lock:
+            now = time.monotonic()
+            for proc_key, proc in list(self._procs.items()):
+                if proc_key != key and now - proc.last_used > self.idle_timeout:
+                    stale.append(self._procs.pop(proc_key))
+            proc = self._procs.get(key)
+            if proc is not None and not proc.alive():
+                stale.append(self._procs.pop(key))
+                proc = None
+            if proc is None:
+                while len(self._procs) >= self.max_processes:
+                    oldest = min(self._procs, key=lambda item: self._procs[item].last_used)
+                    stale.append(self._procs.pop(oldest))
+                proc = _CatFileProcess(Path(key[0]), mode)
+                self._procs[key] = proc
+            proc.last_used = now
+        for item in stale:
+            item.close()
+        return proc
+
+    def read_many(self, repo: Path, revs: Iterable[str]) -> Iterator[GitObject | None]:
+        """Yield full objects (``--batch``) for ``revs`` in order; None if missing."""
+        revs = list(revs)
+        if revs:
+            yield from self._acquire(repo, "--batch").query(revs)
+
+    def info_many(self, repo: Path, revs: Iterable[str]) -> Iterator[GitObject | None]:
+        """Yield sha/type/size (``--batch-check``) without object contents."""
+        revs = list(revs)
+        if revs:
+            yield from self._acquire(repo, "--batch-check").query(revs)
+
+    def read(self, repo: Path, rev: str) -> GitObject | None:
+        return next(self.read_many(repo, [rev]))
+
+    def info(self, repo: Path, rev: str) -> GitObject | None:
+        return next(self.info_many(repo, [rev]))
+
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._procs)
+
+    def close_idle(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                self._procs.pop(key)
+                for key, proc in list(self._procs.items())
+                if now - proc.last_used > self.idle_timeout
+            ]
+        for proc in stale:
+            proc.close()
+
+    def close(self) -> None:
+        with self._lock:
+            procs = list(self._procs.values())
+            self._procs.clear()
+        for proc in procs:
+            proc.close()
+
+
+_object_pool: GitObjectPool | None = None
+_object_pool_lock = threading.Lock()
+
+
+def object_pool() -> GitObjectPool:
+    """Return the shared process-wide ``GitObjectPool``."""
+    global _object_pool
+    with _object_pool_lock:
+        if _object_pool is None:
+            _object_pool = GitObjectPool()
+            atexit.register(_object_pool.close)
+        return _object_pool
+
+
 def _run_git(args: list[str], cwd: Path) -> str:
     result = subprocess.run(
         ["git", *args],
@@ -43,26 +352,34 @@ def git_summary(cwd: Path) -> GitSummary:
             error="Refusing to inspect git outside the project directory.",
         )
 
-    try:
-        inside = _run_git(["rev-parse", "--is-inside-work-tree"], cwd)
-        if inside.strip().lower() != "true":
-            return GitSummary(False, None, None, None, None)
-    except Exception as exc:  # noqa: BLE001
-        return GitSummary(False, None, None, None, str(exc))
+    head = read_head(cwd.resolve())
+    if head is None:
+        try:
+            inside = _run_git(["rev-parse", "--is-inside-work-tree"], cwd)
+            if inside.strip().lower() != "true":
+                return GitSummary(False, None, None, None, None)
+        except Exception as exc:  # noqa: BLE001
+            return GitSummary(False, None, None, None, str(exc))
 
-    try:
-        branch = _run_git(["branch", "--show-current"], cwd)
-    except Exception:
-        branch = None
+    branch = head.branch if head is not None else None
+    if head is None:
+        try:
+            branch = _run_git(["branch", "--show-current"], cwd)
+        except Exception:
+            branch = None
     try:
         status = _run_git(["status", "--porcelain"], cwd)
         dirty_count = len([line for line in status.splitlines() if line.strip()])
     except Exception:
         dirty_count = None
-    try:
-        last_commit = _run_git(["log", "-1", "--pretty=%s"], cwd)
-    except Exception:
-        last_commit = None
+    last_commit = head.subject if head is not None else None
+    # No subject also covers refs or objects the pure-Python reader cannot
+    # parse; git log answers for those (and fails cleanly on an unborn branch).
+    if last_commit is None:
+        try:
+            last_commit = _run_git(["log", "-1", "--pretty=%s"], cwd)
+        except Exception:
+            last_commit = None
 
     return GitSummary(
         is_repo=True,
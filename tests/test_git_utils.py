@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import subprocess
+
+from packages.core.git_utils import GitObjectPool, read_head
+
+
+def _git(repo, *args) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def test_read_head_without_subprocess(tmp_path) -> None:
+    _git(tmp_path, "init", "-q", "-b", "lair")
+    _git(tmp_path, "config", "user.email", "dragon@example.com")
+    _git(tmp_path, "config", "user.name", "Dragon")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "Light the forge")
+
+    head = read_head(tmp_path)
+    assert head is not None
+    assert head.branch == "lair"
+    assert head.sha == _git(tmp_path, "rev-parse", "HEAD")
+    assert head.subject == "Light the forge"
+
+
+def test_read_head_with_packed_refs_and_objects(tmp_path) -> None:
+    _git(tmp_path, "init", "-q", "-b", "lair")
+    _git(tmp_path, "config", "user.email", "dragon@example.com")
+    _git(tmp_path, "config", "user.name", "Dragon")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "packed")
+    _git(tmp_path, "gc", "-q")
+    _git(tmp_path, "pack-refs", "--all")
+
+    head = read_head(tmp_path)
+    assert head.sha == _git(tmp_path, "rev-parse", "HEAD")
+    # Packed commits are left to the git fallback.
+    assert head.subject is None
+
+
+def test_read_head_outside_repo(tmp_path) -> None:
+    assert read_head(tmp_path) is None
+
+
+def test_object_pool_streams_objects_through_one_process(tmp_path) -> None:
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "config", "user.email", "dragon@example.com")
+    _git(tmp_path, "config", "user.name", "Dragon")
+    for idx in range(3):
+        (tmp_path / f"scale{idx}.txt").write_text(f"scale {idx}\n" * 2000, encoding="utf-8")
+        _git(tmp_path, "add", ".")
+        _git(tmp_path, "commit", "-q", "-m", f"Scale {idx}")
+
+    pool = GitObjectPool(max_processes=1, idle_timeout=60)
+    try:
+        revs = [f"HEAD~{idx}" for idx in range(3)] + ["HEAD:scale0.txt", "missing-rev"]
+        objects = list(pool.read_many(tmp_path, revs * 40))
+        assert objects[0].type == "commit"
+        assert b"Scale 2" in objects[0].data
+        assert objects[3].data == b"scale 0\n" * 2000
+        assert objects[4] is None
+        assert len(objects) == 200
+
+        info = pool.info(tmp_path, "HEAD:scale1.txt")
+        assert info.type == "blob"
+        assert info.data is None
+        # Capped at one process: the batch-check process replaced the batch one.
+        assert pool.open_count() == 1
+    finally:
+        pool.close()
+    assert pool.open_count() == 0
+
+
+def test_read_head_in_sha256_repo(tmp_path) -> None:
+    _git(tmp_path, "init", "-q", "-b", "lair", "--object-format=sha256")
+    _git(tmp_path, "config", "user.email", "dragon@example.com")
+    _git(tmp_path, "config", "user.name", "Dragon")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "Long hashes")
+
+    head = read_head(tmp_path)
+    assert head.sha == _git(tmp_path, "rev-parse", "HEAD")
+    assert len(head.sha) == 64
+    assert head.subject == "Long hashes"
@@ -1,6 +1,19 @@
 from __future__ import annotations
 
-from modules.repo_forge.core import render_profile_readme, render_project_readme
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from modules.repo_forge.core import (
+    discover_packages,
+    render_batch,
+    render_profile_readme,
+    render_project_readme,
+    render_project_readme_from_repo,
+)
+from modules.repo_forge.engine import Template, TemplateError, compile_template, load_template
+from modules.repo_forge.introspect import clear_cache, introspect
 
 
 def test_profile_readme_contains_sections() -> None:
@@ -15,3 +28,79 @@ def test_project_readme_contains_sections() -> None:
     assert "# Dragon Tracker" in content
     assert "## About" in content
     assert "## Roadmap" in content
+
+
+def _sample_repo(root: Path) -> Path:
+    (root / "pkg").mkdir(parents=True)
+    (root / "build").mkdir()
+    (root / "generated").mkdir()
+    (root / "pyproject.toml").write_text(
+        '[project]\nname = "dragon-tracker"\ndescription = "Tracks dragons."\n'
+        'dependencies = ["fastapi>=0.110", "typer"]\n\n'
+        '[project.scripts]\ndragon = "pkg.cli:app"\n',
+        encoding="utf-8",
+    )
+    (root / "LICENSE").write_text("MIT License\n\nPermission is hereby granted...", encoding="utf-8")
+    (root / ".gitignore").write_text("generated/\n", encoding="utf-8")
+    (root / "pkg" / "main.py").write_text("print('hi')\n", encoding="utf-8")
+    (root / "pkg" / "web.js").write_text("", encoding="utf-8")
+    (root / "build" / "skip.py").write_text("", encoding="utf-8")
+    (root / "generated" / "skip.ts").write_text("", encoding="utf-8")
+    return root
+
+
+def test_introspect_reads_manifests_and_respects_gitignore(tmp_path) -> None:
+    clear_cache()
+    root = _sample_repo(tmp_path / "repo")
+    info = introspect(root)
+    assert info["source"] == "walk"
+    assert info["name"] == "dragon-tracker"
+    assert info["license"] == "MIT"
+    assert {item["name"]: item["files"] for item in info["languages"]} == {"Python": 1, "JavaScript": 1}
+    assert "FastAPI" in info["stack"] and "Typer" in info["stack"]
+    assert info["scripts"] == {"dragon": "dragon"}
+    assert "pkg/main.py" in info["entry_points"]
+    assert introspect(root)["tree_hash"] == info["tree_hash"]
+
+    (root / "pkg" / "extra.py").write_text("", encoding="utf-8")
+    assert introspect(root)["tree_hash"] != info["tree_hash"]
+
+
+def test_project_readme_from_repo_prefills_sections(tmp_path) -> None:
+    clear_cache()
+    root = _sample_repo(tmp_path / "repo")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    content = render_project_readme_from_repo(root)
+    assert "# dragon-tracker" in content
+    assert "Tracks dragons." in content
+    assert "- FastAPI" in content
+    assert "Released under the MIT license." in content
+    assert introspect(root)["source"] == "git"
+
+
+def test_template_engine_sections_and_loops() -> None:
+    template = compile_template(
+        "# {{title}}\n{{#items}}\n- {{name}} ({{title}})\n{{/items}}\n{{^items}}\nnone\n{{/items}}\n"
+    )
+    assert compile_template(template.source) is template
+    assert template.render(title="T", items=[{"name": "a"}, {"name": "b"}]) == "# T\n- a (T)\n- b (T)\n"
+    assert template.render(title="T", items=[]) == "# T\nnone\n"
+    with pytest.raises(TemplateError):
+        Template("{{#items}}open")
+
+
+def test_readme_batch_renders_every_package(tmp_path) -> None:
+    clear_cache()
+    for name in ("alpha", "beta"):
+        package = tmp_path / "packages" / name
+        package.mkdir(parents=True)
+        (package / "package.json").write_text(f'{{"name": "{name}"}}', encoding="utf-8")
+    (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+    (tmp_path / "node_modules" / "dep" / "package.json").write_text("{}", encoding="utf-8")
+    template = tmp_path / "tpl.md"
+    template.write_text("# {{title}}\n{{#stack}}\n- {{.}}\n{{/stack}}\n", encoding="utf-8")
+
+    packages = discover_packages(tmp_path)
+    assert [package.name for package in packages] == ["alpha", "beta"]
+    results = list(render_batch(packages, template=load_template(template), workers=2))
+    assert [content for _, content, _ in results] == ["# alpha\n- Node.js\n", "# beta\n- Node.js\n"]